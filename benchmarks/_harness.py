@@ -0,0 +1,101 @@
+"""
+Shared benchmark helpers: calibrated timing rounds, allocation stats and JSON baselines
+"""
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+@dataclass
+class Measurement:
+    """Timing and memory of one benchmarked callable, per call"""
+    name: str
+    rounds: int
+    iterations: int
+    min_us: float
+    median_us: float
+    mean_us: float
+    stddev_us: float
+    ops: float
+    # Пиковая память за вызов и блоки, которые результат удерживает после него
+    peak_kib: float
+    retained_blocks: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _calibrate(func: Callable[[], Any], round_time: float) -> int:
+    """Iterations per round so that a round takes at least ``round_time``"""
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= round_time or iterations >= 1 << 20:
+            return iterations
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(round_time / elapsed) + 1))
+
+
+def _allocations(func: Callable[[], Any]):
+    """(peak KiB during one call, memory blocks kept alive by its result)"""
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+    del result
+    return peak / 1024, max(0, retained)
+
+
+def measure(name: str, func: Callable[[], Any], rounds: int = 7, round_time: float = 0.05) -> Measurement:
+    """Time ``func`` pytest-benchmark style: warmup, calibration, then ``rounds`` rounds"""
+    func()
+    iterations = _calibrate(func, round_time)
+    timings: List[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - started) / iterations)
+
+    peak_kib, retained = _allocations(func)
+    median = statistics.median(timings)
+    return Measurement(
+        name=name,
+        rounds=rounds,
+        iterations=iterations,
+        min_us=round(min(timings) * 1e6, 3),
+        median_us=round(median * 1e6, 3),
+        mean_us=round(statistics.fmean(timings) * 1e6, 3),
+        stddev_us=round(statistics.pstdev(timings) * 1e6, 3),
+        ops=round(1 / median, 1) if median > 0 else 0.0,
+        peak_kib=round(peak_kib, 2),
+        retained_blocks=retained,
+    )
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, data: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"baseline saved to {path}")
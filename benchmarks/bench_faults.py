@@ -0,0 +1,71 @@
+"""
+Benchmark: client behaviour against a slow and flaky panel
+
+Runs interactive get_users calls (with the handler deadline, like admin
+updates) through the full client stack - rate limiter, retries, circuit
+breaker, stale cache - over a mock panel with injected faults.
+
+Usage:
+    python -m benchmarks.bench_faults [calls] ["fault rules"] [seed]
+
+Example:
+    python -m benchmarks.bench_faults 200 "GET /users*: latency=50-400 error=0.3 status=503" 1
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.bench_users_fetch import make_payload
+from src.core.config import settings
+from src.services.api import RemnaWaveAPIClient, RemnaWaveAPIError
+from src.services.deadline import request_deadline
+from src.services.resilience import panel_breaker
+
+DEFAULT_RULES = "GET /users*: latency=exp:150 error=0.3 status=503"
+
+
+async def main(calls: int, rules: str, seed: int):
+    settings.api_fault_injection = rules
+    settings.api_fault_seed = seed
+    # Ретраи и бэк-офф ускорены, чтобы прогон занимал секунды
+    settings.api_retry_backoff = 0.05
+    payload = make_payload(50)
+    client = RemnaWaveAPIClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=payload))
+    )
+
+    latencies = []
+    outcomes = {"ok": 0, "stale": 0, "error": 0}
+    try:
+        for _ in range(calls):
+            started = time.perf_counter()
+            try:
+                with request_deadline(settings.handler_deadline):
+                    result = await client.get_users(page=1, limit=50)
+                outcomes["stale" if result.get("stale") else "ok"] += 1
+            except RemnaWaveAPIError:
+                outcomes["error"] += 1
+            latencies.append(time.perf_counter() - started)
+    finally:
+        await client.close()
+
+    latencies.sort()
+    print(f"rules: {rules}  seed: {seed}")
+    print(f"calls: {calls}  " + "  ".join(f"{k}: {v}" for k, v in outcomes.items()))
+    print(
+        f"latency p50 {statistics.median(latencies) * 1000:.0f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms  "
+        f"max {latencies[-1] * 1000:.0f} ms"
+    )
+    print(f"injected: {client.fault_injector.stats()}  breaker: {panel_breaker.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        sys.argv[2] if len(sys.argv) > 2 else DEFAULT_RULES,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 1,
+    ))
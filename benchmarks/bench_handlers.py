@@ -0,0 +1,324 @@
+"""
+Benchmark: end-to-end handler latency with synthetic Telegram updates
+
+Builds the real Application (create_bot_application + register_handlers)
+with a stub Bot API transport and points the global API client at the
+in-process mock panel. Synthetic callback and message updates arrive at a
+fixed rate (open loop, latency is counted from the scheduled arrival), so
+queueing under load shows up in the tail.
+
+For every scenario it reports p50/p95/p99 handler latency, panel API calls
+per update and Telegram calls per update. Results can be saved as a JSON
+baseline and compared against it later; --compare exits with code 1 on a
+regression.
+
+Usage:
+    LOG_LEVEL=WARNING python -m benchmarks.bench_handlers [--rate 5] [--updates 200]
+        [--users 1000] [--panel-latency 20] [--telegram-latency 0]
+        [--scenario users_list ...] [--save] [--compare] [--baseline PATH]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from telegram import Update
+from telegram.request import BaseRequest, RequestData
+
+from benchmarks._harness import BASELINE_DIR, load_baseline, save_baseline
+from src.core.bot import create_bot_application
+from src.core.config import settings
+from src.main import register_handlers
+from src.services.api import api_client
+from tests.mock_panel import MockPanel, PanelConfig, user_uuid
+
+DEFAULT_BASELINE = BASELINE_DIR / "bench_handlers.json"
+
+# Допуск при сравнении с базовой линией: рост хвоста задержки больше 25% — регрессия
+LATENCY_TOLERANCE = 0.25
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class StubTelegramRequest(BaseRequest):
+    """Bot API transport that answers locally and counts calls by method"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_id = 1000
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> Tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        self.calls[api_method] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        params = request_data.parameters if request_data else {}
+        return 200, json.dumps({"ok": True, "result": self._result(api_method, params)}).encode()
+
+    def _result(self, api_method: str, params: Dict[str, Any]) -> Any:
+        if api_method == "getMe":
+            return BOT_USER
+        if api_method.startswith(("send", "edit")):
+            self._message_id += 1
+            return {
+                "message_id": params.get("message_id", self._message_id),
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id", 0), "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        return True
+
+
+class UpdateFactory:
+    """Synthetic updates from the first admin in distinct private chats"""
+
+    def __init__(self, bot, admin_id: int):
+        self.bot = bot
+        self.user = {"id": admin_id, "is_bot": False, "first_name": "Admin", "username": "admin"}
+        self._update_id = 0
+
+    def _next_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    def callback(self, chat_id: int, data: str) -> Update:
+        update_id = self._next_id()
+        return Update.de_json({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self.user,
+                "chat_instance": str(chat_id),
+                "data": data,
+                "message": {
+                    "message_id": 1,
+                    "date": 0,
+                    "chat": {"id": chat_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": "menu",
+                },
+            },
+        }, self.bot)
+
+    def message(self, chat_id: int, text: str) -> Update:
+        update_id = self._next_id()
+        return Update.de_json({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": self.user,
+                "text": text,
+            },
+        }, self.bot)
+
+
+def build_scenario(name: str, factory: UpdateFactory, count: int, users: int) -> Tuple[List[Update], List[Update]]:
+    """(setup updates, measured updates) for a scenario"""
+    setup: List[Update] = []
+    measured: List[Update] = []
+    for i in range(count):
+        chat_id = 10_000 + i
+        index = (i * 7919) % users
+        if name == "users_list":
+            measured.append(factory.callback(chat_id, "users_list"))
+        elif name == "user_view":
+            measured.append(factory.callback(chat_id, f"user_view:{user_uuid(index)}"))
+        elif name == "nodes_list":
+            measured.append(factory.callback(chat_id, "nodes_list"))
+        elif name == "user_search":
+            # Поиск — шаг диалога: сначала вход в него, замеряется только ввод запроса
+            setup.append(factory.callback(chat_id, "user_search"))
+            measured.append(factory.message(chat_id, f"user_{index:06d}"))
+        else:
+            raise ValueError(f"Unknown scenario {name!r}")
+    return setup, measured
+
+
+SCENARIOS = ("users_list", "user_view", "nodes_list", "user_search")
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def inject(application, updates: List[Update], rate: float) -> List[float]:
+    """Feed updates at ``rate`` per second; latency from scheduled arrival to completion"""
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+
+    async def one(update: Update, scheduled: float):
+        # Как в Application: через update processor (лимит параллельности, метрики, трассы)
+        await application.update_processor.process_update(update, application.process_update(update))
+        latencies.append(loop.time() - scheduled)
+
+    tasks = []
+    start = loop.time()
+    for i, update in enumerate(updates):
+        scheduled = start + i / rate
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(update, scheduled)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def run(args) -> Dict[str, Any]:
+    if not settings.admin_id_list:
+        raise SystemExit("ADMIN_IDS is not set")
+
+    panel = MockPanel(PanelConfig(
+        users=args.users,
+        latency_ms=args.panel_latency,
+        jitter_ms=args.panel_latency / 2,
+        seed=args.seed,
+    ))
+    # Глобальный клиент ещё не создал SDK — подменяем транспорт на мок панели
+    api_client._base_transport = httpx.ASGITransport(app=panel)
+
+    telegram = StubTelegramRequest(latency=args.telegram_latency / 1000)
+    application = create_bot_application(request=telegram)
+    register_handlers(application)
+    await application.initialize()
+    # Как в боте: таймауты диалогов ставятся задачами в JobQueue
+    await application.job_queue.start()
+    factory = UpdateFactory(application.bot, settings.admin_id_list[0])
+
+    results: Dict[str, Any] = {}
+    try:
+        for name in args.scenario:
+            setup, measured = build_scenario(name, factory, args.updates, args.users)
+            for update in setup:
+                await application.process_update(update)
+
+            api_before = panel.requests
+            telegram.calls.clear()
+            latencies = await inject(application, measured, args.rate)
+            count = len(measured)
+            results[name] = {
+                "updates": count,
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "max_ms": round(max(latencies) * 1000, 2),
+                "api_calls_per_update": round((panel.requests - api_before) / count, 3),
+                "telegram_calls_per_update": round(sum(telegram.calls.values()) / count, 3),
+                "telegram_calls": dict(telegram.calls),
+            }
+    finally:
+        await application.job_queue.stop()
+        await application.shutdown()
+        await api_client.close()
+
+    return {
+        "config": {
+            "rate": args.rate,
+            "updates": args.updates,
+            "users": args.users,
+            "panel_latency_ms": args.panel_latency,
+            "telegram_latency_ms": args.telegram_latency,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Regressions of ``current`` against ``baseline``"""
+    regressions = []
+    if current["config"] != baseline.get("config"):
+        print("warning: benchmark config differs from the baseline")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if result[key] > base[key] * (1 + LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+        for key in ("api_calls_per_update", "telegram_calls_per_update"):
+            if result[key] > base[key]:
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+    return regressions
+
+
+def report(data: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    print(f"config: {data['config']}")
+    print(f"{'scenario':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'api/upd':>8} {'tg/upd':>8}")
+    for name, r in data["scenarios"].items():
+        line = (
+            f"{name:<12} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms "
+            f"{r['api_calls_per_update']:>8.2f} {r['telegram_calls_per_update']:>8.2f}"
+        )
+        base = (baseline or {}).get("scenarios", {}).get(name)
+        if base:
+            line += f"   (baseline p95 {base['p95_ms']:.1f}ms p99 {base['p99_ms']:.1f}ms)"
+        print(line)
+
+
+def parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=5.0, help="updates per second")
+    parser.add_argument("--updates", type=int, default=200, help="updates per scenario")
+    parser.add_argument("--users", type=int, default=1000, help="users in the mock panel")
+    parser.add_argument("--panel-latency", type=float, default=20.0, help="panel latency, ms")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Bot API latency, ms")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regression against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    data = asyncio.run(run(args))
+
+    baseline = load_baseline(args.baseline)
+    report(data, baseline)
+
+    if args.save:
+        save_baseline(args.baseline, data)
+
+    if args.compare:
+        if baseline is None:
+            print(f"no baseline at {args.baseline}")
+            return 1
+        regressions = compare(data, baseline)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
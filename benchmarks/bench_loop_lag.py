@@ -0,0 +1,69 @@
+"""
+Benchmark: event loop lag while a large users page is being parsed
+
+A ticker coroutine sleeps 5 ms in a loop and records how late it wakes up
+while get_users fetches a big page, with model validation inline and in
+the CPU offload pool.
+
+Usage:
+    python -m benchmarks.bench_loop_lag [users] [rounds]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.bench_users_fetch import make_client, make_payload
+from src.services.offload import cpu_offloader
+
+TICK = 0.005
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def measure(name: str, client, count: int, rounds: int, threshold_bytes: int):
+    cpu_offloader.threshold_bytes = threshold_bytes
+    await client.get_users(page=1, limit=count)  # прогрев
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK)  # тикер уже ждёт, когда начинается загрузка
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await client.get_users(page=1, limit=count)
+    elapsed = (time.perf_counter() - started) / rounds
+    stop.set()
+    await tick_task
+
+    lags.sort()
+    p99 = lags[max(0, int(len(lags) * 0.99) - 1)]
+    print(
+        f"{name:<8} fetch {elapsed * 1000:7.1f} ms  "
+        f"lag max {lags[-1] * 1000:7.1f} ms  p99 {p99 * 1000:6.1f} ms  "
+        f"median {statistics.median(lags) * 1000:5.2f} ms"
+    )
+
+
+async def main(count: int, rounds: int):
+    payload = make_payload(count)
+    print(f"{count} users, {len(payload) / 1024 ** 2:.1f} MB body, {rounds} rounds")
+    client = make_client(payload)
+    try:
+        await measure("inline", client, count, rounds, threshold_bytes=0)
+        await measure("offload", client, count, rounds, threshold_bytes=1)
+    finally:
+        await client.close()
+        cpu_offloader.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    ))
@@ -0,0 +1,158 @@
+"""
+Benchmark: screen rendering cost of formatters and keyboard builders
+
+Times the user and node formatters, utils.formatters.Formatters and the
+keyboard factories over realistic payloads from the mock panel: both SDK
+views (what handlers get from the API client) and plain JSON dicts (the
+streaming path). Every case renders a list of 10, 100 and 1000 entities.
+
+Per case it reports min/median/stddev per call, calls per second, peak
+traced memory during a call and memory blocks kept alive by the result.
+--save writes a JSON baseline; --compare fails when the median time or
+the peak memory of any case regresses.
+
+Usage:
+    python -m benchmarks.bench_render [--sizes 10 100 1000] [-k format_user]
+        [--save] [--compare] [--baseline PATH]
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from remnawave.models import GetAllNodesResponseDto, UsersResponseDto
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from benchmarks._harness import BASELINE_DIR, Measurement, load_baseline, measure, save_baseline
+from src.features.nodes import formatters as node_fmt
+from src.features.nodes import keyboards as node_kb
+from src.features.users import formatters as user_fmt
+from src.features.users import keyboards as user_kb
+from src.models.views import NodeView, UserView
+from src.utils.formatters import Formatters
+from src.utils.keyboards import Keyboards
+from tests.mock_panel import MockPanel, PanelConfig
+
+DEFAULT_BASELINE = BASELINE_DIR / "bench_render.json"
+
+# Допуски при сравнении: микробенчмарки шумные, поэтому по времени запас больше
+TIME_TOLERANCE = 0.30
+MEMORY_TOLERANCE = 0.10
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def make_payloads(size: int) -> Dict[str, List[Any]]:
+    """Users and nodes of the mock panel as JSON dicts and as SDK views"""
+    panel = MockPanel(PanelConfig(users=size, nodes=size, latency_ms=0, jitter_ms=0))
+    _, page = panel.list_users({"start": "0", "size": str(size)}, {})
+    _, nodes = panel.list_nodes({}, {})
+    return {
+        "users_json": page["users"],
+        "users_view": UserView.wrap_all(UsersResponseDto.model_validate(page).users),
+        "nodes_json": nodes,
+        "nodes_view": NodeView.wrap_all(GetAllNodesResponseDto.model_validate(nodes).root),
+    }
+
+
+def build_cases(size: int) -> List[Case]:
+    data = make_payloads(size)
+    users_view, users_json = data["users_view"], data["users_json"]
+    nodes_view = data["nodes_view"]
+    dates = [user["createdAt"] for user in users_json]
+
+    def users_list_keyboard():
+        # Та же разметка, что строит users_list_callback для страницы списка
+        rows = [
+            [InlineKeyboardButton(
+                f"{user_fmt.status_badge(str(u['status']))} {u['username']} | "
+                f"{user_fmt.format_bytes(u.get('usedTrafficBytes', 0))}",
+                callback_data=f"user_view:{u['uuid']}"
+            )]
+            for u in users_view
+        ]
+        rows.append(user_kb.pagination(2, 3, "users_page"))
+        return InlineKeyboardMarkup(rows)
+
+    return [
+        (f"users.format_user_full[view-{size}]", lambda: [user_fmt.format_user_full(u, hwid_count=1) for u in users_view]),
+        (f"users.format_user_full[json-{size}]", lambda: [user_fmt.format_user_full(u, hwid_count=1) for u in users_json]),
+        (f"users.format_user_short[view-{size}]", lambda: [user_fmt.format_user_short(u) for u in users_view]),
+        (f"users.format_date[{size}]", lambda: [user_fmt.format_date(d) for d in dates]),
+        (f"nodes.format_node_full[view-{size}]", lambda: [node_fmt.format_node_full(n) for n in nodes_view]),
+        (f"nodes.format_node_short[view-{size}]", lambda: [node_fmt.format_node_short(n) for n in nodes_view]),
+        (f"Formatters.format_user[json-{size}]", lambda: [Formatters.format_user(u) for u in users_json]),
+        (f"Formatters.format_user_short[json-{size}]", lambda: [Formatters.format_user_short(u) for u in users_json]),
+        (f"Formatters.format_date[{size}]", lambda: [Formatters.format_date(d) for d in dates]),
+        (f"Formatters.format_bytes[{size}]", lambda: [Formatters.format_bytes(u["usedTrafficBytes"]) for u in users_json]),
+        (f"keyboards.users_list[{size}]", users_list_keyboard),
+        (f"keyboards.user_actions[{size}]", lambda: [user_kb.user_actions(u["uuid"]) for u in users_json]),
+        (f"keyboards.node_actions[{size}]", lambda: [node_kb.node_actions(str(n["uuid"]), n["isDisabled"]) for n in nodes_view]),
+        (f"Keyboards.pagination[{size}]", lambda: [Keyboards.pagination(i + 1, size, "users_page") for i in range(size)]),
+    ]
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Regressions of ``current`` against ``baseline``"""
+    regressions = []
+    for name, result in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        if result["median_us"] > base["median_us"] * (1 + TIME_TOLERANCE):
+            regressions.append(f"{name}: median {base['median_us']:.1f} -> {result['median_us']:.1f} us")
+        if result["peak_kib"] > base["peak_kib"] * (1 + MEMORY_TOLERANCE) + 1:
+            regressions.append(f"{name}: peak {base['peak_kib']:.1f} -> {result['peak_kib']:.1f} KiB")
+    return regressions
+
+
+def report(results: List[Measurement], baseline: Dict[str, Any]):
+    print(f"{'case':<44} {'min':>11} {'median':>11} {'stddev':>9} {'ops/s':>10} {'peak':>10} {'kept':>7}  baseline")
+    for m in results:
+        base = baseline.get("cases", {}).get(m.name)
+        delta = f"{(m.median_us / base['median_us'] - 1) * 100:+.0f}%" if base and base["median_us"] else ""
+        print(
+            f"{m.name:<44} {m.min_us:>9.1f}us {m.median_us:>9.1f}us {m.stddev_us:>7.1f}us "
+            f"{m.ops:>10.1f} {m.peak_kib:>7.1f}KiB {m.retained_blocks:>7}  {delta}"
+        )
+
+
+def parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("-k", dest="keyword", default="", help="only cases containing this substring")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regression against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    results = []
+    for size in args.sizes:
+        for name, func in build_cases(size):
+            if args.keyword in name:
+                results.append(measure(name, func, rounds=args.rounds))
+
+    baseline = load_baseline(args.baseline)
+    report(results, baseline or {})
+    data = {"cases": {m.name: m.to_dict() for m in results}}
+
+    if args.save:
+        save_baseline(args.baseline, data)
+
+    if args.compare:
+        if baseline is None:
+            print(f"no baseline at {args.baseline}")
+            return 1
+        regressions = compare(data, baseline)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+Benchmark: memory per user for full user dicts vs compact UserRecord
+
+Holds N users in memory in three forms and reports traced memory per user:
+  dump    - model_dump(by_alias=True) dicts (what handlers kept before)
+  raw     - plain dicts parsed from JSON (streaming fast path)
+  record  - UserRecord built from the raw dicts
+
+Usage:
+    python -m benchmarks.bench_user_records [users]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.bench_users_fetch import make_payload
+from remnawave.models import UserResponseDto
+from src.models.records import UserRecord
+
+
+def measure(name: str, count: int, build: Callable[[], List]):
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<7} {current / count:8.0f} B/user  {current / 1024 ** 2:8.1f} MB total")
+    del items
+
+
+def main(count: int):
+    # Одна и та же страница из 1000 пользователей, размноженная до count
+    sample = json.loads(make_payload(1000))["response"]["users"]
+    print(f"{count} users")
+
+    def raw_users():
+        return [json.loads(json.dumps(sample[i % len(sample)])) for i in range(count)]
+
+    def dumps():
+        return [
+            UserResponseDto.model_validate_json(json.dumps(sample[i % len(sample)])).model_dump(by_alias=True)
+            for i in range(count)
+        ]
+
+    def records():
+        # Как при потоковом чтении: каждый словарь сразу превращается в запись
+        return [
+            UserRecord.from_api(json.loads(json.dumps(sample[i % len(sample)])))
+            for i in range(count)
+        ]
+
+    measure("dump", count, dumps)
+    measure("raw", count, raw_users)
+    measure("record", count, records)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
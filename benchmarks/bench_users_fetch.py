@@ -0,0 +1,120 @@
+"""
+Benchmark: fetching a large users page via SDK models vs the streaming fast path
+
+Serves a synthetic /api/users response from an in-process mock transport and
+measures wall time and peak Python memory for both paths.
+
+Usage:
+    python -m benchmarks.bench_users_fetch [users] [rounds]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Awaitable, Callable
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("ADMIN_IDS", "0")
+os.environ.setdefault("REMNAWAVE_API_URL", "http://panel.local")
+
+import httpx  # noqa: E402
+from remnawave import RemnawaveSDK  # noqa: E402
+
+from src.services.api import RemnaWaveAPIClient  # noqa: E402
+
+
+def make_payload(count: int) -> bytes:
+    """Users response shaped like the panel's, with all required fields"""
+    users = []
+    for i in range(count):
+        users.append({
+            "uuid": str(uuid.uuid4()),
+            "shortUuid": f"short{i:08d}",
+            "username": f"user_{i}",
+            "status": "ACTIVE",
+            "usedTrafficBytes": 1024 * i,
+            "lifetimeUsedTrafficBytes": 4096 * i,
+            "trafficLimitBytes": 100 * 1024 ** 3,
+            "trafficLimitStrategy": "MONTH",
+            "subLastUserAgent": None,
+            "subLastOpenedAt": None,
+            "expireAt": "2030-01-01T00:00:00.000Z",
+            "onlineAt": "2025-06-01T12:00:00.000Z",
+            "subRevokedAt": None,
+            "lastTrafficResetAt": None,
+            "trojanPassword": "x" * 24,
+            "vlessUuid": str(uuid.uuid4()),
+            "ssPassword": "y" * 24,
+            "description": "benchmark user",
+            "telegramId": 100000 + i,
+            "email": f"user_{i}@example.com",
+            "hwidDeviceLimit": 3,
+            "activeInternalSquads": [],
+            "subscriptionUrl": f"https://sub.example.com/short{i:08d}",
+            "firstConnectedAt": None,
+            "lastTriggeredThreshold": 0,
+            "lastConnectedNode": None,
+            "tag": None,
+            "createdAt": "2024-01-01T00:00:00.000Z",
+            "updatedAt": "2025-01-01T00:00:00.000Z",
+        })
+    return json.dumps({"response": {"users": users, "total": count}}).encode()
+
+
+# Тело отдаётся кусками, как при чтении из сокета
+CHUNK_SIZE = 64 * 1024
+
+
+def make_client(payload: bytes) -> RemnaWaveAPIClient:
+    """API client whose HTTP layer answers every request with ``payload``"""
+    async def body():
+        for start in range(0, len(payload), CHUNK_SIZE):
+            yield payload[start:start + CHUNK_SIZE]
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body()))
+    client = RemnaWaveAPIClient()
+    client._sdk = RemnawaveSDK(
+        client=httpx.AsyncClient(base_url="http://panel.local/api", transport=transport)
+    )
+    return client
+
+
+async def measure(name: str, call: Callable[[], Awaitable[dict]], rounds: int):
+    await call()  # прогрев
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = await call()
+    elapsed = (time.perf_counter() - started) / rounds
+
+    # Память меряем отдельным проходом: tracemalloc сильно замедляет код
+    del result
+    tracemalloc.start()
+    result = await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    users = len(result["response"]["users"])
+    print(
+        f"{name:<10} {elapsed * 1000:8.1f} ms/page  "
+        f"{users / elapsed:10.0f} users/s  peak {peak / 1024 ** 2:6.1f} MB"
+    )
+
+
+async def main(count: int, rounds: int):
+    payload = make_payload(count)
+    print(f"{count} users, {len(payload) / 1024 ** 2:.1f} MB body, {rounds} rounds")
+    client = make_client(payload)
+    try:
+        await measure("sdk", lambda: client.get_users(page=1, limit=count), rounds)
+        await measure("streaming", lambda: client.get_users_raw(page=1, limit=count), rounds)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    ))
@@ -1,27 +1,116 @@
 """
 Bot initialization module
 """
-from telegram.ext import Application
+import time
+from typing import Any, Awaitable, Optional, Tuple
+
+from telegram.ext import Application, ContextTypes, SimpleUpdateProcessor
+from telegram.request import BaseRequest, HTTPXRequest, RequestData
 from src.core.config import settings
 from src.core.logger import log
+from src.services.handler_timing import describe_update, record_telegram
+from src.services.loop_monitor import loop_monitor
+from src.services.metrics import telegram_rate_limited_total, update_seconds, updates_in_flight
+from src.services.persistence import RedisPersistence
+from src.services.state_store import ConversationState
+from src.services.tracing import tracer
+
+# Столько же, сколько даёт concurrent_updates(True)
+MAX_CONCURRENT_UPDATES = 256
 
 
-def create_bot_application() -> Application:
+class InstrumentedUpdateProcessor(SimpleUpdateProcessor):
+    """Concurrent update processing that tracks in-flight updates and their duration"""
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        details = describe_update(update)
+        with updates_in_flight.track_inprogress(), update_seconds.time(), loop_monitor.track_update(details):
+            with tracer.start_trace(
+                "update",
+                update_id=getattr(update, "update_id", None),
+                details=details
+            ):
+                await coroutine
+
+
+class TimedRequest(BaseRequest):
+    """Bot API request wrapper that adds Telegram time to the current handler's timing"""
+    
+    def __init__(self, request: BaseRequest):
+        self._request = request
+    
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return self._request.read_timeout
+    
+    async def initialize(self) -> None:
+        await self._request.initialize()
+    
+    async def shutdown(self) -> None:
+        await self._request.shutdown()
+    
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=None,
+        write_timeout=None,
+        connect_timeout=None,
+        pool_timeout=None,
+    ) -> Tuple[int, bytes]:
+        started = time.perf_counter()
+        bot_method = url.rsplit('/', 1)[-1]
+        try:
+            with tracer.span(f"telegram.{bot_method}", kind="telegram"):
+                code, payload = await self._request.do_request(
+                    url,
+                    method,
+                    request_data=request_data,
+                    read_timeout=read_timeout,
+                    write_timeout=write_timeout,
+                    connect_timeout=connect_timeout,
+                    pool_timeout=pool_timeout,
+                )
+            if code == 429:
+                telegram_rate_limited_total.inc(method=bot_method)
+            return code, payload
+        finally:
+            record_telegram(time.perf_counter() - started)
+
+
+def create_bot_application(request: Optional[BaseRequest] = None) -> Application:
     """
     Create and configure Telegram bot application
     
+    Args:
+        request: Custom Bot API transport (benchmarks and tests use a stub)
+    
     Returns:
         Application: Configured bot application
     """
     log.info("Creating bot application...")
     
     # Create application
-    application = (
+    builder = (
         Application.builder()
         .token(settings.telegram_bot_token)
-        .concurrent_updates(True)
-        .build()
+        .concurrent_updates(InstrumentedUpdateProcessor(MAX_CONCURRENT_UPDATES))
+        # user_data с TTL и лимитом размера вместо обычного dict
+        .context_types(ContextTypes(user_data=ConversationState))
     )
+    if settings.use_persistence:
+        # Диалоги и их данные переживают перезапуск
+        builder = builder.persistence(RedisPersistence())
+    elif settings.persistence_enabled:
+        log.warning("PERSISTENCE_ENABLED requires REDIS_ENABLED, conversations will not be persisted")
+    if request is not None:
+        builder = builder.get_updates_request(request)
+    else:
+        request = HTTPXRequest(connection_pool_size=MAX_CONCURRENT_UPDATES)
+    # Запросы из обработчиков учитываются как время Telegram
+    builder = builder.request(TimedRequest(request))
+    application = builder.build()
     
     log.info("Bot application created successfully")
     return application
@@ -36,10 +36,95 @@ class Settings(BaseSettings):
     # Redis Configuration
     redis_url: str = "redis://localhost:6379/0"
     redis_enabled: bool = False
+    # Conversation and chat state in Redis, survives restarts (needs REDIS_ENABLED)
+    persistence_enabled: bool = False
+    persistence_update_interval: float = 10.0
     
     # Bulk Operations
     max_bulk_create: int = 20
     
+    # User Import
+    import_chunk_size: int = 100
+    
+    # Users Export
+    export_page_size: int = 500
+    
+    # Background Jobs
+    jobs_store_path: str = "data/jobs.json"
+    jobs_history_limit: int = 20
+    mass_page_size: int = 100
+    mass_chunk_size: int = 20
+    
+    # Adaptive API Concurrency (AIMD) for mass operations, bulk create, import and export
+    api_concurrency_initial: int = 4
+    api_concurrency_min: int = 1
+    api_concurrency_max: int = 20
+    api_target_p95_ms: int = 1000
+    api_max_error_rate: float = 0.05
+    
+    # API Rate Limit (token bucket, запросов в секунду; 0 — без ограничения)
+    api_rate_limit: float = 20.0
+    api_rate_burst: int = 40
+    
+    # API Retries and Circuit Breaker
+    api_retries: int = 3
+    api_retry_backoff: float = 0.5
+    api_retry_backoff_max: float = 5.0
+    api_breaker_threshold: int = 5
+    api_breaker_reset_timeout: float = 30.0
+    
+    # API HTTP Connection Pool
+    api_pool_max_connections: int = 50
+    api_pool_max_keepalive: int = 20
+    api_keepalive_expiry: float = 30.0
+    api_http2: bool = False
+    api_connect_timeout: float = 5.0
+    api_read_timeout: float = 15.0
+    api_write_timeout: float = 10.0
+    api_pool_timeout: float = 5.0
+    api_connect_retries: int = 1
+    
+    # Bulk reads (export, mass operations) parse list responses incrementally without SDK models
+    api_streaming_reads: bool = True
+    
+    # Large responses are validated/dumped in a worker thread pool (КБ тела, 0 — всегда в event loop)
+    api_offload_threshold_kb: int = 256
+    api_offload_workers: int = 2
+    
+    # Latency/fault injection for panel requests (dev only, see src/services/fault_injection.py)
+    api_fault_injection: str = ""
+    api_fault_seed: Optional[int] = None
+    
+    # Time budget for panel calls while handling one update (сек, 0 — без ограничения)
+    handler_deadline: float = 10.0
+    
+    # Handlers slower than this are logged with their callback data (сек, 0 — не логировать)
+    slow_handler_threshold: float = 3.0
+    
+    # Tracing: update -> handler -> API/cache/Bot API spans (jsonl or otlp exporter)
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.1
+    tracing_exporter: str = "jsonl"
+    tracing_jsonl_path: str = "logs/traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    
+    # Event loop lag monitor; loop blocked longer than threshold logs stack samples (сек, 0 — без стеков)
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.05
+    loop_lag_threshold: float = 0.25
+    
+    # Prometheus metrics endpoint (GET /metrics), off by default
+    metrics_enabled: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9090
+    
+    # Conversation state: abandoned flows end and their data expires after this (сек, 0 — без TTL)
+    conversation_timeout: float = 1800.0
+    conversation_state_max_bytes: int = 262144
+    
+    # Progress Messages (минимальный интервал между редактированиями, сек)
+    progress_update_interval: float = 3.0
+    
     @property
     def admin_id_list(self) -> List[int]:
         """Parse admin IDs from comma-separated string"""
@@ -48,6 +133,11 @@ class Settings(BaseSettings):
         except (ValueError, AttributeError):
             return []
     
+    @property
+    def use_persistence(self) -> bool:
+        """Persist conversations only when Redis is available"""
+        return self.persistence_enabled and self.redis_enabled
+    
     @property
     def is_debug(self) -> bool:
         """Check if debug mode is enabled"""
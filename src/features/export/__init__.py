@@ -0,0 +1,6 @@
+"""
+Users export feature module
+"""
+from .handlers import register_export_handlers
+
+__all__ = ['register_export_handlers']
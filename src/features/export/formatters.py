@@ -0,0 +1,49 @@
+"""
+Users export formatters
+"""
+from src.utils.progress import ProgressReporter
+
+from .exporter import ExportOptions, ExportResult
+
+
+def format_export_menu(options: ExportOptions) -> str:
+    """Format export settings screen"""
+    columns = ", ".join(f"<code>{c}</code>" for c in options.columns) or "—"
+
+    text = f"""
+📤 <b>Экспорт пользователей</b>
+
+Все пользователи панели будут выгружены в сжатый файл (gzip).
+
+<b>Формат:</b> {options.fmt.upper()}
+<b>Статус:</b> {options.status or 'Все'}
+<b>Истекает в течение:</b> {f'{options.expires_within_days} дн.' if options.expires_within_days is not None else 'Любой срок'}
+<b>Колонки:</b> {columns}
+    """
+
+    return text.strip()
+
+
+def format_export_progress(progress: ProgressReporter) -> str:
+    """Format export progress (success counter holds written rows)"""
+    return (
+        f"⏳ <b>Экспорт пользователей...</b>\n\n"
+        f"Обработано: {progress.done} / {progress.total}\n"
+        f"Записано: {progress.success}\n\n"
+        f"{progress.speed_line()}"
+    )
+
+
+def format_export_result(result: ExportResult) -> str:
+    """Format export summary"""
+    text = f"""
+✅ <b>Экспорт завершён</b>
+
+📊 <b>Статистика:</b>
+├ Просмотрено: {result.scanned}
+├ Выгружено: {result.rows}
+├ Время: {result.elapsed:.1f} с
+└ Скорость: {result.rows_per_second:.0f} строк/с
+    """
+
+    return text.strip()
@@ -0,0 +1,199 @@
+"""
+Users export handlers
+"""
+from datetime import datetime
+
+from telegram import Update, InputFile
+from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler
+from telegram.constants import ParseMode
+
+from src.core.config import settings
+from src.core.logger import log
+from src.middleware.auth import admin_only
+from src.services.api import RemnaWaveAPIError
+from src.services.rate_limiter import background_lane
+from src.utils.progress import ProgressReporter
+
+from . import keyboards as export_kb
+from . import formatters as export_fmt
+from .exporter import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    ExportOptions,
+    export_users,
+)
+
+STATUS_FILTERS = (None, "ACTIVE", "DISABLED", "LIMITED", "EXPIRED")
+EXPIRE_FILTERS = (None, 7, 30)
+
+
+def _get_options(context: ContextTypes.DEFAULT_TYPE) -> ExportOptions:
+    return ExportOptions.from_dict(context.user_data.get('export_options'))
+
+
+def _save_options(context: ContextTypes.DEFAULT_TYPE, options: ExportOptions):
+    context.user_data['export_options'] = options.to_dict()
+
+
+def _next(values: tuple, current):
+    """Cycle to the next value of a filter"""
+    index = values.index(current) if current in values else -1
+    return values[(index + 1) % len(values)]
+
+
+@admin_only
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /export command"""
+    options = _get_options(context)
+
+    await update.message.reply_text(
+        export_fmt.format_export_menu(options),
+        reply_markup=export_kb.export_menu(options),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def export_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show export settings menu"""
+    query = update.callback_query
+    await query.answer()
+
+    options = _get_options(context)
+
+    await query.edit_message_text(
+        export_fmt.format_export_menu(options),
+        reply_markup=export_kb.export_menu(options),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def export_toggle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cycle format, status or expiration filter"""
+    query = update.callback_query
+    await query.answer()
+
+    options = _get_options(context)
+
+    if query.data == "export_fmt":
+        options.fmt = _next(EXPORT_FORMATS, options.fmt)
+    elif query.data == "export_status":
+        options.status = _next(STATUS_FILTERS, options.status)
+    elif query.data == "export_expire":
+        options.expires_within_days = _next(EXPIRE_FILTERS, options.expires_within_days)
+
+    _save_options(context, options)
+
+    await query.edit_message_text(
+        export_fmt.format_export_menu(options),
+        reply_markup=export_kb.export_menu(options),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def export_columns_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show column selection or toggle a column"""
+    query = update.callback_query
+
+    options = _get_options(context)
+
+    if query.data.startswith("export_col:"):
+        column = query.data.split(":", 1)[1]
+        if column in options.columns:
+            if len(options.columns) == 1:
+                await query.answer("Нужна хотя бы одна колонка", show_alert=True)
+                return
+            options.columns.remove(column)
+        elif column in EXPORT_COLUMNS:
+            # Сохраняем порядок колонок как в EXPORT_COLUMNS
+            selected = set(options.columns) | {column}
+            options.columns = [c for c in EXPORT_COLUMNS if c in selected]
+        _save_options(context, options)
+
+    await query.answer()
+
+    await query.edit_message_text(
+        "📋 <b>Выберите колонки для экспорта:</b>",
+        reply_markup=export_kb.columns_menu(options),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def export_run_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Stream users into a gzip file and send it as a document"""
+    query = update.callback_query
+    await query.answer()
+
+    options = _get_options(context)
+
+    await query.edit_message_text(
+        "⏳ <b>Экспорт пользователей...</b>",
+        parse_mode=ParseMode.HTML
+    )
+
+    progress = ProgressReporter.for_message(
+        query.message,
+        "Экспорт пользователей",
+        render=lambda reporter, final: export_fmt.format_export_progress(reporter)
+    )
+
+    async def on_progress(scanned: int, written: int, total: int):
+        await progress.set(scanned, written, 0, total=total)
+
+    try:
+        with background_lane():
+            result = await export_users(
+                options,
+                page_size=settings.export_page_size,
+                on_progress=on_progress
+            )
+
+        log.info(
+            f"Users export finished: {result.rows}/{result.scanned} rows "
+            f"in {result.elapsed:.1f}s ({result.rows_per_second:.0f} rows/s)"
+        )
+
+        filename = f"users_{datetime.now().strftime('%Y%m%d_%H%M')}.{options.fmt}.gz"
+        with result.file:
+            await query.message.reply_document(
+                document=InputFile(result.file, filename=filename),
+                caption=f"📤 Пользователей: {result.rows}"
+            )
+
+        await progress.finish(
+            export_fmt.format_export_result(result),
+            reply_markup=export_kb.export_menu(options)
+        )
+
+    except RemnaWaveAPIError as e:
+        log.error(f"Error exporting users: {e}")
+        await query.edit_message_text(
+            f"❌ <b>Ошибка экспорта:</b>\n{str(e)}",
+            reply_markup=export_kb.export_menu(options),
+            parse_mode=ParseMode.HTML
+        )
+    except Exception as e:
+        log.exception("Unexpected error in users export")
+        await query.edit_message_text(
+            "❌ <b>Произошла ошибка при экспорте</b>",
+            reply_markup=export_kb.export_menu(options),
+            parse_mode=ParseMode.HTML
+        )
+
+
+def register_export_handlers(application):
+    """Register all users export handlers"""
+    application.add_handler(CommandHandler("export", export_command))
+    application.add_handler(CallbackQueryHandler(export_menu_callback, pattern="^export_menu$"))
+    application.add_handler(CallbackQueryHandler(
+        export_toggle_callback, pattern="^export_(fmt|status|expire)$"
+    ))
+    application.add_handler(CallbackQueryHandler(
+        export_columns_callback, pattern="^export_col(umns$|:)"
+    ))
+    application.add_handler(CallbackQueryHandler(export_run_callback, pattern="^export_run$"))
+
+    log.info("✅ Export feature handlers registered")
@@ -0,0 +1,51 @@
+"""
+Users export keyboards
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from .exporter import EXPORT_COLUMNS, ExportOptions
+
+
+def export_menu(options: ExportOptions) -> InlineKeyboardMarkup:
+    """Export settings menu"""
+    status_text = options.status or "Все"
+    if options.expires_within_days is None:
+        expire_text = "Любой"
+    else:
+        expire_text = f"≤ {options.expires_within_days} дн."
+
+    keyboard = [
+        [
+            InlineKeyboardButton(f"📄 Формат: {options.fmt.upper()}", callback_data="export_fmt"),
+        ],
+        [
+            InlineKeyboardButton(f"🔄 Статус: {status_text}", callback_data="export_status"),
+            InlineKeyboardButton(f"📅 Истекает: {expire_text}", callback_data="export_expire"),
+        ],
+        [
+            InlineKeyboardButton(
+                f"📋 Колонки ({len(options.columns)})", callback_data="export_columns"
+            ),
+        ],
+        [
+            InlineKeyboardButton("📤 Экспортировать", callback_data="export_run"),
+        ],
+        [
+            InlineKeyboardButton("◀️ Назад", callback_data="users_menu"),
+        ],
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def columns_menu(options: ExportOptions) -> InlineKeyboardMarkup:
+    """Column selection keyboard, two columns per row"""
+    buttons = [
+        InlineKeyboardButton(
+            f"{'✅' if column in options.columns else '▫️'} {column}",
+            callback_data=f"export_col:{column}"
+        )
+        for column in EXPORT_COLUMNS
+    ]
+    keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+    keyboard.append([InlineKeyboardButton("◀️ Готово", callback_data="export_menu")])
+    return InlineKeyboardMarkup(keyboard)
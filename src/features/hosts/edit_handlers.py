@@ -11,9 +11,11 @@ from telegram.ext import (
 )
 from telegram.constants import ParseMode
 
+from src.core.config import settings
 from src.core.logger import log
 from src.middleware.auth import admin_only
 from src.services.api import api_client, RemnaWaveAPIError
+from src.services.state_store import state_store
 
 from remnawave.enums.alpn import ALPN
 from remnawave.enums.fingerprint import Fingerprint
@@ -50,7 +52,7 @@ async def host_edit_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return ConversationHandler.END
         
         # Store host data
-        context.user_data['current_host'] = host
+        context.user_data.set_ref('current_host', host)
         
         # Show current settings with edit buttons
         text = _format_edit_menu(host)
@@ -463,7 +465,7 @@ async def _save_field_value(update: Update, context: ContextTypes.DEFAULT_TYPE,
         # Fetch updated host data
         response = await api_client.get_host(host_uuid)
         updated_host = response.get('response', {})
-        context.user_data['current_host'] = updated_host
+        context.user_data.set_ref('current_host', updated_host)
         
         # Show updated edit menu
         text = "✅ <b>Изменения сохранены!</b>\n\n" + _format_edit_menu(updated_host)
@@ -627,10 +629,17 @@ def create_host_edit_conversation() -> ConversationHandler:
                 CallbackQueryHandler(host_edit_cancel, pattern="^host_edit_cancel$"),
                 MessageHandler(filters.TEXT & ~filters.COMMAND, host_field_text_input),
             ],
+            ConversationHandler.TIMEOUT: [state_store.timeout_handler(
+                'editing_host_uuid', 'current_host', 'editing_field', 'field_value',
+                'last_bot_message_id', 'text_input_chat_id', 'text_input_message_id'
+            )],
         },
         fallbacks=[
             CallbackQueryHandler(host_edit_cancel, pattern="^host_edit_cancel$"),
         ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="host_edit",
+        persistent=settings.use_persistence,
         per_message=False,
         per_chat=True,
         per_user=True,
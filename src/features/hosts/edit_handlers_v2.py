@@ -31,7 +31,7 @@ async def host_edit_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Store in context
         context.user_data['editing_host_uuid'] = host_uuid
-        context.user_data['current_host'] = host
+        context.user_data.set_ref('current_host', host)
         
         # Show edit menu
         text = _format_edit_menu(host)
@@ -318,7 +318,7 @@ async def _update_host_field(context, host_uuid, field, value, chat_id, message_
         response = await api_client.get_host(host_uuid)
         if response and 'response' in response:
             host = response['response']
-            context.user_data['current_host'] = host
+            context.user_data.set_ref('current_host', host)
         
         # Show updated menu
         text = f"✅ Поле обновлено!\n\n{_format_edit_menu(host)}"
@@ -8,6 +8,7 @@ from telegram.constants import ParseMode
 from src.core.logger import log
 from src.middleware.auth import admin_only
 from src.services.api import api_client, RemnaWaveAPIError
+from src.utils.formatters import formatters
 
 from . import keyboards as host_kb
 from . import formatters as host_fmt
@@ -74,7 +75,7 @@ async def hosts_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         await query.edit_message_text(
-            text.strip(),
+            text.strip() + formatters.format_stale_note(response),
             reply_markup=reply_markup,
             parse_mode=ParseMode.HTML
         )
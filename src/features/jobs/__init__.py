@@ -0,0 +1,6 @@
+"""
+Background jobs feature module
+"""
+from .handlers import register_jobs_handlers
+
+__all__ = ['register_jobs_handlers']
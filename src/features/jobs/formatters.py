@@ -0,0 +1,81 @@
+"""
+Background jobs formatters
+"""
+from datetime import datetime
+from typing import List
+
+from src.services.concurrency import api_limiter
+from src.services.jobs import Job, JobStatus
+
+STATUS_BADGES = {
+    JobStatus.PENDING: "🕓",
+    JobStatus.RUNNING: "⏳",
+    JobStatus.COMPLETED: "✅",
+    JobStatus.FAILED: "❌",
+    JobStatus.CANCELLED: "⏹",
+}
+
+STATUS_NAMES = {
+    JobStatus.PENDING: "В очереди",
+    JobStatus.RUNNING: "Выполняется",
+    JobStatus.COMPLETED: "Завершена",
+    JobStatus.FAILED: "Ошибка",
+    JobStatus.CANCELLED: "Отменена",
+}
+
+
+def status_badge(job: Job) -> str:
+    """Emoji for job status"""
+    return STATUS_BADGES.get(job.status, "❓")
+
+
+def format_timestamp(ts: float) -> str:
+    """Format unix timestamp"""
+    return datetime.fromtimestamp(ts).strftime("%d.%m.%Y %H:%M:%S")
+
+
+def format_job_short(job: Job) -> str:
+    """Format job in one line for buttons"""
+    progress = f"{job.processed}/{job.total}" if job.total else "—"
+    return f"{status_badge(job)} #{job.id} {job.title[:30]} ({progress})"
+
+
+def format_jobs_list(jobs: List[Job]) -> str:
+    """Format jobs list header"""
+    if not jobs:
+        return "📋 <b>Фоновые задачи</b>\n\nЗадач пока нет"
+
+    active = sum(1 for job in jobs if job.is_active)
+    text = "📋 <b>Фоновые задачи</b>\n"
+    text += f"<i>Активных: {active}, всего: {len(jobs)}</i>\n"
+    text += f"<i>Параллельность API: {api_limiter.limit} (в работе {api_limiter.in_flight})</i>\n\n"
+    text += "Выберите задачу:"
+    return text
+
+
+def format_job_full(job: Job) -> str:
+    """Format full job information"""
+    percent = f" ({job.processed * 100 // job.total}%)" if job.total else ""
+
+    text = f"""
+{status_badge(job)} <b>Задача #{job.id}</b>
+
+<b>Операция:</b> {job.title}
+<b>Статус:</b> {STATUS_NAMES.get(job.status, job.status)}
+
+📊 <b>Прогресс:</b>
+├ Обработано: {job.processed} / {job.total}{percent}
+├ Успешно: {job.success}
+└ Ошибок: {job.failed}
+
+📅 <b>Создана:</b> {format_timestamp(job.created_at)}
+🔄 <b>Обновлена:</b> {format_timestamp(job.updated_at)}
+    """
+
+    if job.cancel_requested and job.is_active:
+        text += "\n⏹ <i>Отмена запрошена...</i>"
+
+    if job.error:
+        text += f"\n❌ <b>Ошибка:</b> {job.error}"
+
+    return text.strip()
@@ -0,0 +1,99 @@
+"""
+Background jobs handlers
+"""
+from telegram import Update
+from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler
+from telegram.constants import ParseMode
+
+from src.core.logger import log
+from src.middleware.auth import admin_only
+from src.services.jobs import job_manager
+
+from . import keyboards as jobs_kb
+from . import formatters as jobs_fmt
+
+# Сколько последних задач показывать в списке
+JOBS_LIST_LIMIT = 10
+
+
+@admin_only
+async def jobs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /jobs command"""
+    jobs = job_manager.list_jobs(JOBS_LIST_LIMIT)
+
+    await update.message.reply_text(
+        jobs_fmt.format_jobs_list(jobs),
+        reply_markup=jobs_kb.jobs_list(jobs),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def jobs_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show background jobs list"""
+    query = update.callback_query
+    await query.answer()
+
+    jobs = job_manager.list_jobs(JOBS_LIST_LIMIT)
+
+    await query.edit_message_text(
+        jobs_fmt.format_jobs_list(jobs),
+        reply_markup=jobs_kb.jobs_list(jobs),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def job_view_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show job details"""
+    query = update.callback_query
+    await query.answer()
+
+    job_id = query.data.split(":", 1)[1]
+    job = job_manager.get(job_id)
+
+    if not job:
+        jobs = job_manager.list_jobs(JOBS_LIST_LIMIT)
+        await query.edit_message_text(
+            "❌ Задача не найдена",
+            reply_markup=jobs_kb.jobs_list(jobs),
+            parse_mode=ParseMode.HTML
+        )
+        return
+
+    await query.edit_message_text(
+        jobs_fmt.format_job_full(job),
+        reply_markup=jobs_kb.job_actions(job),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def job_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Request job cancellation"""
+    query = update.callback_query
+
+    job_id = query.data.split(":", 1)[1]
+
+    if not await job_manager.cancel(job_id):
+        await query.answer("Задача уже завершена", show_alert=True)
+    else:
+        await query.answer("⏹ Отмена запрошена")
+
+    job = job_manager.get(job_id)
+    if job:
+        await query.edit_message_text(
+            jobs_fmt.format_job_full(job),
+            reply_markup=jobs_kb.job_actions(job),
+            parse_mode=ParseMode.HTML
+        )
+
+
+def register_jobs_handlers(application):
+    """Register all background jobs handlers"""
+    application.add_handler(CommandHandler("jobs", jobs_command))
+    application.add_handler(CallbackQueryHandler(jobs_list_callback, pattern="^jobs_list$"))
+    application.add_handler(CallbackQueryHandler(job_view_callback, pattern="^job_view:"))
+    application.add_handler(CallbackQueryHandler(job_cancel_callback, pattern="^job_cancel:"))
+
+    log.info("✅ Jobs feature handlers registered")
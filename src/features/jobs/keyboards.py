@@ -0,0 +1,34 @@
+"""
+Background jobs keyboards
+"""
+from typing import List
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from src.services.jobs import Job
+
+from . import formatters as jobs_fmt
+
+
+def jobs_list(jobs: List[Job]) -> InlineKeyboardMarkup:
+    """Jobs list with a button per job"""
+    keyboard = [
+        [InlineKeyboardButton(jobs_fmt.format_job_short(job), callback_data=f"job_view:{job.id}")]
+        for job in jobs
+    ]
+    keyboard.append([
+        InlineKeyboardButton("🔄 Обновить", callback_data="jobs_list"),
+        InlineKeyboardButton("◀️ Главное меню", callback_data="main_menu"),
+    ])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def job_actions(job: Job) -> InlineKeyboardMarkup:
+    """Job action buttons"""
+    keyboard = [[InlineKeyboardButton("🔄 Обновить", callback_data=f"job_view:{job.id}")]]
+
+    if job.is_active and not job.cancel_requested:
+        keyboard.append([InlineKeyboardButton("⏹ Отменить", callback_data=f"job_cancel:{job.id}")])
+
+    keyboard.append([InlineKeyboardButton("◀️ К списку задач", callback_data="jobs_list")])
+    return InlineKeyboardMarkup(keyboard)
@@ -7,10 +7,10 @@ from telegram.constants import ParseMode
 
 from src.core.logger import log
 from src.middleware.auth import admin_only
-from src.services.api import api_client, RemnaWaveAPIError
+from src.services.jobs import job_manager
 
 from . import keyboards as mass_kb
-from . import formatters as mass_fmt
+from .jobs import MASS_OPERATION_JOB, operation_title, parse_operation, run_mass_operation
 
 
 @admin_only
@@ -153,28 +153,16 @@ async def mass_reset_traffic_confirm_callback(update: Update, context: ContextTy
 
 @admin_only
 async def mass_confirm_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Execute confirmed mass operation"""
+    """Start confirmed mass operation as a background job"""
     query = update.callback_query
     await query.answer()
     
     try:
         operation = query.data.split(":", 1)[1]
         
-        await query.edit_message_text(
-            "⏳ Выполняется массовая операция...\nЭто может занять некоторое время.",
-            parse_mode=ParseMode.HTML
-        )
-        
-        if operation.startswith("extend:"):
-            days = int(operation.split(":")[1])
-            response = await api_client.mass_extend_users(days)
-        elif operation == "activate":
-            response = await api_client.mass_activate_users()
-        elif operation == "deactivate":
-            response = await api_client.mass_deactivate_users()
-        elif operation == "reset_traffic":
-            response = await api_client.mass_reset_traffic()
-        else:
+        try:
+            params = parse_operation(operation)
+        except ValueError:
             await query.edit_message_text(
                 "❌ Неизвестная операция",
                 reply_markup=mass_kb.mass_menu(),
@@ -182,22 +170,29 @@ async def mass_confirm_callback(update: Update, context: ContextTypes.DEFAULT_TY
             )
             return
         
-        result = response.get('response', {})
-        text = mass_fmt.format_operation_result(result)
-        
-        await query.edit_message_text(
-            text,
-            reply_markup=mass_kb.mass_menu(),
-            parse_mode=ParseMode.HTML
+        title = operation_title(params)
+        job = await job_manager.submit(
+            MASS_OPERATION_JOB,
+            params,
+            title=title,
+            chat_id=query.message.chat_id,
+            message_id=query.message.message_id
         )
         
-    except RemnaWaveAPIError as e:
-        log.error(f"Error in mass operation: {e}")
+        text = f"""
+🚀 <b>Задача #{job.id} запущена в фоне</b>
+
+{title}
+
+Прогресс можно посмотреть в /jobs
+        """
+        
         await query.edit_message_text(
-            f"❌ <b>Ошибка:</b>\n{str(e)}",
-            reply_markup=mass_kb.mass_menu(),
+            text.strip(),
+            reply_markup=mass_kb.job_started(job.id),
             parse_mode=ParseMode.HTML
         )
+        
     except Exception as e:
         log.exception("Unexpected error in mass operation")
         await query.edit_message_text(
@@ -217,4 +212,11 @@ def register_mass_handlers(application):
     application.add_handler(CallbackQueryHandler(mass_reset_traffic_confirm_callback, pattern="^mass_reset_traffic$"))
     application.add_handler(CallbackQueryHandler(mass_confirm_callback, pattern="^mass_confirm:"))
     
+    job_manager.register(
+        MASS_OPERATION_JOB,
+        run_mass_operation,
+        finished_markup=lambda job: mass_kb.mass_menu(),
+        progress_markup=lambda job: mass_kb.job_started(job.id)
+    )
+    
     log.info("✅ Mass operations feature handlers registered")
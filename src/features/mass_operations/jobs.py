@@ -0,0 +1,142 @@
+"""
+Mass operations background job runner
+"""
+import asyncio
+from typing import Any, Dict
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.api import api_client
+from src.services.concurrency import api_limiter
+from src.services.jobs import JobContext
+
+from . import formatters as mass_fmt
+
+MASS_OPERATION_JOB = "mass_operation"
+
+OPERATION_TITLES = {
+    "activate": "Активация всех пользователей",
+    "deactivate": "Деактивация всех пользователей",
+    "reset_traffic": "Сброс трафика всем пользователям",
+    "extend": "Продление всем пользователям",
+}
+
+# Повтор меняет результат: продление дважды добавляет дни дважды
+NON_IDEMPOTENT_OPERATIONS = frozenset({"extend"})
+
+# Состояния пользователя в журнале задачи
+ITEM_STARTED = "started"
+ITEM_OK = "ok"
+ITEM_FAILED = "failed"
+
+
+def operation_title(params: Dict[str, Any]) -> str:
+    """Human readable title of a mass operation"""
+    title = OPERATION_TITLES.get(params.get("operation"), "Массовая операция")
+    if params.get("operation") == "extend":
+        title += f" на {params.get('days')} дн."
+    return title
+
+
+def parse_operation(operation: str) -> Dict[str, Any]:
+    """Convert confirmation callback payload into job params"""
+    if operation.startswith("extend:"):
+        return {"operation": "extend", "days": int(operation.split(":")[1])}
+    if operation in ("activate", "deactivate", "reset_traffic"):
+        return {"operation": operation}
+    raise ValueError(f"Unknown mass operation: {operation}")
+
+
+async def _apply(params: Dict[str, Any], user_uuid: str):
+    """Apply the operation to a single user"""
+    operation = params["operation"]
+    if operation == "activate":
+        await api_client.update_user(user_uuid, {"status": "ACTIVE"})
+    elif operation == "deactivate":
+        await api_client.update_user(user_uuid, {"status": "DISABLED"})
+    elif operation == "reset_traffic":
+        await api_client.reset_user_traffic(user_uuid)
+    elif operation == "extend":
+        await api_client.extend_user_subscription(user_uuid, params["days"])
+
+
+async def run_mass_operation(ctx: JobContext) -> str:
+    """
+    Walk all users page by page and apply the operation in chunks
+
+    The outcome for every user is recorded as soon as it is known, and a
+    resumed job skips users by UUID, so users created or deleted in the
+    meantime do not shift it. Non-idempotent operations also record the
+    start of each call: a user whose call was in flight when the bot died
+    is not repeated but counted as failed, since its result is unknown.
+    """
+    job = ctx.job
+    params = job.params
+    page_size = params.setdefault("page_size", settings.mass_page_size)
+    chunk_size = max(1, settings.mass_chunk_size)
+    repeatable = params.get("operation") not in NON_IDEMPOTENT_OPERATIONS
+
+    items = await ctx.load_items()
+    if items:
+        unknown = [uuid for uuid, state in items.items() if state == ITEM_STARTED]
+        if unknown and not repeatable:
+            log.warning(
+                f"Job {job.id}: {len(unknown)} users were in progress before the restart, "
+                f"they are not processed again and counted as failed"
+            )
+            for uuid in unknown:
+                items[uuid] = ITEM_FAILED
+                await ctx.mark_item(uuid, ITEM_FAILED)
+        job.success = sum(1 for state in items.values() if state == ITEM_OK)
+        job.failed = sum(1 for state in items.values() if state == ITEM_FAILED)
+    handled = {uuid for uuid, state in items.items() if state != ITEM_STARTED}
+    job.processed = len(handled)
+
+    async def apply_one(user_uuid: str) -> bool:
+        if not repeatable:
+            await ctx.mark_item(user_uuid, ITEM_STARTED)
+        try:
+            await api_limiter.run(_apply, params, user_uuid)
+            ok = True
+        except Exception as e:
+            log.error(f"Job {job.id}: failed for user {user_uuid}: {e}")
+            ok = False
+        await ctx.mark_item(user_uuid, ITEM_OK if ok else ITEM_FAILED)
+        return ok
+
+    page = 1
+    while True:
+        ctx.raise_if_cancelled()
+
+        response = await api_client.get_users_bulk(page=page, limit=page_size)
+        data = response.get('response', {})
+        users = data.get('users', [])
+        job.total = int(data.get('total', 0))
+
+        if not users:
+            break
+
+        pending = [
+            str(user['uuid']) for user in users
+            if user.get('uuid') and str(user['uuid']) not in handled
+        ]
+        for start in range(0, len(pending), chunk_size):
+            ctx.raise_if_cancelled()
+            chunk = pending[start:start + chunk_size]
+            results = await asyncio.gather(*(apply_one(user_uuid) for user_uuid in chunk))
+
+            handled.update(chunk)
+            job.success += sum(results)
+            job.failed += len(results) - sum(results)
+            job.processed = len(handled)
+            await ctx.checkpoint(page=page)
+            await ctx.report_progress()
+
+        if page * page_size >= job.total:
+            break
+        page += 1
+
+    return mass_fmt.format_operation_result({
+        "successCount": job.success,
+        "failedCount": job.failed
+    })
@@ -19,6 +19,9 @@ def mass_menu() -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton("🔄 Сбросить трафик всем", callback_data="mass_reset_traffic"),
         ],
+        [
+            InlineKeyboardButton("📋 Фоновые задачи", callback_data="jobs_list"),
+        ],
         [
             InlineKeyboardButton("◀️ Назад", callback_data="main_menu"),
         ],
@@ -64,6 +67,20 @@ def confirmation_keyboard(operation: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+def job_started(job_id: str) -> InlineKeyboardMarkup:
+    """Buttons shown after a mass operation was queued"""
+    keyboard = [
+        [
+            InlineKeyboardButton("📋 Статус задачи", callback_data=f"job_view:{job_id}"),
+            InlineKeyboardButton("⏹ Отменить", callback_data=f"job_cancel:{job_id}"),
+        ],
+        [
+            InlineKeyboardButton("◀️ Массовые операции", callback_data="mass_menu"),
+        ],
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
 def back_to_main() -> InlineKeyboardMarkup:
     """Back to main menu"""
     keyboard = [[InlineKeyboardButton("◀️ Главное меню", callback_data="main_menu")]]
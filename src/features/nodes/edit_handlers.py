@@ -38,7 +38,7 @@ async def node_edit_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Store node data in context
         context.user_data['editing_node_uuid'] = node_uuid
-        context.user_data['current_node'] = node
+        context.user_data.set_ref('current_node', node)
         
         # Show edit menu
         keyboard = [
@@ -8,6 +8,7 @@ from telegram.constants import ParseMode
 from src.core.logger import log
 from src.middleware.auth import admin_only
 from src.services.api import api_client, RemnaWaveAPIError
+from src.utils.formatters import formatters
 
 from . import keyboards as node_kb
 from . import formatters as node_fmt
@@ -111,7 +112,7 @@ async def nodes_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         await query.edit_message_text(
-            text.strip(),
+            text.strip() + formatters.format_stale_note(response),
             reply_markup=reply_markup,
             parse_mode=ParseMode.HTML
         )
@@ -0,0 +1,6 @@
+"""
+Runtime performance feature module
+"""
+from .handlers import register_perf_handlers
+
+__all__ = ['register_perf_handlers']
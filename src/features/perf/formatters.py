@@ -0,0 +1,108 @@
+"""
+Runtime performance formatters
+"""
+from typing import Any, Dict, Optional
+
+from src.services.memory_profiler import MemoryReport, format_bytes
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    """Seconds as milliseconds, dash when there is no data"""
+    if seconds is None:
+        return "—"
+    return f"{seconds * 1000:.0f}"
+
+
+def format_size(size: Optional[int]) -> str:
+    """Bytes as MiB"""
+    if size is None:
+        return "—"
+    return f"{size / 1024 / 1024:.1f} МБ"
+
+
+def format_uptime(seconds: float) -> str:
+    """Uptime as days, hours and minutes"""
+    minutes = int(seconds) // 60
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days} д {hours} ч {minutes} мин"
+    return f"{hours} ч {minutes} мин"
+
+
+def format_perf(stats: Dict[str, Any]) -> str:
+    """Format the /perf screen"""
+    text = "⚡️ <b>Производительность бота</b>\n"
+    text += f"<i>Аптайм: {format_uptime(stats['uptime'])}</i>\n\n"
+
+    text += "🌐 <b>API панели</b> (p50 / p95 / p99, мс):\n"
+    methods = stats["api_methods"]
+    if not methods:
+        text += "└ Запросов пока не было\n"
+    for i, item in enumerate(methods):
+        branch = "└" if i == len(methods) - 1 else "├"
+        errors = f", ошибок {item['errors']}" if item["errors"] else ""
+        text += (
+            f"{branch} <code>{item['method']}</code>: "
+            f"{format_ms(item['p50'])} / {format_ms(item['p95'])} / {format_ms(item['p99'])}"
+            f" ({item['calls']}{errors})\n"
+        )
+
+    ratio = stats["cache_hit_ratio"]
+    text += "\n💾 <b>Кэш:</b> "
+    if ratio is None:
+        text += "обращений пока не было\n"
+    else:
+        text += f"{ratio * 100:.1f}% попаданий ({stats['cache_hits']}/{stats['cache_lookups']})\n"
+    if stats["cache_errors"]:
+        text += f"└ Ошибок: {stats['cache_errors']}\n"
+
+    text += f"""
+🔄 <b>Нагрузка:</b>
+├ Апдейтов в обработке: {stats['updates_in_flight']}
+├ Фоновых задач: {stats['jobs_active']}
+└ Запросов к API: {stats['api_in_flight']} / {stats['api_limit']}
+"""
+
+    loop = stats["loop"]
+    if stats["loop_monitor"]:
+        text += f"""
+⏱ <b>Задержка event loop</b> (мс):
+├ Текущая: {loop['last_lag_ms']:.1f}
+├ p99: {loop['p99_lag_ms']:.1f}
+├ Максимум: {loop['max_lag_ms']:.1f}
+└ Блокировок: {loop['blocked_events']}
+"""
+    else:
+        text += "\n⏱ <b>Задержка event loop:</b> мониторинг выключен\n"
+
+    conversations = stats["conversations"]
+    text += f"""
+💬 <b>Состояние диалогов:</b> сессий {conversations['sessions']}, ключей {conversations['keys']}, \
+сущностей {conversations['entities']}, ~{format_bytes(conversations['bytes'])}
+"""
+
+    text += f"""
+🧠 <b>Память (RSS):</b> {format_size(stats['rss_bytes'])}
+🚦 <b>Ответов 429 от Telegram:</b> {stats['telegram_429']}
+"""
+    return text.strip()
+
+
+def format_memsnap_caption(report: MemoryReport, started: bool) -> str:
+    """Caption for a memory snapshot document"""
+    text = f"🧠 <b>Снимок памяти #{report.number}</b>\n"
+    text += f"Отслежено: {format_bytes(report.traced_bytes)}, пик: {format_bytes(report.peak_bytes)}\n"
+    if report.growth_bytes is not None:
+        sign = "+" if report.growth_bytes >= 0 else ""
+        text += f"Рост с прошлого снимка: {sign}{format_bytes(report.growth_bytes)}\n"
+    if started:
+        text += "\n<i>tracemalloc запущен только что: учитываются аллокации после этого момента. "
+        text += "Повторите /memsnap позже, чтобы увидеть рост.</i>\n"
+    text += "\n<i>Трассировка замедляет бота — остановите её командой /memsnap stop</i>"
+    return text
+
+
+def format_memsnap_stopped() -> str:
+    """tracemalloc stopped"""
+    return "🧠 Трассировка памяти остановлена, снимки удалены"
@@ -0,0 +1,72 @@
+"""
+Runtime performance handlers
+"""
+import io
+from datetime import datetime
+
+from telegram import Update, InputFile
+from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler
+from telegram.constants import ParseMode
+
+from src.core.logger import log
+from src.middleware.auth import admin_only
+from src.services.memory_profiler import memory_profiler
+
+from . import formatters as perf_fmt
+from . import keyboards as perf_kb
+from .stats import collect
+
+
+@admin_only
+async def perf_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /perf command"""
+    await update.message.reply_text(
+        perf_fmt.format_perf(collect()),
+        reply_markup=perf_kb.perf_actions(),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def perf_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Refresh runtime statistics"""
+    query = update.callback_query
+    await query.answer()
+
+    await query.edit_message_text(
+        perf_fmt.format_perf(collect()),
+        reply_markup=perf_kb.perf_actions(),
+        parse_mode=ParseMode.HTML
+    )
+
+
+@admin_only
+async def memsnap_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /memsnap [stop] command: tracemalloc snapshot with a diff as a document"""
+    if context.args and context.args[0].lower() == "stop":
+        await memory_profiler.stop()
+        await update.message.reply_text(
+            perf_fmt.format_memsnap_stopped(),
+            parse_mode=ParseMode.HTML
+        )
+        return
+
+    report = await memory_profiler.snapshot(context.application.user_data)
+    # Первый снимок после старта трассировки
+    started = report.number == 1
+
+    filename = f"memory_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report.number}.txt"
+    await update.message.reply_document(
+        document=InputFile(io.BytesIO(report.text.encode()), filename=filename),
+        caption=perf_fmt.format_memsnap_caption(report, started),
+        parse_mode=ParseMode.HTML
+    )
+
+
+def register_perf_handlers(application):
+    """Register runtime performance handlers"""
+    application.add_handler(CommandHandler("perf", perf_command))
+    application.add_handler(CallbackQueryHandler(perf_callback, pattern="^perf$"))
+    application.add_handler(CommandHandler("memsnap", memsnap_command))
+
+    log.info("✅ Perf feature handlers registered")
@@ -0,0 +1,13 @@
+"""
+Runtime performance keyboards
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+
+def perf_actions() -> InlineKeyboardMarkup:
+    """Refresh and back buttons"""
+    keyboard = [[
+        InlineKeyboardButton("🔄 Обновить", callback_data="perf"),
+        InlineKeyboardButton("◀️ Главное меню", callback_data="main_menu"),
+    ]]
+    return InlineKeyboardMarkup(keyboard)
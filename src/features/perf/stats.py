@@ -0,0 +1,83 @@
+"""
+Runtime statistics snapshot for the /perf screen
+Everything is read from in-process counters, nothing calls the panel
+"""
+import os
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from src.services.concurrency import api_limiter
+from src.services.jobs import job_manager
+from src.services.loop_monitor import loop_monitor
+from src.services.metrics import (
+    api_errors_total,
+    api_request_seconds,
+    cache_requests_total,
+    telegram_rate_limited_total,
+    updates_in_flight,
+)
+from src.services.state_store import state_store
+
+# Сколько методов API показывать (самые частые)
+API_METHODS_LIMIT = 10
+
+STARTED_AT = time.time()
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size; peak RSS where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError):
+        return None
+    # Linux отдаёт КиБ, macOS — байты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def api_methods() -> List[Dict[str, Any]]:
+    """Latency percentiles and errors per API method, most called first"""
+    methods = []
+    for labels in api_request_seconds.label_sets():
+        method = labels["method"]
+        methods.append({
+            "method": method,
+            "calls": api_request_seconds.count(method=method),
+            "p50": api_request_seconds.quantile(0.5, method=method),
+            "p95": api_request_seconds.quantile(0.95, method=method),
+            "p99": api_request_seconds.quantile(0.99, method=method),
+            "errors": int(api_errors_total.total(method=method)),
+        })
+    methods.sort(key=lambda item: item["calls"], reverse=True)
+    return methods[:API_METHODS_LIMIT]
+
+
+def collect() -> Dict[str, Any]:
+    """Snapshot of runtime statistics"""
+    hits = cache_requests_total.value(op="get", result="hit")
+    misses = cache_requests_total.value(op="get", result="miss")
+    lookups = hits + misses
+
+    return {
+        "uptime": time.time() - STARTED_AT,
+        "api_methods": api_methods(),
+        "cache_hits": int(hits),
+        "cache_lookups": int(lookups),
+        "cache_hit_ratio": hits / lookups if lookups else None,
+        "cache_errors": int(cache_requests_total.total(result="error")),
+        "updates_in_flight": int(updates_in_flight.value()),
+        "jobs_active": job_manager.active_count,
+        "api_in_flight": api_limiter.in_flight,
+        "api_limit": api_limiter.limit,
+        "loop": loop_monitor.stats(),
+        "loop_monitor": loop_monitor.running,
+        "rss_bytes": rss_bytes(),
+        "telegram_429": int(telegram_rate_limited_total.total()),
+        "conversations": state_store.sweep(),
+    }
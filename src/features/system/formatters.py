@@ -36,3 +36,15 @@ def format_system_stats(stats: Dict[str, Any]) -> str:
     """
     
     return text.strip()
+
+
+def format_api_pool_stats(pool: Dict[str, Any]) -> str:
+    """Format panel API connection pool state"""
+    text = f"""
+🔌 <b>Соединения с панелью:</b>
+├ Запросов в работе: {pool['in_flight']}
+├ Лимит соединений: {pool['max_connections']}{' (HTTP/2)' if pool['http2'] else ''}
+└ Ждут соединения: {pool['waiting']}
+    """
+    
+    return text.strip()
@@ -8,6 +8,7 @@ from telegram.constants import ParseMode
 from src.core.logger import log
 from src.middleware.auth import admin_only
 from src.services.api import api_client, RemnaWaveAPIError
+from src.utils.formatters import formatters
 
 from . import keyboards as sys_kb
 from . import formatters as sys_fmt
@@ -48,6 +49,8 @@ async def system_stats_callback(update: Update, context: ContextTypes.DEFAULT_TY
         stats = response.get('response', {})
         
         text = sys_fmt.format_system_stats(stats)
+        text += "\n\n" + sys_fmt.format_api_pool_stats(api_client.pool_stats())
+        text += formatters.format_stale_note(response)
         
         await query.edit_message_text(
             text,
@@ -12,6 +12,11 @@ from src.core.logger import log
 from src.core.config import settings
 from src.middleware.auth import admin_only
 from src.services.api import api_client, RemnaWaveAPIError
+from src.services.concurrency import api_limiter
+from src.services.rate_limiter import background_lane
+from src.services.state_store import state_store
+from src.utils.progress import ProgressReporter
+from src.utils.formatters import formatters
 
 from . import keyboards as user_kb
 from . import formatters as user_fmt
@@ -112,7 +117,7 @@ async def users_list_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         await query.edit_message_text(
-            text.strip(),
+            text.strip() + formatters.format_stale_note(response),
             reply_markup=reply_markup,
             parse_mode=ParseMode.HTML
         )
@@ -173,7 +178,7 @@ async def user_view_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         text = user_fmt.format_user_full(user, hwid_count=hwid_count)
         
         await query.edit_message_text(
-            text,
+            text + formatters.format_stale_note(response),
             reply_markup=user_kb.user_actions(user_uuid),
             parse_mode=ParseMode.HTML
         )
@@ -576,38 +581,29 @@ async def user_clear_devices_execute_callback(update: Update, context: ContextTy
             return
         
         # Показываем прогресс
-        progress_text = f"🔄 <b>Удаление устройств...</b>\n\nУдалено: 0 / {total_devices}"
-        await query.edit_message_text(
-            progress_text,
-            parse_mode=ParseMode.HTML
+        progress = ProgressReporter.for_message(
+            query.message, "Удаление устройств...", total=len(devices)
         )
-        
-        # Удаляем каждое устройство
-        deleted_count = 0
-        failed_count = 0
-        
-        for idx, device in enumerate(devices, 1):
-            hwid = device.get('hwid')
-            if hwid:
+        await progress.update(force=True)
+        
+        # Удаляем каждое устройство (долгая операция — вне бюджета времени апдейта)
+        with background_lane():
+            for device in devices:
+                hwid = device.get('hwid')
+                if not hwid:
+                    continue
                 try:
                     await api_client.delete_device(user_uuid, hwid)
-                    deleted_count += 1
-                    
-                    # Обновляем прогресс каждые 3 устройства или на последнем
-                    if idx % 3 == 0 or idx == total_devices:
-                        progress_text = f"🔄 <b>Удаление устройств...</b>\n\nУдалено: {deleted_count} / {total_devices}"
-                        if failed_count > 0:
-                            progress_text += f"\n❌ Ошибок: {failed_count}"
-                        await query.edit_message_text(
-                            progress_text,
-                            parse_mode=ParseMode.HTML
-                        )
+                    await progress.advance(success=True)
                     
                     # Небольшая задержка между запросами
                     await asyncio.sleep(0.1)
                 except Exception as e:
                     log.error(f"Failed to delete device {hwid}: {e}")
-                    failed_count += 1
+                    await progress.advance(success=False)
+        
+        deleted_count = progress.success
+        failed_count = progress.failed
         
         # Финальное сообщение
         result_text = f"""
@@ -620,10 +616,9 @@ async def user_clear_devices_execute_callback(update: Update, context: ContextTy
 <b>Всего обработано:</b> {total_devices}
         """
         
-        await query.edit_message_text(
+        await progress.finish(
             result_text.strip(),
-            reply_markup=user_kb.user_devices_actions(user_uuid, has_devices=False),
-            parse_mode=ParseMode.HTML
+            reply_markup=user_kb.user_devices_actions(user_uuid, has_devices=False)
         )
         
     except RemnaWaveAPIError as e:
@@ -657,7 +652,7 @@ async def user_edit_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     try:
         user_response = await api_client.get_user(user_uuid)
         user = user_response.get('response', {})
-        context.user_data['current_user_data'] = user
+        context.user_data.set_ref('current_user_data', user)
         
         # Форматируем текущие данные
         username = user.get('username', 'N/A')
@@ -1384,26 +1379,27 @@ async def user_search_process(update: Update, context: ContextTypes.DEFAULT_TYPE
         # Если не нашли по UUID, пробуем поиск по имени через список
         if not user:
             try:
-                # Получаем всех пользователей и ищем по username/email
-                users_response = await api_client.get_users(page=1, limit=1000)
+                # Получаем всех пользователей (компактные записи) и ищем по username/email
+                users_response = await api_client.get_user_records(page=1, limit=1000)
                 all_users = users_response.get('response', {}).get('users', [])
                 
                 # Ищем совпадение по различным полям (с поддержкой поиска по подстроке)
                 search_lower = search_query.lower()
                 found_users = []
+                match = None
                 
                 for u in all_users:
-                    username = (u.get('username') or '').lower()
-                    email = (u.get('email') or '').lower()
-                    telegram_id = str(u.get('telegramId') or '')
-                    short_uuid = u.get('shortUuid') or ''
+                    username = u.username.lower()
+                    email = (u.email or '').lower()
+                    telegram_id = str(u.telegram_id or '')
+                    short_uuid = u.short_uuid or ''
                     
                     # Точное совпадение имеет приоритет
                     if (username == search_lower or
                         email == search_lower or
                         telegram_id == search_query or
                         short_uuid == search_query):
-                        user = u
+                        match = u
                         break
                     
                     # Если точного совпадения нет, ищем по подстроке
@@ -1414,25 +1410,24 @@ async def user_search_process(update: Update, context: ContextTypes.DEFAULT_TYPE
                         found_users.append(u)
                 
                 # Если нашли несколько по подстроке
-                if not user and found_users:
+                if not match and found_users:
                     # Если найден только один, показываем его
                     if len(found_users) == 1:
-                        user = found_users[0]
+                        match = found_users[0]
                     else:
                         # Если найдено несколько, показываем список
                         text = f"🔍 <b>Найдено пользователей:</b> {len(found_users)}\n\nЗапрос: <code>{search_query}</code>\n\n"
                         
                         keyboard = []
                         for u in found_users[:10]:  # Показываем максимум 10
-                            username = u.get('username', 'N/A')
-                            status_emoji = user_fmt.status_badge(u.get('status', ''))
-                            short_uuid = u.get('shortUuid', '')[:8]
+                            status_emoji = user_fmt.status_badge(u.status_name)
+                            short_uuid = (u.short_uuid or '')[:8]
                             
-                            button_text = f"{status_emoji} {username} ({short_uuid})"
+                            button_text = f"{status_emoji} {u.username or 'N/A'} ({short_uuid})"
                             keyboard.append([
                                 InlineKeyboardButton(
                                     button_text,
-                                    callback_data=f"user_view_{u.get('uuid')}"
+                                    callback_data=f"user_view_{u.uuid}"
                                 )
                             ])
                         
@@ -1447,6 +1442,11 @@ async def user_search_process(update: Update, context: ContextTypes.DEFAULT_TYPE
                             parse_mode=ParseMode.HTML
                         )
                         return ConversationHandler.END
+                
+                # В записи только основные поля — полные данные запрашиваем отдельно
+                if match:
+                    user_response = await api_client.get_user(match.uuid)
+                    user = user_response.get('response')
                     
             except Exception as e:
                 log.error(f"Error searching users: {e}")
@@ -1765,10 +1765,10 @@ async def bulk_create_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
     traffic_str = context.user_data.get('bulk_traffic')
     reset_str = context.user_data.get('bulk_reset')
     
-    await query.edit_message_text(
-        f"⏳ <b>Создание {count} пользователей...</b>\n\nЭто может занять некоторое время.",
-        parse_mode=ParseMode.HTML
+    progress = ProgressReporter.for_message(
+        query.message, f"Создание {count} пользователей...", total=count
     )
+    await progress.update(force=True)
     
     try:
         # Расчёт параметров
@@ -1792,10 +1792,9 @@ async def bulk_create_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
         created_users = []
         failed_users = []
         
-        for i in range(count):
+        async def create_one():
+            username = generate_random_username(12)
             try:
-                username = generate_random_username(12)
-                
                 user_data = {
                     "username": username,
                     "traffic_limit_bytes": traffic_limit,
@@ -1806,16 +1805,20 @@ async def bulk_create_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
                 if traffic_strategy:
                     user_data["traffic_limit_strategy"] = traffic_strategy
                 
-                result = await api_client.create_user(user_data)
+                result = await api_limiter.run(api_client.create_user, user_data)
                 created_user = result.get('response', {})
                 created_users.append(created_user.get('username'))
-                
-                # Небольшая задержка между запросами
-                await asyncio.sleep(0.1)
+                await progress.advance(success=True)
                 
             except Exception as e:
                 log.error(f"Error creating user {username}: {e}")
                 failed_users.append(f"{username}: {str(e)}")
+                await progress.advance(success=False)
+        
+        # Параллельность ограничивает адаптивный лимитер панели,
+        # а фоновая очередь пропускает вперёд запросы других админов
+        with background_lane():
+            await asyncio.gather(*(create_one() for _ in range(count)))
         
         # Формируем отчёт
         success_count = len(created_users)
@@ -1842,11 +1845,7 @@ async def bulk_create_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         context.user_data.clear()
         
-        await query.edit_message_text(
-            text,
-            reply_markup=user_kb.users_menu(),
-            parse_mode=ParseMode.HTML
-        )
+        await progress.finish(text, reply_markup=user_kb.users_menu())
         
         return ConversationHandler.END
         
@@ -1906,10 +1905,14 @@ def register_users_handlers(application):
                 CallbackQueryHandler(edit_status_process, pattern="^set_status:"),
                 CallbackQueryHandler(edit_cancel, pattern="^user_edit:"),
             ],
+            ConversationHandler.TIMEOUT: [state_store.timeout_handler('editing_user_uuid', 'current_user_data')],
         },
         fallbacks=[
             CallbackQueryHandler(edit_cancel, pattern="^user_view:"),
         ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="user_edit",
+        persistent=settings.use_persistence,
         per_message=False,
         allow_reentry=True
     )
@@ -1935,10 +1938,14 @@ def register_users_handlers(application):
                 CallbackQueryHandler(create_confirm_callback, pattern="^create_confirm$"),
                 CallbackQueryHandler(create_cancel_callback, pattern="^create_cancel$"),
             ],
+            ConversationHandler.TIMEOUT: [state_store.timeout_handler('create_username', 'create_traffic_limit', 'create_expire_at')],
         },
         fallbacks=[
             MessageHandler(filters.Regex("^/cancel$"), create_cancel_command),
         ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="user_create",
+        persistent=settings.use_persistence,
         per_message=False,
         allow_reentry=True
     )
@@ -1958,6 +1965,9 @@ def register_users_handlers(application):
         fallbacks=[
             MessageHandler(filters.Regex("^/cancel$"), search_cancel_command),
         ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="user_search",
+        persistent=settings.use_persistence,
         per_message=False,
         allow_reentry=True
     )
@@ -1985,16 +1995,57 @@ def register_users_handlers(application):
             BULK_CONFIRM: [
                 CallbackQueryHandler(bulk_create_confirm, pattern="^bulk_create_confirm$"),
             ],
+            ConversationHandler.TIMEOUT: [state_store.timeout_handler('bulk_count', 'bulk_duration', 'bulk_traffic', 'bulk_reset')],
         },
         fallbacks=[
             CallbackQueryHandler(bulk_create_cancel, pattern="^users_list$"),
         ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="user_bulk_create",
+        persistent=settings.use_persistence,
         per_message=False,
         allow_reentry=True
     )
     
     application.add_handler(bulk_create_conv_handler)
     
+    # ConversationHandler для импорта пользователей из файла
+    from .import_handlers import (
+        IMPORT_MODE,
+        IMPORT_FILE,
+        user_import_start,
+        user_import_mode_callback,
+        user_import_file_process,
+        user_import_cancel_callback,
+        user_import_cancel_command
+    )
+    
+    import_conv_handler = ConversationHandler(
+        entry_points=[
+            CallbackQueryHandler(user_import_start, pattern="^user_import$")
+        ],
+        states={
+            IMPORT_MODE: [
+                CallbackQueryHandler(user_import_mode_callback, pattern="^import_mode:"),
+            ],
+            IMPORT_FILE: [
+                MessageHandler(filters.Document.ALL, user_import_file_process),
+            ],
+            ConversationHandler.TIMEOUT: [state_store.timeout_handler('import_dry_run')],
+        },
+        fallbacks=[
+            CallbackQueryHandler(user_import_cancel_callback, pattern="^import_cancel$"),
+            MessageHandler(filters.Regex("^/cancel$"), user_import_cancel_command),
+        ],
+        conversation_timeout=settings.conversation_timeout or None,
+        name="user_import",
+        persistent=settings.use_persistence,
+        per_message=False,
+        allow_reentry=True
+    )
+    
+    application.add_handler(import_conv_handler)
+    
     # Import delete handlers
     from .delete_handlers import (
         user_delete_start,
@@ -0,0 +1,215 @@
+"""
+Handlers for bulk user import from CSV/JSONL documents
+"""
+import tempfile
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
+from telegram.ext import ContextTypes, ConversationHandler
+from telegram.constants import ParseMode
+
+from src.core.config import settings
+from src.core.logger import log
+from src.middleware.auth import admin_only
+from src.services.rate_limiter import background_lane
+from src.utils.progress import ProgressReporter
+
+from . import keyboards as user_kb
+from . import importer
+
+# Conversation states для импорта пользователей
+IMPORT_MODE, IMPORT_FILE = range(14, 16)
+
+# Файл в памяти до 1 МБ, дальше — на диске
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+
+@admin_only
+async def user_import_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Start bulk import: choose dry-run or apply mode"""
+    query = update.callback_query
+    await query.answer()
+
+    columns = ", ".join(f"<code>{c}</code>" for c in importer.IMPORT_COLUMNS)
+
+    text = f"""
+📥 <b>Импорт пользователей из файла</b>
+
+Поддерживаются файлы <b>CSV</b> (с заголовком) и <b>JSONL</b> (один объект на строку).
+
+<b>Колонки:</b> {columns}
+
+• Строки с <code>uuid</code> обновляют существующих пользователей
+• Строки без <code>uuid</code> создают новых
+
+Выберите режим:
+    """
+
+    keyboard = [
+        [InlineKeyboardButton("🧪 Проверка (dry-run)", callback_data="import_mode:dry")],
+        [InlineKeyboardButton("✅ Импортировать", callback_data="import_mode:apply")],
+        [InlineKeyboardButton("❌ Отмена", callback_data="import_cancel")],
+    ]
+
+    await query.edit_message_text(
+        text.strip(),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode=ParseMode.HTML
+    )
+
+    return IMPORT_MODE
+
+
+@admin_only
+async def user_import_mode_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Store selected mode and ask for the document"""
+    query = update.callback_query
+    await query.answer()
+
+    dry_run = query.data.split(":")[1] == "dry"
+    context.user_data['import_dry_run'] = dry_run
+
+    mode_text = "🧪 Проверка без изменений" if dry_run else "✅ Импорт с применением"
+
+    await query.edit_message_text(
+        f"📥 <b>Импорт пользователей</b>\n\n"
+        f"<b>Режим:</b> {mode_text}\n\n"
+        f"Отправьте файл <b>.csv</b> или <b>.jsonl</b> документом, или /cancel для отмены:",
+        parse_mode=ParseMode.HTML
+    )
+
+    return IMPORT_FILE
+
+
+def _format_report(report: importer.ImportReport, finished: bool = True) -> str:
+    """Format import progress or final report"""
+    if report.dry_run:
+        title = "🧪 <b>Проверка импорта завершена</b>" if finished else "🧪 <b>Проверка файла...</b>"
+        created_label, updated_label = "Будет создано", "Будет обновлено"
+    else:
+        title = "✅ <b>Импорт завершён</b>" if finished else "⏳ <b>Импорт пользователей...</b>"
+        created_label, updated_label = "Создано", "Обновлено"
+
+    text = f"{title}\n\n"
+    text += f"📊 <b>Строк обработано:</b> {report.total}\n"
+    text += f"├ {created_label}: {report.created}\n"
+    text += f"├ {updated_label}: {report.updated}\n"
+    text += f"└ Ошибок: {report.failed}"
+
+    if finished and report.failed:
+        text += "\n\n<i>Отчёт об ошибках отправлен отдельным файлом</i>"
+
+    return text
+
+
+@admin_only
+async def user_import_file_process(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Download the document into a spooled file and run the import"""
+    document = update.message.document
+    dry_run = context.user_data.get('import_dry_run', True)
+
+    try:
+        fmt = importer.detect_format(document.file_name, document.mime_type)
+    except importer.ImportFormatError as e:
+        await update.message.reply_text(
+            f"❌ {e}\n\nОтправьте другой файл или /cancel для отмены:",
+            parse_mode=ParseMode.HTML
+        )
+        return IMPORT_FILE
+
+    status_message = await update.message.reply_text(
+        "⏳ <b>Загрузка файла...</b>",
+        parse_mode=ParseMode.HTML
+    )
+
+    report = None
+
+    def render_progress(reporter: ProgressReporter, final: bool) -> str:
+        return f"{_format_report(report, finished=False)}\n\n{reporter.speed_line()}"
+
+    progress = ProgressReporter.for_message(
+        status_message, "Импорт пользователей", render=render_progress
+    )
+
+    async def on_progress(current: importer.ImportReport):
+        nonlocal report
+        report = current
+        await progress.set(current.total, current.created + current.updated, current.failed)
+
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+            tg_file = await document.get_file()
+            await tg_file.download_to_memory(out=spool)
+            spool.seek(0)
+
+            with background_lane():
+                report = await importer.run_import(
+                    spool,
+                    fmt,
+                    dry_run=dry_run,
+                    chunk_size=settings.import_chunk_size,
+                    on_progress=on_progress
+                )
+
+        log.info(
+            f"User import finished (dry_run={dry_run}): total={report.total}, "
+            f"created={report.created}, updated={report.updated}, failed={report.failed}"
+        )
+
+        await progress.finish(_format_report(report), reply_markup=user_kb.users_menu())
+
+        if report.failed:
+            await update.message.reply_document(
+                document=InputFile(report.error_report_bytes(), filename="import_errors.csv"),
+                caption=f"❌ Ошибок: {report.failed}"
+            )
+
+    except importer.ImportFormatError as e:
+        await status_message.edit_text(
+            f"❌ <b>Ошибка формата:</b> {e}",
+            reply_markup=user_kb.users_menu(),
+            parse_mode=ParseMode.HTML
+        )
+    except Exception as e:
+        log.exception("Unexpected error in user import")
+        await status_message.edit_text(
+            f"❌ <b>Ошибка импорта:</b> {str(e)}",
+            reply_markup=user_kb.users_menu(),
+            parse_mode=ParseMode.HTML
+        )
+    finally:
+        if report:
+            report.close()
+        context.user_data.pop('import_dry_run', None)
+
+    return ConversationHandler.END
+
+
+@admin_only
+async def user_import_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cancel import via button"""
+    query = update.callback_query
+    await query.answer()
+
+    context.user_data.pop('import_dry_run', None)
+
+    await query.edit_message_text(
+        "❌ <b>Импорт отменён</b>",
+        reply_markup=user_kb.users_menu(),
+        parse_mode=ParseMode.HTML
+    )
+
+    return ConversationHandler.END
+
+
+@admin_only
+async def user_import_cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cancel import via /cancel command"""
+    context.user_data.pop('import_dry_run', None)
+
+    await update.message.reply_text(
+        "❌ <b>Импорт отменён</b>",
+        reply_markup=user_kb.users_menu(),
+        parse_mode=ParseMode.HTML
+    )
+
+    return ConversationHandler.END
@@ -0,0 +1,300 @@
+"""
+Streaming user import from CSV/JSONL documents
+Rows are parsed lazily, validated one by one and applied in bounded chunks
+"""
+import asyncio
+import csv
+import io
+import json
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from src.core.logger import log
+from src.services.api import api_client
+from src.services.concurrency import api_limiter
+from src.utils.validators import validators
+
+# Поддерживаемые колонки файла импорта
+IMPORT_COLUMNS = (
+    "uuid",
+    "username",
+    "status",
+    "traffic_limit_gb",
+    "traffic_limit_strategy",
+    "expire_days",
+    "expire_at",
+    "telegram_id",
+    "email",
+    "description",
+    "tag",
+)
+
+TRAFFIC_STRATEGIES = ("NO_RESET", "DAY", "WEEK", "MONTH")
+
+# Ошибки держим на диске после 1 МБ, чтобы отчёт не рос в памяти
+ERROR_REPORT_SPOOL_SIZE = 1024 * 1024
+
+
+class ImportFormatError(Exception):
+    """Raised when the uploaded document is not a supported CSV/JSONL file"""
+
+
+@dataclass
+class ImportReport:
+    """Aggregated result of an import run"""
+    dry_run: bool
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: IO[str] = field(
+        default_factory=lambda: tempfile.SpooledTemporaryFile(
+            max_size=ERROR_REPORT_SPOOL_SIZE, mode="w+", encoding="utf-8", newline=""
+        )
+    )
+
+    def __post_init__(self):
+        self._writer = csv.writer(self.errors)
+        self._writer.writerow(["line", "username", "error"])
+
+    def add_error(self, line: int, username: str, error: str):
+        """Append a row to the error report"""
+        self.failed += 1
+        self._writer.writerow([line, username, error])
+
+    def error_report_bytes(self) -> bytes:
+        """Read the error report back as UTF-8 CSV"""
+        self.errors.seek(0)
+        return self.errors.read().encode("utf-8")
+
+    def close(self):
+        self.errors.close()
+
+
+def detect_format(file_name: Optional[str], mime_type: Optional[str] = None) -> str:
+    """Detect import format by file name or MIME type"""
+    name = (file_name or "").lower()
+    mime = (mime_type or "").lower()
+
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in mime or "jsonl" in mime:
+        return "jsonl"
+    if name.endswith(".csv") or mime in ("text/csv", "application/csv"):
+        return "csv"
+
+    raise ImportFormatError("Поддерживаются только файлы .csv и .jsonl")
+
+
+def iter_raw_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Iterate raw rows from a binary stream without reading it whole
+
+    Yields:
+        Tuple of (line_number, row) where row is a dict or a parse error string
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        columns = reader.fieldnames or []
+        if "username" not in columns and "uuid" not in columns:
+            raise ImportFormatError("CSV должен содержать заголовок с колонкой username или uuid")
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, f"Неверный JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, "Строка JSONL должна быть объектом"
+            continue
+        yield line_num, row
+
+
+def _value(row: Dict[str, Any], key: str) -> Optional[str]:
+    """Get stripped string value from row, treating empty strings as missing"""
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_row(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate a raw import row and convert it to an API payload
+
+    Rows with ``uuid`` update an existing user, rows without it create a new one.
+
+    Returns:
+        Tuple of (payload, error_message)
+    """
+    payload: Dict[str, Any] = {}
+
+    uuid = _value(row, "uuid")
+    if uuid:
+        is_valid, error = validators.validate_uuid(uuid)
+        if not is_valid:
+            return None, error
+        payload["uuid"] = uuid
+
+    username = _value(row, "username")
+    if username or not uuid:
+        is_valid, error = validators.validate_username(username or "")
+        if not is_valid:
+            return None, error
+        payload["username"] = username
+
+    status = _value(row, "status")
+    if status:
+        is_valid, status, error = validators.validate_user_status(status)
+        if not is_valid:
+            return None, error
+        payload["status"] = status
+
+    traffic = _value(row, "traffic_limit_gb")
+    if traffic:
+        is_valid, traffic_bytes, error = validators.validate_traffic_limit(traffic)
+        if not is_valid:
+            return None, error
+        payload["traffic_limit_bytes"] = traffic_bytes
+
+    strategy = _value(row, "traffic_limit_strategy")
+    if strategy:
+        strategy = strategy.upper()
+        if strategy not in TRAFFIC_STRATEGIES:
+            return None, f"Стратегия сброса должна быть одной из: {', '.join(TRAFFIC_STRATEGIES)}"
+        payload["traffic_limit_strategy"] = strategy
+
+    expire_days = _value(row, "expire_days")
+    expire_at = _value(row, "expire_at")
+    if expire_days:
+        is_valid, days, error = validators.validate_days(expire_days)
+        if not is_valid:
+            return None, error
+        payload["expire_at"] = (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+    elif expire_at:
+        try:
+            expire_dt = datetime.fromisoformat(expire_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None, "Неверный формат expire_at (ожидается ISO 8601)"
+        if expire_dt.tzinfo is None:
+            expire_dt = expire_dt.replace(tzinfo=timezone.utc)
+        payload["expire_at"] = expire_dt.isoformat()
+    elif not uuid:
+        # Для "бессрочных" пользователей устанавливаем дату через 100 лет
+        payload["expire_at"] = (datetime.now(timezone.utc) + timedelta(days=36500)).isoformat()
+
+    telegram_id = _value(row, "telegram_id")
+    if telegram_id:
+        is_valid, telegram_id_value, error = validators.validate_telegram_id(telegram_id)
+        if not is_valid:
+            return None, error
+        payload["telegram_id"] = telegram_id_value
+
+    email = _value(row, "email")
+    if email:
+        is_valid, error = validators.validate_email(email)
+        if not is_valid:
+            return None, error
+        payload["email"] = email
+
+    for key in ("description", "tag"):
+        value = _value(row, key)
+        if value:
+            payload[key] = value
+
+    if not uuid:
+        payload.setdefault("status", "ACTIVE")
+    elif not set(payload) - {"uuid", "username"}:
+        return None, "Нет полей для обновления"
+
+    return payload, None
+
+
+async def _apply_payload(payload: Dict[str, Any]) -> str:
+    """Send a single validated row to the panel, returns performed action"""
+    payload = dict(payload)
+    uuid = payload.pop("uuid", None)
+    if uuid:
+        # Имя пользователя панель не меняет, оно нужно только для отчёта
+        payload.pop("username", None)
+        await api_client.update_user(uuid, payload)
+        return "updated"
+    await api_client.create_user(payload)
+    return "created"
+
+
+async def _apply_chunk(chunk: list, report: ImportReport):
+    """Apply one chunk of rows, parallelism is bounded by the adaptive API limiter"""
+
+    async def apply_one(line: int, payload: Dict[str, Any]):
+        try:
+            action = await api_limiter.run(_apply_payload, payload)
+            if action == "created":
+                report.created += 1
+            else:
+                report.updated += 1
+        except Exception as e:
+            log.error(f"Import row {line} failed: {e}")
+            report.add_error(line, payload.get("username") or payload.get("uuid", ""), str(e))
+
+    await asyncio.gather(*(apply_one(line, payload) for line, payload in chunk))
+
+
+async def run_import(
+    stream: IO[bytes],
+    fmt: str,
+    dry_run: bool,
+    chunk_size: int,
+    on_progress: Optional[Callable[[ImportReport], Awaitable[None]]] = None
+) -> ImportReport:
+    """
+    Stream rows from the document, validate them and apply in chunks
+
+    Only one chunk of validated payloads is kept in memory at a time,
+    so memory usage does not depend on the file size.
+    """
+    report = ImportReport(dry_run=dry_run)
+    chunk: list = []
+
+    for line, row in iter_raw_rows(stream, fmt):
+        report.total += 1
+
+        if isinstance(row, str):
+            report.add_error(line, "", row)
+            continue
+
+        payload, error = parse_row(row)
+        if error:
+            report.add_error(line, _value(row, "username") or _value(row, "uuid") or "", error)
+            continue
+
+        if dry_run:
+            if "uuid" in payload:
+                report.updated += 1
+            else:
+                report.created += 1
+            if on_progress and report.total % chunk_size == 0:
+                await on_progress(report)
+            continue
+
+        chunk.append((line, payload))
+        if len(chunk) >= chunk_size:
+            await _apply_chunk(chunk, report)
+            chunk = []
+            if on_progress:
+                await on_progress(report)
+
+    if chunk:
+        await _apply_chunk(chunk, report)
+
+    return report
@@ -18,6 +18,10 @@ def users_menu() -> InlineKeyboardMarkup:
         [
             InlineKeyboardButton("🔍 Поиск пользователя", callback_data="user_search"),
         ],
+        [
+            InlineKeyboardButton("📥 Импорт из файла", callback_data="user_import"),
+            InlineKeyboardButton("📤 Экспорт", callback_data="export_menu"),
+        ],
         [
             InlineKeyboardButton("◀️ Назад", callback_data="main_menu"),
         ],
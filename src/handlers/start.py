@@ -10,6 +10,16 @@ from src.middleware.auth import admin_only
 from src.utils.keyboards import keyboards
 from src.utils.formatters import formatters
 from src.services.api import api_client, RemnaWaveAPIError
+from src.services.resilience import panel_breaker
+
+
+def panel_status_banner() -> str:
+    """Warning shown on top of the menu while the panel is unavailable"""
+    if not panel_breaker.is_open:
+        return ""
+    retry_in = int(panel_breaker.retry_in)
+    retry_text = f", повторная проверка через {retry_in} с" if retry_in else ""
+    return f"🔴 <b>Панель недоступна</b>{retry_text}\n\n"
 
 
 @admin_only
@@ -27,7 +37,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     
     await update.message.reply_text(
-        welcome_text.strip(),
+        panel_status_banner() + welcome_text.strip(),
         reply_markup=keyboards.main_menu(),
         parse_mode=ParseMode.HTML
     )
@@ -46,7 +56,7 @@ async def main_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """
     
     await query.edit_message_text(
-        welcome_text.strip(),
+        panel_status_banner() + welcome_text.strip(),
         reply_markup=keyboards.main_menu(),
         parse_mode=ParseMode.HTML
     )
@@ -68,7 +78,7 @@ async def stats_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Fetch statistics
         stats = await api_client.get_system_stats()
         
-        stats_text = formatters.format_system_stats(stats)
+        stats_text = formatters.format_system_stats(stats) + formatters.format_stale_note(stats)
         
         await query.edit_message_text(
             stats_text,
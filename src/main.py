@@ -10,6 +10,12 @@ from src.core.logger import log
 from src.core.bot import create_bot_application
 from src.services.api import api_client
 from src.services.cache import cache_service
+from src.services.jobs import job_manager
+from src.services.loop_monitor import loop_monitor
+from src.services.metrics import metrics_server
+from src.services.state_store import state_store
+from src.services.offload import cpu_offloader
+from src.services.tracing import tracer
 
 # Import handlers
 from src.handlers.start import register_start_handlers
@@ -22,6 +28,9 @@ from src.features.hwid import register_hwid_handlers
 from src.features.squads import register_squads_handlers
 from src.features.mass_operations import register_mass_handlers
 from src.features.system import register_system_handlers
+from src.features.export import register_export_handlers
+from src.features.jobs import register_jobs_handlers
+from src.features.perf import register_perf_handlers
 
 
 async def on_startup(application: Application):
@@ -42,6 +51,26 @@ async def on_startup(application: Application):
         log.error(f"❌ Failed to connect to Remnawave API: {e}")
         log.error("Bot will continue but API calls may fail")
     
+    # Expose Prometheus metrics next to polling
+    if settings.metrics_enabled:
+        try:
+            await metrics_server.start(settings.metrics_host, settings.metrics_port)
+        except OSError as e:
+            log.error(f"Failed to start metrics endpoint: {e}")
+    
+    # Export sampled traces in the background
+    tracer.start()
+    
+    # Watch event loop lag and log what blocks it
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    
+    # Periodically drop expired conversation state
+    state_store.start()
+    
+    # Resume background jobs interrupted by the previous shutdown
+    await job_manager.start(application.bot)
+    
     log.info("Bot startup completed")
 
 
@@ -49,8 +78,18 @@ async def on_shutdown(application: Application):
     """Called on bot shutdown"""
     log.info("Bot is shutting down...")
     
+    # Stop background jobs (they will be resumed on next start)
+    await job_manager.shutdown()
+    
+    # Stop metrics endpoint and flush remaining traces
+    await metrics_server.stop()
+    await tracer.shutdown()
+    await loop_monitor.stop()
+    await state_store.stop()
+    
     # Close API client
     await api_client.close()
+    cpu_offloader.shutdown()
     
     # Disconnect from Redis
     await cache_service.disconnect()
@@ -58,6 +97,26 @@ async def on_shutdown(application: Application):
     log.info("Bot shutdown completed")
 
 
+def register_handlers(application: Application):
+    """Register command and feature handlers"""
+    log.info("Registering handlers...")
+    register_start_handlers(application)
+    
+    # Register feature handlers
+    log.info("Registering feature modules...")
+    register_users_handlers(application)
+    register_hosts_handlers(application)
+    register_nodes_handlers(application)
+    register_hwid_handlers(application)
+    register_squads_handlers(application)
+    register_mass_handlers(application)
+    register_system_handlers(application)
+    register_export_handlers(application)
+    register_jobs_handlers(application)
+    register_perf_handlers(application)
+    log.info("All handlers registered")
+
+
 def main():
     """Main function"""
     log.info("=" * 60)
@@ -98,19 +157,7 @@ def main():
     application.add_handler(TypeHandler(TelegramUpdate, log_update), group=-1)
     
     # Register handlers
-    log.info("Registering handlers...")
-    register_start_handlers(application)
-    
-    # Register feature handlers
-    log.info("Registering feature modules...")
-    register_users_handlers(application)
-    register_hosts_handlers(application)
-    register_nodes_handlers(application)
-    register_hwid_handlers(application)
-    register_squads_handlers(application)
-    register_mass_handlers(application)
-    register_system_handlers(application)
-    log.info("All handlers registered")
+    register_handlers(application)
     
     # Add startup and shutdown callbacks
     application.post_init = on_startup
@@ -6,6 +6,10 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from src.core.config import settings
 from src.core.logger import log
+from src.services.deadline import request_deadline
+from src.services.handler_timing import HandlerTiming, describe_update
+from src.services.metrics import observe_handler
+from src.services.tracing import tracer
 
 
 def admin_only(func):
@@ -49,7 +53,18 @@ def admin_only(func):
             f"(@{user.username or 'no_username'})"
         )
         
-        return await func(update, context, *args, **kwargs)
+        # Время обработчика с разбивкой на ожидание панели и Telegram
+        timing = HandlerTiming(func.__name__, describe_update(update))
+        try:
+            with (
+                timing,
+                tracer.span(func.__name__, kind="handler"),
+                # Все запросы к панели в рамках этого апдейта делят общий бюджет времени
+                request_deadline(settings.handler_deadline),
+            ):
+                return await func(update, context, *args, **kwargs)
+        finally:
+            observe_handler(timing)
     
     return wrapper
 
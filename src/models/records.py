@@ -0,0 +1,119 @@
+"""
+Compact user records for holding many users in memory
+A record keeps only the fields used for searching and bulk decisions,
+roughly a tenth of the memory of a full user dict
+"""
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Iterable, List, Mapping, Optional
+
+
+class UserStatusCode(IntEnum):
+    """User status stored as a small int"""
+    ACTIVE = 0
+    DISABLED = 1
+    LIMITED = 2
+    EXPIRED = 3
+    UNKNOWN = 9
+
+    @classmethod
+    def parse(cls, value: Any) -> "UserStatusCode":
+        # Статус приходит строкой из JSON или enum из SDK-модели
+        name = str(getattr(value, "value", value) or "").upper()
+        return cls.__members__.get(name, cls.UNKNOWN)
+
+
+def _epoch(value: Any) -> Optional[int]:
+    """ISO string or datetime -> unix seconds"""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _int(value: Any) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+class UserRecord:
+    """Hot fields of a panel user"""
+
+    __slots__ = (
+        "uuid",
+        "short_uuid",
+        "username",
+        "email",
+        "status",
+        "used_traffic_bytes",
+        "traffic_limit_bytes",
+        "expire_at",
+        "telegram_id",
+        "tag",
+    )
+
+    def __init__(
+        self,
+        uuid: str,
+        username: str,
+        status: int = UserStatusCode.UNKNOWN,
+        used_traffic_bytes: int = 0,
+        traffic_limit_bytes: Optional[int] = None,
+        expire_at: Optional[int] = None,
+        telegram_id: Optional[int] = None,
+        tag: Optional[str] = None,
+        short_uuid: Optional[str] = None,
+        email: Optional[str] = None
+    ):
+        self.uuid = uuid
+        self.short_uuid = short_uuid
+        self.username = username
+        self.email = email
+        self.status = int(status)
+        self.used_traffic_bytes = used_traffic_bytes
+        self.traffic_limit_bytes = traffic_limit_bytes
+        self.expire_at = expire_at
+        self.telegram_id = telegram_id
+        self.tag = tag
+
+    @classmethod
+    def from_api(cls, user: Mapping[str, Any]) -> "UserRecord":
+        """Build from a user as returned by the API (raw dict or UserView)"""
+        return cls(
+            uuid=str(user.get('uuid') or ''),
+            short_uuid=user.get('shortUuid'),
+            username=user.get('username') or '',
+            email=user.get('email'),
+            status=UserStatusCode.parse(user.get('status')),
+            used_traffic_bytes=int(user.get('usedTrafficBytes') or 0),
+            traffic_limit_bytes=_int(user.get('trafficLimitBytes')),
+            expire_at=_epoch(user.get('expireAt')),
+            telegram_id=_int(user.get('telegramId')),
+            tag=user.get('tag'),
+        )
+
+    @property
+    def status_name(self) -> str:
+        """Status as the API string (ACTIVE, DISABLED, ...)"""
+        return UserStatusCode(self.status).name
+
+    @property
+    def expire_datetime(self) -> Optional[datetime]:
+        if self.expire_at is None:
+            return None
+        return datetime.fromtimestamp(self.expire_at, tz=timezone.utc)
+
+    def __repr__(self) -> str:
+        return f"UserRecord({self.username!r}, {self.status_name}, uuid={self.uuid!r})"
+
+
+def records_from_users(users: Iterable[Mapping[str, Any]]) -> List[UserRecord]:
+    """Convert a list of API users to records"""
+    return [UserRecord.from_api(user) for user in users]
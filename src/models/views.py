@@ -0,0 +1,127 @@
+"""
+Read-only views over SDK response models
+A view behaves like the dict from ``model_dump(by_alias=True)`` but reads
+fields from the model on access instead of copying every field up front
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Type
+
+from pydantic import BaseModel
+
+# Для каждого класса модели: API-имя (alias) -> имя атрибута
+_FIELD_MAPS: Dict[Type[BaseModel], Dict[str, str]] = {}
+
+
+def _field_map(model_class: Type[BaseModel]) -> Dict[str, str]:
+    fields = _FIELD_MAPS.get(model_class)
+    if fields is None:
+        fields = {
+            (info.alias or name): name
+            for name, info in model_class.model_fields.items()
+        }
+        _FIELD_MAPS[model_class] = fields
+    return fields
+
+
+def _wrap(value: Any) -> Any:
+    """Wrap nested models the way model_dump would turn them into dicts"""
+    if isinstance(value, BaseModel):
+        return ModelView(value)
+    if isinstance(value, list):
+        return [_wrap(item) for item in value]
+    return value
+
+
+class ModelView(Mapping):
+    """
+    Lazy read-only mapping over a pydantic model, keyed by API field names
+
+    Supports ``view['usedTrafficBytes']``, ``view.get('usedTrafficBytes')``
+    and attribute access by API or python name (``view.usedTrafficBytes``,
+    ``view.used_traffic_bytes``). Values are the same as in
+    ``model_dump(by_alias=True)``, except that nested models are views too.
+    """
+
+    __slots__ = ("_model",)
+
+    def __init__(self, model: BaseModel):
+        object.__setattr__(self, "_model", model)
+
+    @classmethod
+    def wrap_all(cls, models: Iterable[BaseModel]) -> List["ModelView"]:
+        return [cls(model) for model in models]
+
+    @property
+    def model(self) -> BaseModel:
+        """Underlying SDK model"""
+        return self._model
+
+    def __getitem__(self, key: str) -> Any:
+        name = _field_map(type(self._model)).get(key)
+        if name is not None:
+            return _wrap(getattr(self._model, name))
+        extra = self._model.__pydantic_extra__
+        if extra and key in extra:
+            return _wrap(extra[key])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _field_map(type(self._model))
+        extra = self._model.__pydantic_extra__
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        extra = self._model.__pydantic_extra__
+        return len(_field_map(type(self._model))) + (len(extra) if extra else 0)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _field_map(type(self._model)):
+            return True
+        extra = self._model.__pydantic_extra__
+        return bool(extra) and key in extra
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            pass
+        if name in type(self._model).model_fields:
+            return _wrap(getattr(self._model, name))
+        raise AttributeError(f"{type(self).__name__} has no field {name!r}")
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getstate__(self) -> BaseModel:
+        return self._model
+
+    def __setstate__(self, model: BaseModel):
+        object.__setattr__(self, "_model", model)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full copy as plain dict (same as model_dump(by_alias=True))"""
+        return self._model.model_dump(by_alias=True)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._model!r})"
+
+
+class UserView(ModelView):
+    """View over UserResponseDto"""
+
+    __slots__ = ()
+
+
+class NodeView(ModelView):
+    """View over NodeResponseDto"""
+
+    __slots__ = ()
+
+
+class HostView(ModelView):
+    """View over HostResponseDto"""
+
+    __slots__ = ()
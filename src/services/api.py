@@ -1,8 +1,11 @@
 """
 Remnawave API service using official SDK
 """
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable, Sequence
 from datetime import datetime, timedelta
+import httpx
 from loguru import logger as log
 
 from remnawave import RemnawaveSDK
@@ -16,8 +19,18 @@ from remnawave.models import (
     GetAllHostsResponseDto,
     UpdateUserRequestDto,
 )
+from remnawave.models.hwid import GetUserHwidDevicesResponseDto
 
 from src.core.config import settings
+from src.models.records import UserRecord, records_from_users
+from src.models.views import HostView, NodeView, UserView
+from src.services.deadline import DeadlineExceeded, within_deadline
+from src.services.fault_injection import FaultInjectionTransport, parse_rules
+from src.services.metrics import api_pool_max_connections, api_requests_in_flight, instrument_api
+from src.services.offload import cpu_offloader
+from src.services.rate_limiter import INTERACTIVE, api_rate_limiter, current_lane
+from src.services.resilience import ResilientTransport, panel_breaker
+from src.services.streaming import stream_json_array
 
 
 class RemnaWaveAPIError(Exception):
@@ -26,40 +39,242 @@ class RemnaWaveAPIError(Exception):
         self.message = message
         self.status_code = status_code
         super().__init__(self.message)
+    
+    @property
+    def timed_out(self) -> bool:
+        """True if the call was cut off by the update's time budget"""
+        exc = self.__cause__ or self.__context__
+        while exc is not None:
+            if isinstance(exc, DeadlineExceeded):
+                return True
+            exc = exc.__cause__ or exc.__context__
+        return False
+
 
+# Сколько последних ответов хранить для показа при таймауте
+STALE_CACHE_SIZE = 64
 
+
+def stale_on_timeout(method):
+    """
+    Remember the last successful interactive result of a read method and
+    return it marked with ``"stale": True`` when the time budget runs out
+    """
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            result = await method(self, *args, **kwargs)
+        except RemnaWaveAPIError as e:
+            cached = self._stale_cache.get(key)
+            if not e.timed_out or cached is None:
+                raise
+            fetched_at, result = cached
+            log.warning(f"{method.__name__} timed out, returning data from {fetched_at:%H:%M:%S}")
+            return {**result, "stale": True, "fetched_at": fetched_at}
+        
+        # Фоновые выгрузки не вытесняют данные для экранов админов
+        if current_lane() == INTERACTIVE:
+            self._stale_cache[key] = (datetime.now(), result)
+            self._stale_cache.move_to_end(key)
+            while len(self._stale_cache) > STALE_CACHE_SIZE:
+                self._stale_cache.popitem(last=False)
+        return result
+    
+    return wrapper
+
+
+@instrument_api
 class RemnaWaveAPIClient:
     """
     Async API client for Remnawave using official SDK
     Wrapper around RemnawaveSDK for compatibility with existing code
     """
     
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            transport: Replaces the pooled HTTP transport under the retry and
+                fault injection layers (mock or in-process panel for tests)
+        """
         self.base_url = settings.remnawave_api_url.rstrip('/')
         self.token = settings.remnawave_api_token
         self._sdk: Optional[RemnawaveSDK] = None
+        self._base_transport = transport
+        self._http2 = False
+        self.fault_injector: Optional[FaultInjectionTransport] = None
+        self._stale_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
     
     @property
     def sdk(self) -> RemnawaveSDK:
         """Get or create SDK instance"""
         if self._sdk is None:
-            self._sdk = RemnawaveSDK(
-                base_url=self.base_url,
-                token=self.token
-            )
+            self._sdk = RemnawaveSDK(client=self._create_http_client())
             log.info(f"Remnawave SDK initialized with base_url={self.base_url}")
         return self._sdk
     
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """
+        HTTP client for the SDK (same base URL and auth as the SDK default)
+        
+        Every request waits for the shared rate limiter and goes through
+        the circuit breaker and retry transport.
+        """
+        base_url = self.base_url if self.base_url.endswith("/api") else f"{self.base_url}/api"
+        headers = {}
+        if self.token:
+            headers["Authorization"] = (
+                self.token if self.token.startswith("Bearer ") else f"Bearer {self.token}"
+            )
+        
+        http2 = settings.api_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                log.warning("API_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.api_pool_max_connections,
+            max_keepalive_connections=settings.api_pool_max_keepalive,
+            keepalive_expiry=settings.api_keepalive_expiry
+        )
+        timeout = httpx.Timeout(
+            connect=settings.api_connect_timeout,
+            read=settings.api_read_timeout,
+            write=settings.api_write_timeout,
+            pool=settings.api_pool_timeout
+        )
+        
+        if self._base_transport is not None:
+            transport = self._base_transport
+        else:
+            # retries транспорта — мгновенные повторы только при ошибке соединения
+            transport = httpx.AsyncHTTPTransport(
+                limits=limits,
+                http2=http2,
+                retries=settings.api_connect_retries
+            )
+            self._http2 = http2
+            api_pool_max_connections.set(limits.max_connections)
+        
+        if settings.api_fault_injection:
+            self.fault_injector = transport = FaultInjectionTransport(
+                transport,
+                parse_rules(settings.api_fault_injection),
+                seed=settings.api_fault_seed
+            )
+            log.warning(f"API fault injection is ON: {settings.api_fault_injection}")
+        
+        transport = ResilientTransport(
+            transport,
+            breaker=panel_breaker,
+            retries=settings.api_retries,
+            backoff_base=settings.api_retry_backoff,
+            backoff_cap=settings.api_retry_backoff_max
+        )
+        
+        log.info(
+            f"API HTTP client: max_connections={limits.max_connections}, "
+            f"keepalive={limits.max_keepalive_connections}, http2={http2}"
+        )
+        
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=transport,
+            event_hooks={"request": [self._before_request]}
+        )
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Panel requests in flight and how many of them wait for a free connection"""
+        in_flight = int(api_requests_in_flight.value())
+        max_connections = settings.api_pool_max_connections
+        http2 = self._http2
+        return {
+            "in_flight": in_flight,
+            # HTTP/2 мультиплексирует запросы, очередь к пулу по счётчику не определить
+            "waiting": 0 if http2 else max(0, in_flight - max_connections),
+            "max_connections": max_connections,
+            "http2": http2,
+        }
+    
+    @property
+    def panel_available(self) -> bool:
+        """False while the circuit breaker considers the panel down"""
+        return not panel_breaker.is_open
+    
+    @staticmethod
+    async def _before_request(request: httpx.Request):
+        """Wait for a rate limiter token in the caller's priority lane"""
+        await within_deadline(api_rate_limiter.acquire())
+    
     async def close(self):
         """Close SDK client"""
         if self._sdk and self._sdk._client:
             await self._sdk._client.aclose()
             log.debug("API SDK client closed")
     
+    async def _fetch_model(
+        self,
+        controller: Any,
+        endpoint: str,
+        response_class: type,
+        params: Optional[Dict[str, Any]] = None,
+        convert: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        GET through the SDK client and return the validated model
+        
+        Large bodies are validated (and passed through ``convert``) in the
+        CPU offload pool so the event loop keeps serving other admins meanwhile.
+        """
+        response = await self.sdk._client.get(endpoint, params=params)
+        return await cpu_offloader.run(
+            self._parse_response, controller, response, response_class, convert,
+            size=len(response.content)
+        )
+    
+    @staticmethod
+    def _parse_response(
+        controller: Any,
+        response: httpx.Response,
+        response_class: type,
+        convert: Optional[Callable[[Any], Any]]
+    ) -> Any:
+        # Та же разборка ответа и маппинг ошибок, что и у методов SDK
+        model = controller._handle_response(response, response_class=response_class)
+        return convert(model) if convert else model
+    
+    async def _stream_list(
+        self,
+        endpoint: str,
+        path: Sequence[str],
+        params: Dict[str, Any],
+        envelope: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream array items of a list endpoint as plain dicts
+
+        Goes through the SDK's HTTP client, so rate limiting, retries,
+        deadlines and the connection pool apply as for SDK calls.
+        """
+        async with self.sdk._client.stream("GET", endpoint, params=params) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise RemnaWaveAPIError(
+                    f"API error: HTTP {response.status_code}", response.status_code
+                )
+            async for item in stream_json_array(response, path, envelope):
+                yield item
+    
     # ======================
     # USERS API
     # ======================
     
+    @stale_on_timeout
     async def get_users(self, page: int = 1, limit: int = 50) -> Dict[str, Any]:
         """Get paginated list of users"""
         try:
@@ -67,36 +282,98 @@ class RemnaWaveAPIClient:
             
             # SDK использует start/size вместо page/limit
             start = (page - 1) * limit
-            response: UsersResponseDto = await self.sdk.users.get_all_users_v2(
-                start=start,
-                size=limit
+            response: UsersResponseDto = await self._fetch_model(
+                self.sdk.users, "/users", UsersResponseDto,
+                params={"start": start, "size": limit}
             )
             
             # Возвращаем в формате, совместимом со старым API
             return {
                 "response": {
-                    "users": [user.model_dump(by_alias=True) for user in response.users],
+                    "users": UserView.wrap_all(response.users),
                     "total": response.total
                 }
             }
         except ApiError as e:
             log.error(f"SDK API error: {e}")
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Unexpected error fetching users: {e}")
-            raise RemnaWaveAPIError(f"Error fetching users: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching users: {str(e)}") from e
+    
+    async def get_users_raw(
+        self,
+        page: int = 1,
+        limit: int = 50,
+        convert: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get paginated list of users without building SDK models
+
+        Same shape as get_users, but users are plain dicts decoded from the
+        streamed body: dates and UUIDs stay ISO strings, enums stay strings.
+        ``convert`` is applied to each user as soon as it is parsed.
+        """
+        try:
+            log.info(f"Streaming users (page={page}, limit={limit})")
+            envelope: Dict[str, Any] = {}
+            users = [
+                convert(user) if convert else user
+                async for user in self._stream_list(
+                    "/users",
+                    ("response", "users"),
+                    {"start": (page - 1) * limit, "size": limit},
+                    envelope
+                )
+            ]
+            return {
+                "response": {
+                    "users": users,
+                    "total": envelope.get("response", {}).get("total", len(users))
+                }
+            }
+        except RemnaWaveAPIError:
+            raise
+        except Exception as e:
+            log.exception(f"Unexpected error streaming users: {e}")
+            raise RemnaWaveAPIError(f"Error fetching users: {str(e)}") from e
+    
+    async def get_users_bulk(self, page: int = 1, limit: int = 50) -> Dict[str, Any]:
+        """Users page for bulk processing (export, mass operations)"""
+        if settings.api_streaming_reads:
+            return await self.get_users_raw(page=page, limit=limit)
+        return await self.get_users(page=page, limit=limit)
+    
+    async def get_user_records(self, page: int = 1, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Users page as compact UserRecord objects, for holding many users in memory
+        
+        With streaming reads every user is converted right after parsing,
+        so full user dicts of the page are never kept at the same time.
+        """
+        if settings.api_streaming_reads:
+            return await self.get_users_raw(page=page, limit=limit, convert=UserRecord.from_api)
+        response = await self.get_users(page=page, limit=limit)
+        data = response.get('response', {})
+        return {
+            "response": {
+                "users": records_from_users(data.get('users', [])),
+                "total": data.get('total', 0)
+            }
+        }
     
+    @stale_on_timeout
     async def get_user(self, user_uuid: str) -> Dict[str, Any]:
         """Get user by UUID"""
         try:
             log.info(f"Fetching user {user_uuid}")
             response: UserResponseDto = await self.sdk.users.get_user_by_uuid(uuid=user_uuid)
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": UserView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching user: {e}")
-            raise RemnaWaveAPIError(f"Error fetching user: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching user: {str(e)}") from e
     
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user"""
@@ -107,12 +384,12 @@ class RemnaWaveAPIClient:
             # Создаём DTO из словаря
             create_dto = CreateUserRequestDto(**user_data)
             response: UserResponseDto = await self.sdk.users.create_user(body=create_dto)
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": UserView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error creating user: {e}")
-            raise RemnaWaveAPIError(f"Error creating user: {str(e)}")
+            raise RemnaWaveAPIError(f"Error creating user: {str(e)}") from e
     
     async def update_user(self, user_uuid: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update user - создаём DTO с uuid внутри"""
@@ -125,12 +402,12 @@ class RemnaWaveAPIClient:
             response: UserResponseDto = await self.sdk.users.update_user(
                 body=update_dto
             )
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": UserView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error updating user: {e}")
-            raise RemnaWaveAPIError(f"Error updating user: {str(e)}")
+            raise RemnaWaveAPIError(f"Error updating user: {str(e)}") from e
     
     async def delete_user(self, user_uuid: str) -> Dict[str, Any]:
         """Delete user"""
@@ -139,10 +416,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.users.delete_user(uuid=user_uuid)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error deleting user: {e}")
-            raise RemnaWaveAPIError(f"Error deleting user: {str(e)}")
+            raise RemnaWaveAPIError(f"Error deleting user: {str(e)}") from e
     
     async def extend_user_subscription(
         self,
@@ -184,10 +461,10 @@ class RemnaWaveAPIClient:
             response_dict = await self.update_user(user_uuid, update_data)
             return response_dict
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error extending subscription: {e}")
-            raise RemnaWaveAPIError(f"Error extending subscription: {str(e)}")
+            raise RemnaWaveAPIError(f"Error extending subscription: {str(e)}") from e
     
     async def reset_user_traffic(self, user_uuid: str) -> Dict[str, Any]:
         """Reset user traffic to 0"""
@@ -198,39 +475,41 @@ class RemnaWaveAPIClient:
             response = await self.sdk.users.reset_user_traffic(uuid=uuid_str)
             return {"response": response.model_dump(by_alias=True) if hasattr(response, 'model_dump') else {"success": True}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error resetting traffic: {e}")
-            raise RemnaWaveAPIError(f"Error resetting traffic: {str(e)}")
+            raise RemnaWaveAPIError(f"Error resetting traffic: {str(e)}") from e
     
     # ======================
     # HOSTS API
     # ======================
     
+    @stale_on_timeout
     async def get_hosts(self) -> Dict[str, Any]:
         """Get all hosts"""
         try:
             log.info("Fetching hosts")
             response: GetAllHostsResponseDto = await self.sdk.hosts.get_all_hosts()
             # GetAllHostsResponseDto имеет поле root вместо hosts
-            return {"response": [host.model_dump(by_alias=True) for host in response.root]}
+            return {"response": HostView.wrap_all(response.root)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching hosts: {e}")
-            raise RemnaWaveAPIError(f"Error fetching hosts: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching hosts: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_host(self, host_uuid: str) -> Dict[str, Any]:
         """Get host by UUID"""
         try:
             log.info(f"Fetching host {host_uuid}")
             response = await self.sdk.hosts.get_one_host(host_uuid)
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": HostView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching host: {e}")
-            raise RemnaWaveAPIError(f"Error fetching host: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching host: {str(e)}") from e
     
     async def create_host(self, host_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new host"""
@@ -241,10 +520,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hosts.create_host(body=create_dto)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error creating host: {e}")
-            raise RemnaWaveAPIError(f"Error creating host: {str(e)}")
+            raise RemnaWaveAPIError(f"Error creating host: {str(e)}") from e
     
     async def update_host(self, host_uuid: str, host_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update host"""
@@ -257,10 +536,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hosts.update_host(body=update_dto)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error updating host: {e}")
-            raise RemnaWaveAPIError(f"Error updating host: {str(e)}")
+            raise RemnaWaveAPIError(f"Error updating host: {str(e)}") from e
     
     async def delete_host(self, host_uuid: str) -> Dict[str, Any]:
         """Delete host"""
@@ -270,10 +549,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hosts.delete_host(host_uuid)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error deleting host: {e}")
-            raise RemnaWaveAPIError(f"Error deleting host: {str(e)}")
+            raise RemnaWaveAPIError(f"Error deleting host: {str(e)}") from e
     
     async def create_host(self, create_data: "CreateHostRequestDto") -> Dict[str, Any]:
         """Create new host"""
@@ -282,15 +561,16 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hosts.create_host(body=create_data)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error creating host: {e}")
-            raise RemnaWaveAPIError(f"Error creating host: {str(e)}")
+            raise RemnaWaveAPIError(f"Error creating host: {str(e)}") from e
     
     # ======================
     # INBOUNDS API
     # ======================
     
+    @stale_on_timeout
     async def get_inbounds(self) -> Dict[str, Any]:
         """Fetch all inbounds"""
         try:
@@ -298,52 +578,55 @@ class RemnaWaveAPIClient:
             response = await self.sdk.inbounds.get_all_inbounds()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching inbounds: {e}")
-            raise RemnaWaveAPIError(f"Error fetching inbounds: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching inbounds: {str(e)}") from e
     
     # ======================
     # NODES API
     # ======================
     
+    @stale_on_timeout
     async def get_nodes(self) -> Dict[str, Any]:
         """Get all nodes"""
         try:
             log.info("Fetching nodes")
             response: GetAllNodesResponseDto = await self.sdk.nodes.get_all_nodes()
             # GetAllNodesResponseDto имеет поле root вместо nodes
-            return {"response": [node.model_dump(by_alias=True) for node in response.root]}
+            return {"response": NodeView.wrap_all(response.root)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching nodes: {e}")
-            raise RemnaWaveAPIError(f"Error fetching nodes: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching nodes: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_node(self, node_uuid: str) -> Dict[str, Any]:
         """Get node by UUID"""
         try:
             log.info(f"Fetching node {node_uuid}")
             response = await self.sdk.nodes.get_one_node(uuid=node_uuid)
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": NodeView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching node: {e}")
-            raise RemnaWaveAPIError(f"Error fetching node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching node: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_node_stats(self, node_uuid: str) -> Dict[str, Any]:
         """Get node statistics"""
         try:
             log.info(f"Fetching stats for node {node_uuid}")
             # SDK пока не имеет этого метода, используем базовую информацию
             response = await self.sdk.nodes.get_one_node(uuid=node_uuid)
-            return {"response": response.model_dump(by_alias=True)}
+            return {"response": NodeView(response)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching node stats: {e}")
-            raise RemnaWaveAPIError(f"Error fetching node stats: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching node stats: {str(e)}") from e
     
     async def create_node(self, node_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new node"""
@@ -354,10 +637,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.create_node(body=create_dto)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error creating node: {e}")
-            raise RemnaWaveAPIError(f"Error creating node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error creating node: {str(e)}") from e
     
     async def update_node(self, update_data) -> Dict[str, Any]:
         """Update node"""
@@ -366,10 +649,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.update_node(body=update_data)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error updating node: {e}")
-            raise RemnaWaveAPIError(f"Error updating node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error updating node: {str(e)}") from e
     
     async def enable_node(self, node_uuid: str) -> Dict[str, Any]:
         """Enable node"""
@@ -378,10 +661,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.enable_node(uuid=node_uuid)
             return {"response": response.model_dump(by_alias=True) if hasattr(response, 'model_dump') else {}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error enabling node: {e}")
-            raise RemnaWaveAPIError(f"Error enabling node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error enabling node: {str(e)}") from e
     
     async def disable_node(self, node_uuid: str) -> Dict[str, Any]:
         """Disable node"""
@@ -390,10 +673,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.disable_node(uuid=node_uuid)
             return {"response": response.model_dump(by_alias=True) if hasattr(response, 'model_dump') else {}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error disabling node: {e}")
-            raise RemnaWaveAPIError(f"Error disabling node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error disabling node: {str(e)}") from e
     
     async def restart_node(self, node_uuid: str) -> Dict[str, Any]:
         """Restart node"""
@@ -402,10 +685,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.restart_node(uuid=node_uuid)
             return {"response": response.model_dump(by_alias=True) if hasattr(response, 'model_dump') else {}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error restarting node: {e}")
-            raise RemnaWaveAPIError(f"Error restarting node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error restarting node: {str(e)}") from e
     
     async def delete_node(self, node_uuid: str) -> Dict[str, Any]:
         """Delete node"""
@@ -414,40 +697,76 @@ class RemnaWaveAPIClient:
             response = await self.sdk.nodes.delete_node(uuid=node_uuid)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error deleting node: {e}")
-            raise RemnaWaveAPIError(f"Error deleting node: {str(e)}")
+            raise RemnaWaveAPIError(f"Error deleting node: {str(e)}") from e
     
     # ======================
     # DEVICES (HWID) API
     # ======================
     
+    @stale_on_timeout
     async def get_devices(self) -> Dict[str, Any]:
         """Get all devices (HWID)"""
+        if settings.api_streaming_reads:
+            return await self.get_devices_raw()
         try:
             log.info("Fetching all devices")
-            response = await self.sdk.hwid.get_hwid_users()
-            return {"response": response.model_dump(by_alias=True)}
+            data = await self._fetch_model(
+                self.sdk.hwid, "/hwid/devices", GetUserHwidDevicesResponseDto,
+                convert=lambda model: model.model_dump(by_alias=True)
+            )
+            return {"response": data}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching devices: {e}")
-            raise RemnaWaveAPIError(f"Error fetching devices: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching devices: {str(e)}") from e
+    
+    async def get_devices_raw(self) -> Dict[str, Any]:
+        """
+        Get all devices (HWID) without building SDK models
+
+        Same shape as get_devices, but devices are plain dicts decoded from
+        the streamed body: dates and UUIDs stay ISO strings.
+        """
+        try:
+            log.info("Streaming all devices")
+            envelope: Dict[str, Any] = {}
+            devices = [
+                device
+                async for device in self._stream_list(
+                    "/hwid/devices", ("response", "devices"), {}, envelope
+                )
+            ]
+            return {
+                "response": {
+                    "total": envelope.get("response", {}).get("total", len(devices)),
+                    "devices": devices
+                }
+            }
+        except RemnaWaveAPIError:
+            raise
+        except Exception as e:
+            log.exception(f"Unexpected error streaming devices: {e}")
+            raise RemnaWaveAPIError(f"Error fetching devices: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_user_devices(self, user_uuid: str) -> Dict[str, Any]:
         """Get user devices (HWID)"""
         try:
             log.info(f"Fetching devices for user {user_uuid}")
             # SDK принимает позиционный аргумент, не keyword
-            response = await self.sdk.hwid.get_hwid_user(user_uuid)
+            response = await self.sdk.hwid.get_hwid_user(str(user_uuid))
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching devices: {e}")
-            raise RemnaWaveAPIError(f"Error fetching devices: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching devices: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_all_devices_stats(self) -> Dict[str, Any]:
         """Get statistics for all devices"""
         try:
@@ -455,10 +774,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hwid.get_hwid_stats()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching device stats: {e}")
-            raise RemnaWaveAPIError(f"Error fetching device stats: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching device stats: {str(e)}") from e
     
     async def delete_device(self, user_uuid: str, hwid: str) -> Dict[str, Any]:
         """Delete device"""
@@ -477,15 +796,16 @@ class RemnaWaveAPIClient:
             response = await self.sdk.hwid.delete_hwid_to_user(body=delete_dto)
             return {"response": response.model_dump(by_alias=True) if hasattr(response, 'model_dump') else {"success": True}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error deleting device: {e}")
-            raise RemnaWaveAPIError(f"Error deleting device: {str(e)}")
+            raise RemnaWaveAPIError(f"Error deleting device: {str(e)}") from e
     
     # ======================
     # SQUADS API
     # ======================
     
+    @stale_on_timeout
     async def get_squads(self) -> Dict[str, Any]:
         """Get all squads"""
         try:
@@ -494,11 +814,12 @@ class RemnaWaveAPIClient:
             response = await self.sdk.internal_squads.get_internal_squads()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching squads: {e}")
-            raise RemnaWaveAPIError(f"Error fetching squads: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching squads: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_squad(self, squad_uuid: str) -> Dict[str, Any]:
         """Get squad by UUID"""
         try:
@@ -506,10 +827,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.internal_squads.get_internal_squad_by_uuid(uuid=squad_uuid)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching squad: {e}")
-            raise RemnaWaveAPIError(f"Error fetching squad: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching squad: {str(e)}") from e
     
     async def create_squad(self, squad_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new squad"""
@@ -520,10 +841,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.internal_squads.create_internal_squad(body=create_dto)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error creating squad: {e}")
-            raise RemnaWaveAPIError(f"Error creating squad: {str(e)}")
+            raise RemnaWaveAPIError(f"Error creating squad: {str(e)}") from e
     
     async def update_squad(self, squad_uuid: str, squad_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update squad"""
@@ -534,10 +855,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.internal_squads.update_internal_squad(uuid=squad_uuid, body=update_dto)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error updating squad: {e}")
-            raise RemnaWaveAPIError(f"Error updating squad: {str(e)}")
+            raise RemnaWaveAPIError(f"Error updating squad: {str(e)}") from e
     
     async def delete_squad(self, squad_uuid: str) -> Dict[str, Any]:
         """Delete squad"""
@@ -546,15 +867,16 @@ class RemnaWaveAPIClient:
             response = await self.sdk.internal_squads.delete_internal_squad(uuid=squad_uuid)
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error deleting squad: {e}")
-            raise RemnaWaveAPIError(f"Error deleting squad: {str(e)}")
+            raise RemnaWaveAPIError(f"Error deleting squad: {str(e)}") from e
     
     # ======================
     # SYSTEM API
     # ======================
     
+    @stale_on_timeout
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics"""
         try:
@@ -562,11 +884,12 @@ class RemnaWaveAPIClient:
             response: GetStatsResponseDto = await self.sdk.system.get_stats()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching system stats: {e}")
-            raise RemnaWaveAPIError(f"Error fetching system stats: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching system stats: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_bandwidth_stats(self) -> Dict[str, Any]:
         """Get bandwidth statistics"""
         try:
@@ -574,11 +897,12 @@ class RemnaWaveAPIClient:
             response = await self.sdk.system.get_bandwidth_stats()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching bandwidth stats: {e}")
-            raise RemnaWaveAPIError(f"Error fetching bandwidth stats: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching bandwidth stats: {str(e)}") from e
     
+    @stale_on_timeout
     async def get_nodes_statistics(self) -> Dict[str, Any]:
         """Get nodes statistics"""
         try:
@@ -586,10 +910,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.system.get_nodes_statistics()
             return {"response": response.model_dump(by_alias=True)}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error fetching nodes statistics: {e}")
-            raise RemnaWaveAPIError(f"Error fetching nodes statistics: {str(e)}")
+            raise RemnaWaveAPIError(f"Error fetching nodes statistics: {str(e)}") from e
     
     async def restart_xray(self) -> Dict[str, Any]:
         """Restart Xray service"""
@@ -598,131 +922,10 @@ class RemnaWaveAPIClient:
             response = await self.sdk.system.restart_xray()
             return {"response": {"success": True, "message": "Xray restarted"}}
         except ApiError as e:
-            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.error.status)
+            raise RemnaWaveAPIError(f"API error: {e.error.code}", e.status_code)
         except Exception as e:
             log.exception(f"Error restarting Xray: {e}")
-            raise RemnaWaveAPIError(f"Error restarting Xray: {str(e)}")
-    
-    # ======================
-    # MASS OPERATIONS
-    # ======================
-    
-    async def mass_activate_users(self) -> Dict[str, Any]:
-        """Activate all users"""
-        try:
-            log.info("Mass activating users")
-            # Get all users first
-            response = await self.get_users(page=1, limit=1000)
-            users = response.get('response', {}).get('users', [])
-            
-            success_count = 0
-            failed_count = 0
-            
-            for user in users:
-                try:
-                    uuid = user.get('uuid')
-                    if uuid:
-                        await self.update_user(uuid, {"status": "ACTIVE"})
-                        success_count += 1
-                except Exception:
-                    failed_count += 1
-            
-            return {
-                "response": {
-                    "successCount": success_count,
-                    "failedCount": failed_count
-                }
-            }
-        except Exception as e:
-            log.exception(f"Error in mass activate: {e}")
-            raise RemnaWaveAPIError(f"Error in mass activate: {str(e)}")
-    
-    async def mass_deactivate_users(self) -> Dict[str, Any]:
-        """Deactivate all users"""
-        try:
-            log.info("Mass deactivating users")
-            response = await self.get_users(page=1, limit=1000)
-            users = response.get('response', {}).get('users', [])
-            
-            success_count = 0
-            failed_count = 0
-            
-            for user in users:
-                try:
-                    uuid = user.get('uuid')
-                    if uuid:
-                        await self.update_user(uuid, {"status": "DISABLED"})
-                        success_count += 1
-                except Exception:
-                    failed_count += 1
-            
-            return {
-                "response": {
-                    "successCount": success_count,
-                    "failedCount": failed_count
-                }
-            }
-        except Exception as e:
-            log.exception(f"Error in mass deactivate: {e}")
-            raise RemnaWaveAPIError(f"Error in mass deactivate: {str(e)}")
-    
-    async def mass_reset_traffic(self) -> Dict[str, Any]:
-        """Reset traffic for all users"""
-        try:
-            log.info("Mass resetting traffic")
-            response = await self.get_users(page=1, limit=1000)
-            users = response.get('response', {}).get('users', [])
-            
-            success_count = 0
-            failed_count = 0
-            
-            for user in users:
-                try:
-                    uuid = user.get('uuid')
-                    if uuid:
-                        await self.reset_user_traffic(uuid)
-                        success_count += 1
-                except Exception:
-                    failed_count += 1
-            
-            return {
-                "response": {
-                    "successCount": success_count,
-                    "failedCount": failed_count
-                }
-            }
-        except Exception as e:
-            log.exception(f"Error in mass reset traffic: {e}")
-            raise RemnaWaveAPIError(f"Error in mass reset traffic: {str(e)}")
-    
-    async def mass_extend_users(self, days: int) -> Dict[str, Any]:
-        """Extend all users subscription by N days"""
-        try:
-            log.info(f"Mass extending users by {days} days")
-            response = await self.get_users(page=1, limit=1000)
-            users = response.get('response', {}).get('users', [])
-            
-            success_count = 0
-            failed_count = 0
-            
-            for user in users:
-                try:
-                    uuid = user.get('uuid')
-                    if uuid:
-                        await self.extend_user_subscription(uuid, days)
-                        success_count += 1
-                except Exception:
-                    failed_count += 1
-            
-            return {
-                "response": {
-                    "successCount": success_count,
-                    "failedCount": failed_count
-                }
-            }
-        except Exception as e:
-            log.exception(f"Error in mass extend: {e}")
-            raise RemnaWaveAPIError(f"Error in mass extend: {str(e)}")
+            raise RemnaWaveAPIError(f"Error restarting Xray: {str(e)}") from e
 
 
 # Создаём глобальный экземпляр клиента
@@ -2,11 +2,15 @@
 Cache service module using Redis
 """
 import json
-from typing import Optional, Any
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
 from datetime import timedelta
 import redis.asyncio as aioredis
 from src.core.config import settings
 from src.core.logger import log
+from src.services.metrics import cache_operation_seconds, cache_requests_total
+from src.services.tracing import tracer
 
 
 class CacheService:
@@ -18,11 +22,23 @@ class CacheService:
         self.redis: Optional[aioredis.Redis] = None
         self.enabled = settings.redis_enabled
         
+    @contextmanager
+    def _observe(self, op: str, key: str) -> Iterator[None]:
+        """Latency metric and trace span of one cache operation"""
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"cache.{op}", kind="cache", key=key):
+                yield
+        finally:
+            cache_operation_seconds.observe(time.perf_counter() - started, op=op)
+    
     async def connect(self):
         """Connect to Redis"""
         if not self.enabled:
             log.info("Redis caching is disabled")
             return
+        if self.redis is not None:
+            return
         
         try:
             self.redis = await aioredis.from_url(
@@ -41,6 +57,7 @@ class CacheService:
         """Disconnect from Redis"""
         if self.redis:
             await self.redis.close()
+            self.redis = None
             log.info("Disconnected from Redis")
     
     async def get(self, key: str) -> Optional[Any]:
@@ -48,16 +65,20 @@ class CacheService:
         if not self.enabled or not self.redis:
             return None
         
-        try:
-            value = await self.redis.get(key)
-            if value:
-                log.debug(f"Cache hit: {key}")
-                return json.loads(value)
-            log.debug(f"Cache miss: {key}")
-            return None
-        except Exception as e:
-            log.error(f"Error getting from cache: {e}")
-            return None
+        with self._observe("get", key):
+            try:
+                value = await self.redis.get(key)
+                if value:
+                    log.debug(f"Cache hit: {key}")
+                    cache_requests_total.inc(op="get", result="hit")
+                    return json.loads(value)
+                log.debug(f"Cache miss: {key}")
+                cache_requests_total.inc(op="get", result="miss")
+                return None
+            except Exception as e:
+                log.error(f"Error getting from cache: {e}")
+                cache_requests_total.inc(op="get", result="error")
+                return None
     
     async def set(
         self,
@@ -69,42 +90,118 @@ class CacheService:
         if not self.enabled or not self.redis:
             return
         
-        try:
-            serialized = json.dumps(value)
-            if expire:
-                await self.redis.setex(key, expire, serialized)
-            else:
-                await self.redis.set(key, serialized)
-            log.debug(f"Cache set: {key}")
-        except Exception as e:
-            log.error(f"Error setting cache: {e}")
+        with self._observe("set", key):
+            try:
+                serialized = json.dumps(value)
+                if expire:
+                    await self.redis.setex(key, expire, serialized)
+                else:
+                    await self.redis.set(key, serialized)
+                log.debug(f"Cache set: {key}")
+                cache_requests_total.inc(op="set", result="ok")
+            except Exception as e:
+                log.error(f"Error setting cache: {e}")
+                cache_requests_total.inc(op="set", result="error")
     
     async def delete(self, key: str):
         """Delete value from cache"""
         if not self.enabled or not self.redis:
             return
         
-        try:
-            await self.redis.delete(key)
-            log.debug(f"Cache deleted: {key}")
-        except Exception as e:
-            log.error(f"Error deleting from cache: {e}")
+        with self._observe("delete", key):
+            try:
+                await self.redis.delete(key)
+                log.debug(f"Cache deleted: {key}")
+                cache_requests_total.inc(op="delete", result="ok")
+            except Exception as e:
+                log.error(f"Error deleting from cache: {e}")
+                cache_requests_total.inc(op="delete", result="error")
     
     async def clear_pattern(self, pattern: str):
         """Clear all keys matching pattern"""
         if not self.enabled or not self.redis:
             return
         
-        try:
-            keys = []
-            async for key in self.redis.scan_iter(match=pattern):
-                keys.append(key)
+        with self._observe("clear_pattern", pattern):
+            try:
+                keys = []
+                async for key in self.redis.scan_iter(match=pattern):
+                    keys.append(key)
             
-            if keys:
-                await self.redis.delete(*keys)
-                log.debug(f"Cleared {len(keys)} keys matching pattern: {pattern}")
-        except Exception as e:
-            log.error(f"Error clearing cache pattern: {e}")
+                if keys:
+                    await self.redis.delete(*keys)
+                    log.debug(f"Cleared {len(keys)} keys matching pattern: {pattern}")
+                cache_requests_total.inc(op="clear_pattern", result="ok")
+            except Exception as e:
+                log.error(f"Error clearing cache pattern: {e}")
+                cache_requests_total.inc(op="clear_pattern", result="error")
+
+    
+    async def get_pattern(self, pattern: str) -> Dict[str, Any]:
+        """Get all values whose keys match pattern"""
+        if not self.enabled or not self.redis:
+            return {}
+        
+        with self._observe("get_pattern", pattern):
+            try:
+                keys = [key async for key in self.redis.scan_iter(match=pattern)]
+                values = await self.redis.mget(keys) if keys else []
+                cache_requests_total.inc(op="get_pattern", result="ok")
+                return {key: json.loads(value) for key, value in zip(keys, values) if value}
+            except Exception as e:
+                log.error(f"Error getting cache pattern: {e}")
+                cache_requests_total.inc(op="get_pattern", result="error")
+                return {}
+    
+    async def hash_set(self, key: str, field: str, value: str):
+        """Set one field of a Redis hash"""
+        if not self.enabled or not self.redis:
+            return
+        
+        with self._observe("hash_set", key):
+            try:
+                await self.redis.hset(key, field, value)
+                cache_requests_total.inc(op="hash_set", result="ok")
+            except Exception as e:
+                log.error(f"Error setting cache hash field: {e}")
+                cache_requests_total.inc(op="hash_set", result="error")
+    
+    async def hash_get_all(self, key: str) -> Dict[str, str]:
+        """All fields of a Redis hash"""
+        if not self.enabled or not self.redis:
+            return {}
+        
+        with self._observe("hash_get_all", key):
+            try:
+                fields = await self.redis.hgetall(key)
+                cache_requests_total.inc(op="hash_get_all", result="ok")
+                return fields
+            except Exception as e:
+                log.error(f"Error getting cache hash: {e}")
+                cache_requests_total.inc(op="hash_get_all", result="error")
+                return {}
+    
+    async def write_batch(self, writes: Dict[str, Any], expire: Optional[timedelta] = None) -> bool:
+        """Set or delete (value None) many keys in one round trip; values must be plain JSON data"""
+        if not self.enabled or not self.redis or not writes:
+            return False
+        
+        with self._observe("write_batch", f"{len(writes)} keys"):
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, value in writes.items():
+                    if value is None:
+                        pipe.delete(key)
+                    else:
+                        # Компактный JSON: без пробелов и \u-экранирования кириллицы
+                        pipe.set(key, json.dumps(value, separators=(",", ":"), ensure_ascii=False), ex=expire)
+                await pipe.execute()
+                cache_requests_total.inc(op="write_batch", result="ok")
+                return True
+            except Exception as e:
+                log.error(f"Error writing cache batch: {e}")
+                cache_requests_total.inc(op="write_batch", result="error")
+                return False
 
 
 # Create global cache service instance
@@ -0,0 +1,232 @@
+"""
+Adaptive concurrency control for panel API fan-out
+AIMD: the limit grows by one while latency and errors stay under targets
+and is cut multiplicatively on timeouts, 429 and 5xx responses
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.metrics import api_concurrency_in_flight, api_concurrency_limit
+
+T = TypeVar("T")
+
+# Результаты запроса с точки зрения лимитера
+OK = "ok"
+ERROR = "error"
+OVERLOAD = "overload"
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status_code = getattr(exc, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Classify a failed call for the limiter
+
+    Timeouts, 429 and 5xx mean the panel is overloaded. Other transport
+    errors count towards the error rate. Client errors (4xx) are the
+    caller's problem and do not affect concurrency.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException)):
+            return OVERLOAD
+        status_code = _status_code(exc)
+        if status_code is not None:
+            if status_code == 429 or status_code >= 500:
+                return OVERLOAD
+            return OK
+        if isinstance(exc, httpx.TransportError):
+            return ERROR
+        exc = exc.__cause__ or exc.__context__
+    return ERROR
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter
+
+    Usage:
+        async with api_limiter.slot():
+            await api_client.update_user(...)
+
+    Every ``window`` completed calls the limiter compares the p95 latency and
+    the error rate with the targets and adds one slot if both are fine.
+    An overload signal halves the limit immediately; signals from calls that
+    started before the last cut are ignored, so one burst cuts only once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        target_p95: float,
+        max_error_rate: float,
+        window: int = 20,
+        backoff: float = 0.5
+    ):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.window = max(1, window)
+        self.backoff = backoff
+
+        self._limit = min(max(initial, self.min_limit), self.max_limit)
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latencies: list = []
+        self._errors = 0
+        self._last_decrease = 0.0
+
+        self.total_calls = 0
+        self.total_overloads = 0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit"""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state for metrics and diagnostics"""
+        return {
+            "name": self.name,
+            "limit": self._limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "calls": self.total_calls,
+            "overloads": self.total_overloads,
+        }
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot and report the call outcome on exit"""
+        await self._acquire()
+        started = time.monotonic()
+        outcome = OK
+        try:
+            yield
+        except asyncio.CancelledError:
+            outcome = None
+            raise
+        except Exception as e:
+            outcome = classify_error(e)
+            raise
+        finally:
+            self._release()
+            if outcome is not None:
+                self._record(outcome, started, time.monotonic() - started)
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Call ``func`` inside a slot"""
+        async with self.slot():
+            return await func(*args, **kwargs)
+
+    async def _acquire(self):
+        while self._in_flight >= self._limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Нас разбудили, но мы отменены — передаём слот дальше
+                    self._wake()
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                raise
+        self._in_flight += 1
+        self._publish()
+
+    def _release(self):
+        self._in_flight -= 1
+        self._publish()
+        self._wake()
+
+    def _publish(self):
+        api_concurrency_limit.set(self._limit, limiter=self.name)
+        api_concurrency_in_flight.set(self._in_flight, limiter=self.name)
+
+    def _wake(self):
+        free = self._limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _record(self, outcome: str, started: float, latency: float):
+        self.total_calls += 1
+
+        if outcome == OVERLOAD:
+            self.total_overloads += 1
+            if started >= self._last_decrease:
+                self._decrease()
+            return
+
+        self._latencies.append(latency)
+        if outcome == ERROR:
+            self._errors += 1
+
+        if len(self._latencies) < self.window:
+            return
+
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        error_rate = self._errors / len(latencies)
+        self._reset_window()
+
+        if p95 <= self.target_p95 and error_rate <= self.max_error_rate:
+            if self._limit < self.max_limit:
+                self._limit += 1
+                self._publish()
+                log.debug(
+                    f"Limiter {self.name}: limit raised to {self._limit} "
+                    f"(p95={p95 * 1000:.0f}ms, errors={error_rate:.0%})"
+                )
+                self._wake()
+
+    def _decrease(self):
+        new_limit = max(self.min_limit, int(self._limit * self.backoff))
+        self._last_decrease = time.monotonic()
+        self._reset_window()
+        if new_limit != self._limit:
+            log.warning(f"Limiter {self.name}: panel overloaded, limit {self._limit} -> {new_limit}")
+            self._limit = new_limit
+            self._publish()
+
+    def _reset_window(self):
+        self._latencies = []
+        self._errors = 0
+
+
+# Общий лимитер для всех массовых обращений к панели
+api_limiter = AdaptiveLimiter(
+    "panel",
+    initial=settings.api_concurrency_initial,
+    min_limit=settings.api_concurrency_min,
+    max_limit=settings.api_concurrency_max,
+    target_p95=settings.api_target_p95_ms / 1000,
+    max_error_rate=settings.api_max_error_rate
+)
@@ -0,0 +1,75 @@
+"""
+Per-update time budget for panel API calls
+The handler layer sets a deadline for the current update; every panel
+request made while handling it is cancelled once the budget is spent
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Абсолютный момент (time.monotonic) окончания бюджета; None — без ограничения
+_deadline: ContextVar[Optional[float]] = ContextVar("api_deadline", default=None)
+# Исходный размер бюджета — для текста ошибки
+_budget: ContextVar[Optional[float]] = ContextVar("api_budget", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised when the update's time budget is exhausted"""
+
+    def __init__(self, budget: Optional[float] = None):
+        text = "Панель не ответила вовремя"
+        if budget:
+            text += f" (лимит {budget:g} с)"
+        super().__init__(text)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Limit API calls inside the block to ``seconds`` in total (None removes the limit)"""
+    deadline = time.monotonic() + seconds if seconds else None
+    current = _deadline.get()
+    if deadline is not None and current is not None:
+        # Вложенный бюджет не может продлить внешний
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    budget_token = _budget.set(seconds or None)
+    try:
+        yield
+    finally:
+        _budget.reset(budget_token)
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, None if unlimited"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def fits(delay: float) -> bool:
+    """Whether waiting ``delay`` seconds still leaves time in the budget"""
+    left = remaining()
+    return left is None or delay < left
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await with the remaining budget as timeout, raising DeadlineExceeded"""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(_budget.get())
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(_budget.get()) from None
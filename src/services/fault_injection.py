@@ -0,0 +1,184 @@
+"""
+Latency and fault injection for panel HTTP requests
+For reproducing a slow or flaky panel on a dev machine; never enable in production
+
+Rules are set with API_FAULT_INJECTION, separated by ";":
+
+    [METHOD] PATH_PATTERN: key=value ...
+
+PATH_PATTERN is a glob matched against the path without the /api prefix
+(``/users*``, ``/nodes/*``, ``*``). The first matching rule applies.
+
+    latency=300        fixed delay, ms
+    latency=100-800    uniform delay, ms
+    latency=exp:250    exponential delay with the given mean, ms
+    error=0.1          probability of a failure
+    status=503         what a failure looks like: HTTP status code,
+                       "timeout" (read timeout) or "reset" (connection error)
+    retry_after=2      Retry-After header for injected 429/503 responses
+
+Example:
+    API_FAULT_INJECTION="GET /users*: latency=200-900 error=0.2 status=503; *: latency=exp:50"
+"""
+import asyncio
+import fnmatch
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.core.logger import log
+
+FAILURE_KINDS = ("timeout", "reset")
+
+
+class FaultSpecError(ValueError):
+    """Invalid API_FAULT_INJECTION rule"""
+
+
+@dataclass
+class FaultRule:
+    """Injection settings for requests matching one pattern"""
+    pattern: str
+    method: Optional[str] = None
+    latency: Tuple[str, float, float] = ("fixed", 0.0, 0.0)
+    error_rate: float = 0.0
+    failure: str = "503"
+    retry_after: Optional[float] = None
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method and self.method != method:
+            return False
+        return fnmatch.fnmatchcase(path, self.pattern)
+
+    def delay(self, rng: random.Random) -> float:
+        """Latency for one request, seconds"""
+        kind, a, b = self.latency
+        if kind == "uniform":
+            ms = rng.uniform(a, b)
+        elif kind == "exp":
+            ms = rng.expovariate(1 / a) if a > 0 else 0.0
+        else:
+            ms = a
+        return ms / 1000
+
+
+def _parse_latency(value: str) -> Tuple[str, float, float]:
+    if value.startswith("exp:"):
+        return ("exp", float(value[4:]), 0.0)
+    if "-" in value:
+        low, high = value.split("-", 1)
+        return ("uniform", float(low), float(high))
+    return ("fixed", float(value), 0.0)
+
+
+def parse_rules(spec: str) -> List[FaultRule]:
+    """Parse the API_FAULT_INJECTION string"""
+    rules = []
+    for chunk in spec.split(";"):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        target, sep, options = chunk.partition(":")
+        if not sep:
+            raise FaultSpecError(f"Rule without ':' — {chunk!r}")
+
+        parts = target.split()
+        if len(parts) == 2:
+            rule = FaultRule(pattern=parts[1], method=parts[0].upper())
+        elif len(parts) == 1:
+            rule = FaultRule(pattern=parts[0])
+        else:
+            raise FaultSpecError(f"Invalid target {target!r}")
+
+        for option in options.split():
+            key, _, value = option.partition("=")
+            try:
+                if key == "latency":
+                    rule.latency = _parse_latency(value)
+                elif key == "error":
+                    rule.error_rate = float(value)
+                elif key == "status":
+                    if value not in FAILURE_KINDS:
+                        int(value)
+                    rule.failure = value
+                elif key == "retry_after":
+                    rule.retry_after = float(value)
+                else:
+                    raise FaultSpecError(f"Unknown option {key!r} in {chunk!r}")
+            except ValueError as e:
+                if isinstance(e, FaultSpecError):
+                    raise
+                raise FaultSpecError(f"Invalid value {option!r} in {chunk!r}") from e
+        rules.append(rule)
+    return rules
+
+
+class FaultInjectionTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport wrapper that delays and fails requests by rules
+
+    Sits under the retry/circuit breaker transport, so injected faults
+    are handled exactly like real ones. With ``seed`` the sequence of
+    delays and failures is reproducible.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        rules: List[FaultRule],
+        seed: Optional[int] = None,
+        base_path: str = "/api"
+    ):
+        self._transport = transport
+        self.rules = rules
+        self.base_path = base_path.rstrip("/")
+        self._rng = random.Random(seed)
+        self.injected: Dict[str, int] = {"delayed": 0, "failed": 0}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.injected)
+
+    def _rule_for(self, request: httpx.Request) -> Optional[FaultRule]:
+        path = request.url.path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):] or "/"
+        for rule in self.rules:
+            if rule.matches(request.method, path):
+                return rule
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        rule = self._rule_for(request)
+        if rule is None:
+            return await self._transport.handle_async_request(request)
+
+        delay = rule.delay(self._rng)
+        failed = rule.error_rate > 0 and self._rng.random() < rule.error_rate
+        if delay > 0:
+            self.injected["delayed"] += 1
+            await asyncio.sleep(delay)
+        if not failed:
+            return await self._transport.handle_async_request(request)
+
+        self.injected["failed"] += 1
+        log.debug(f"Injected fault {rule.failure} for {request.method} {request.url.path}")
+        if rule.failure == "timeout":
+            raise httpx.ReadTimeout("Injected read timeout", request=request)
+        if rule.failure == "reset":
+            raise httpx.ConnectError("Injected connection error", request=request)
+
+        status = int(rule.failure)
+        headers = {}
+        if rule.retry_after is not None:
+            headers["Retry-After"] = f"{rule.retry_after:g}"
+        return httpx.Response(
+            status,
+            headers=headers,
+            json={"message": "Injected fault", "statusCode": status},
+            request=request
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
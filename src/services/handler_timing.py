@@ -0,0 +1,105 @@
+"""
+Per-handler timing: wall time split into panel API and Telegram time
+admin_only opens a HandlerTiming for every handler call; the API client
+and the Bot API request add the time they spend to the current one
+"""
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from src.core.config import settings
+from src.core.logger import log
+
+_current: ContextVar[Optional["HandlerTiming"]] = ContextVar("handler_timing", default=None)
+
+
+def describe_update(update: Any) -> str:
+    """What the admin pressed or sent, without free-form text"""
+    query = getattr(update, "callback_query", None)
+    if query is not None:
+        return f"callback={query.data!r}"
+    message = getattr(update, "message", None)
+    text = getattr(message, "text", None) if message is not None else None
+    if text:
+        # Введённый текст (поиск, лимиты) не логируем — только команды
+        return f"command={text.split()[0]!r}" if text.startswith("/") else f"text({len(text)} chars)"
+    if message is not None and getattr(message, "document", None):
+        return "document"
+    return "update"
+
+
+@dataclass
+class HandlerTiming:
+    """Timing of one handler call; use as a context manager around the handler"""
+    handler: str
+    details: str = ""
+    started: float = field(default_factory=time.perf_counter)
+    wall: float = 0.0
+    # Суммарное ожидание: параллельные запросы могут дать больше wall
+    api_seconds: float = 0.0
+    api_calls: int = 0
+    telegram_seconds: float = 0.0
+    telegram_calls: int = 0
+    error: Optional[str] = None
+    _token: Optional[Token] = field(default=None, repr=False)
+
+    @property
+    def other_seconds(self) -> float:
+        """Wall time not spent waiting for the panel or Telegram"""
+        return max(0.0, self.wall - self.api_seconds - self.telegram_seconds)
+
+    def __enter__(self) -> "HandlerTiming":
+        self.started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.started
+        _current.reset(self._token)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.error = exc_type.__name__
+
+        # Вложенный обработчик (один вызывает другой) учитывается и во внешнем
+        parent = _current.get()
+        if parent is not None:
+            parent.api_seconds += self.api_seconds
+            parent.api_calls += self.api_calls
+            parent.telegram_seconds += self.telegram_seconds
+            parent.telegram_calls += self.telegram_calls
+
+        threshold = settings.slow_handler_threshold
+        if threshold and self.wall >= threshold:
+            log.warning(f"Slow handler {self.summary()}")
+        return False
+
+    def summary(self) -> str:
+        text = (
+            f"{self.handler} {self.wall * 1000:.0f} ms: "
+            f"API {self.api_seconds * 1000:.0f} ms/{self.api_calls}, "
+            f"Telegram {self.telegram_seconds * 1000:.0f} ms/{self.telegram_calls}, "
+            f"other {self.other_seconds * 1000:.0f} ms"
+        )
+        if self.details:
+            text += f" [{self.details}]"
+        if self.error:
+            text += f" error={self.error}"
+        return text
+
+
+def current_timing() -> Optional[HandlerTiming]:
+    return _current.get()
+
+
+def record_api(seconds: float):
+    timing = _current.get()
+    if timing is not None:
+        timing.api_seconds += seconds
+        timing.api_calls += 1
+
+
+def record_telegram(seconds: float):
+    timing = _current.get()
+    if timing is not None:
+        timing.telegram_seconds += seconds
+        timing.telegram_calls += 1
@@ -0,0 +1,432 @@
+"""
+Background jobs service
+Long-running operations run as asyncio tasks with persisted checkpoints,
+so they can be cancelled, inspected and resumed after a restart
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from telegram import Bot, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.cache import cache_service
+from src.services.rate_limiter import background_lane
+from src.utils.progress import ProgressReporter
+
+
+class JobStatus:
+    """Job lifecycle states"""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+    ACTIVE = (PENDING, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a runner when the job was cancelled"""
+
+
+@dataclass
+class Job:
+    """Persisted job state"""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    title: str
+    status: str = JobStatus.PENDING
+    chat_id: Optional[int] = None
+    message_id: Optional[int] = None
+    total: int = 0
+    processed: int = 0
+    success: int = 0
+    failed: int = 0
+    checkpoint: Dict[str, Any] = field(default_factory=dict)
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in JobStatus.ACTIVE
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+class FileJobStore:
+    """Stores jobs in a local JSON file (atomic replace on every save)"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    async def load(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        try:
+            return json.loads(await asyncio.to_thread(self.path.read_text, "utf-8"))
+        except Exception as e:
+            log.error(f"Failed to load jobs from {self.path}: {e}")
+            return []
+
+    async def save(self, jobs: List[Dict[str, Any]]):
+        await asyncio.to_thread(self._write, json.dumps(jobs, ensure_ascii=False))
+
+    def _write(self, data: str):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(data, "utf-8")
+        os.replace(tmp_path, self.path)
+
+    # Состояния отдельных элементов — построчный журнал рядом с файлом задач,
+    # чтобы не переписывать весь JSON после каждого пользователя
+    def _items_path(self, job_id: str) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{job_id}.items")
+
+    async def load_items(self, job_id: str) -> Dict[str, str]:
+        path = self._items_path(job_id)
+        if not path.exists():
+            return {}
+        items = {}
+        for line in (await asyncio.to_thread(path.read_text, "utf-8")).splitlines():
+            item, _, state = line.partition(" ")
+            if item and state:
+                items[item] = state
+        return items
+
+    async def mark_item(self, job_id: str, item: str, state: str):
+        await asyncio.to_thread(self._append, self._items_path(job_id), f"{item} {state}\n")
+
+    async def drop_items(self, job_id: str):
+        await asyncio.to_thread(self._items_path(job_id).unlink, missing_ok=True)
+
+    def _append(self, path: Path, line: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class RedisJobStore:
+    """Stores jobs in Redis through the shared cache service"""
+
+    KEY = "remnabot:jobs"
+
+    async def load(self) -> List[Dict[str, Any]]:
+        return await cache_service.get(self.KEY) or []
+
+    async def save(self, jobs: List[Dict[str, Any]]):
+        await cache_service.set(self.KEY, jobs)
+
+    async def load_items(self, job_id: str) -> Dict[str, str]:
+        return await cache_service.hash_get_all(f"{self.KEY}:{job_id}:items")
+
+    async def mark_item(self, job_id: str, item: str, state: str):
+        await cache_service.hash_set(f"{self.KEY}:{job_id}:items", item, state)
+
+    async def drop_items(self, job_id: str):
+        await cache_service.delete(f"{self.KEY}:{job_id}:items")
+
+
+class JobContext:
+    """Handle passed to a job runner"""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self.manager = manager
+        self.job = job
+        self._progress: Optional[ProgressReporter] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.job.cancel_requested
+
+    def raise_if_cancelled(self):
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+    async def checkpoint(self, **state):
+        """Persist progress counters and resume state"""
+        self.job.checkpoint.update(state)
+        self.job.updated_at = time.time()
+        await self.manager.save()
+
+    async def load_items(self) -> Dict[str, str]:
+        """Item states recorded with mark_item, e.g. before a restart"""
+        return await self.manager.load_items(self.job)
+
+    async def mark_item(self, item: str, state: str):
+        """Persist the state of one item right away, without saving the whole job"""
+        await self.manager.mark_item(self.job, item, state)
+
+    async def notify(self, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None):
+        """Edit the message the job was started from"""
+        await self.manager.notify(self.job, text, reply_markup)
+
+    async def report_progress(self):
+        """Show job counters in the status message (throttled)"""
+        if self._progress is None:
+            self._progress = self.manager.progress_reporter(self.job)
+        job = self.job
+        await self._progress.set(job.processed, job.success, job.failed, total=job.total)
+
+
+JobRunner = Callable[[JobContext], Awaitable[Optional[str]]]
+JobMarkup = Callable[[Job], Optional[InlineKeyboardMarkup]]
+
+
+class JobManager:
+    """
+    Registry and scheduler of background jobs
+
+    Runners are registered per job kind and receive a JobContext.
+    A runner returns the final message text and is expected to call
+    ``checkpoint`` regularly and ``raise_if_cancelled`` between steps.
+    """
+
+    def __init__(self):
+        self._runners: Dict[str, JobRunner] = {}
+        self._markups: Dict[str, JobMarkup] = {}
+        self._progress_markups: Dict[str, JobMarkup] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._store = None
+        self._save_lock = asyncio.Lock()
+        self.bot: Optional[Bot] = None
+
+    def register(
+        self,
+        kind: str,
+        runner: JobRunner,
+        finished_markup: Optional[JobMarkup] = None,
+        progress_markup: Optional[JobMarkup] = None
+    ):
+        """Register a runner and the keyboards shown while a job runs and when it finishes"""
+        self._runners[kind] = runner
+        if finished_markup:
+            self._markups[kind] = finished_markup
+        if progress_markup:
+            self._progress_markups[kind] = progress_markup
+
+    async def start(self, bot: Bot):
+        """Load persisted jobs and resume the unfinished ones"""
+        self.bot = bot
+        if cache_service.enabled:
+            self._store = RedisJobStore()
+        else:
+            self._store = FileJobStore(settings.jobs_store_path)
+
+        for data in await self._store.load():
+            job = Job.from_dict(data)
+            self._jobs[job.id] = job
+
+        resumable = [job for job in self._jobs.values() if job.is_active]
+        for job in resumable:
+            if job.kind not in self._runners:
+                job.status = JobStatus.FAILED
+                job.error = f"Unknown job kind: {job.kind}"
+                continue
+            log.info(f"Resuming job {job.id} ({job.kind}) from checkpoint {job.checkpoint}")
+            self._spawn(job)
+
+        if resumable:
+            await self.save()
+
+    async def shutdown(self):
+        """Stop running tasks; their state stays active and is resumed on next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.save()
+
+    async def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        title: str,
+        chat_id: Optional[int] = None,
+        message_id: Optional[int] = None
+    ) -> Job:
+        """Create a job and start it in the background"""
+        if kind not in self._runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            id=uuid.uuid4().hex[:8],
+            kind=kind,
+            params=params,
+            title=title,
+            chat_id=chat_id,
+            message_id=message_id
+        )
+        self._jobs[job.id] = job
+        await self.save()
+
+        log.info(f"Job {job.id} ({kind}) submitted with params {params}")
+        self._spawn(job)
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Request cooperative cancellation of a job"""
+        job = self._jobs.get(job_id)
+        if not job or not job.is_active:
+            return False
+        job.cancel_requested = True
+        await self.save()
+        log.info(f"Cancellation requested for job {job_id}")
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 10) -> List[Job]:
+        """Jobs sorted from newest to oldest"""
+        jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit]
+
+    @property
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.is_active)
+
+    async def save(self):
+        """Persist all jobs, dropping the oldest finished ones over the history limit"""
+        if self._store is None:
+            return
+        async with self._save_lock:
+            finished = sorted(
+                (j for j in self._jobs.values() if not j.is_active),
+                key=lambda j: j.created_at,
+                reverse=True
+            )
+            for job in finished[settings.jobs_history_limit:]:
+                self._jobs.pop(job.id, None)
+            try:
+                await self._store.save([job.to_dict() for job in self._jobs.values()])
+            except Exception as e:
+                log.error(f"Failed to persist jobs: {e}")
+
+    async def load_items(self, job: Job) -> Dict[str, str]:
+        if self._store is None:
+            return {}
+        try:
+            return await self._store.load_items(job.id)
+        except Exception as e:
+            log.error(f"Failed to load item states of job {job.id}: {e}")
+            return {}
+
+    async def mark_item(self, job: Job, item: str, state: str):
+        if self._store is None:
+            return
+        try:
+            await self._store.mark_item(job.id, item, state)
+        except Exception as e:
+            log.error(f"Failed to persist item state of job {job.id}: {e}")
+
+    async def drop_items(self, job: Job):
+        if self._store is None:
+            return
+        try:
+            await self._store.drop_items(job.id)
+        except Exception as e:
+            log.error(f"Failed to drop item states of job {job.id}: {e}")
+
+    async def notify(self, job: Job, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None):
+        """Edit the job's status message, ignoring Telegram errors"""
+        if not self.bot or not job.chat_id or not job.message_id:
+            return
+        try:
+            await self.bot.edit_message_text(
+                text,
+                chat_id=job.chat_id,
+                message_id=job.message_id,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.HTML
+            )
+        except Exception as e:
+            log.debug(f"Failed to update job {job.id} message: {e}")
+
+    def progress_reporter(self, job: Job) -> ProgressReporter:
+        """Throttled reporter that edits the job's status message"""
+
+        async def edit(text: str, reply_markup: Optional[InlineKeyboardMarkup]):
+            if self.bot and job.chat_id and job.message_id:
+                await self.bot.edit_message_text(
+                    text,
+                    chat_id=job.chat_id,
+                    message_id=job.message_id,
+                    reply_markup=reply_markup,
+                    parse_mode=ParseMode.HTML
+                )
+
+        markup = self._progress_markups.get(job.kind)
+        return ProgressReporter(
+            edit,
+            f"{job.title} (#{job.id})",
+            total=job.total,
+            done=job.processed,
+            reply_markup=markup(job) if markup else None
+        )
+
+    def _spawn(self, job: Job):
+        task = asyncio.create_task(self._run(job), name=f"job:{job.id}")
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def _run(self, job: Job):
+        runner = self._runners[job.kind]
+        ctx = JobContext(self, job)
+
+        job.status = JobStatus.RUNNING
+        job.updated_at = time.time()
+        await self.save()
+
+        try:
+            ctx.raise_if_cancelled()
+            with background_lane():
+                final_text = await runner(ctx)
+            job.status = JobStatus.COMPLETED
+        except JobCancelled:
+            job.status = JobStatus.CANCELLED
+            final_text = (
+                f"⏹ <b>Задача #{job.id} отменена</b>\n\n"
+                f"Обработано: {job.processed} / {job.total}"
+            )
+            log.info(f"Job {job.id} cancelled at {job.processed}/{job.total}")
+        except asyncio.CancelledError:
+            # Остановка бота: состояние остаётся RUNNING и будет возобновлено
+            log.info(f"Job {job.id} interrupted, will resume from {job.checkpoint}")
+            raise
+        except Exception as e:
+            log.exception(f"Job {job.id} failed")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            final_text = f"❌ <b>Задача #{job.id} завершилась с ошибкой:</b>\n{job.error}"
+
+        job.updated_at = time.time()
+        await self.save()
+        # Задача завершена и возобновляться не будет
+        await self.drop_items(job)
+
+        if final_text:
+            markup = self._markups.get(job.kind)
+            await self.notify(job, final_text, markup(job) if markup else None)
+
+
+# Create global job manager instance
+job_manager = JobManager()
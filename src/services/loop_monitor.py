@@ -0,0 +1,163 @@
+"""
+Event loop lag monitor and blocked-loop watchdog
+
+A ticker coroutine sleeps for a short interval and records how late it
+wakes up (event_loop_lag_seconds). Lag means something ran on the loop
+without awaiting: sync DTO parsing, big string building, file I/O.
+
+A blocked loop cannot inspect itself, so a watchdog thread watches the
+ticker's heartbeat. When the loop has been stuck longer than
+LOOP_LAG_THRESHOLD it samples the loop thread's stack until the loop
+resumes and logs the most frequent stack with the update being processed.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.metrics import registry
+
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+event_loop_blocked_total = registry.counter(
+    "event_loop_blocked_total", "Times the event loop was blocked longer than the threshold"
+)
+
+# Сколько кадров стека показывать в логе
+STACK_LIMIT = 12
+
+
+class LoopMonitor:
+    """Lag histogram from a ticker coroutine plus a stack-sampling watchdog thread"""
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.25, max_samples: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_samples = max_samples
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._ticker: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # Какой апдейт обрабатывает каждая задача — для лога зависаний
+        self._updates: Dict[asyncio.Task, str] = {}
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_events = 0
+
+    @property
+    def running(self) -> bool:
+        return self._ticker is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "p99_lag_ms": round((event_loop_lag_seconds.quantile(0.99) or 0.0) * 1000, 1),
+            "blocked_events": self.blocked_events,
+            "updates_in_progress": len(self._updates),
+        }
+
+    @contextmanager
+    def track_update(self, details: str) -> Iterator[None]:
+        """Remember which update the current task is processing"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._updates[task] = details
+        try:
+            yield
+        finally:
+            if task is not None:
+                self._updates.pop(task, None)
+
+    def start(self):
+        if self._ticker is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._ticker = asyncio.create_task(self._tick())
+        if self.threshold > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        log.info(f"Event loop monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    async def _tick(self):
+        while True:
+            started = time.monotonic()
+            self._heartbeat = started
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            event_loop_lag_seconds.observe(lag)
+
+    # ======================
+    # Watchdog thread
+    # ======================
+
+    def _blocked_for(self, heartbeat: float) -> float:
+        return time.monotonic() - heartbeat - self.interval
+
+    def _watch(self):
+        poll = max(0.01, min(self.interval, self.threshold / 2))
+        while not self._stopped.wait(poll):
+            heartbeat = self._heartbeat
+            if self._blocked_for(heartbeat) >= self.threshold:
+                self._capture(heartbeat)
+
+    def _running_update(self) -> Tuple[str, str]:
+        """(task name, update details) of the task that holds the loop"""
+        task = asyncio.current_task(self._loop) if self._loop else None
+        if task is None:
+            return "-", "no task (callback)"
+        return task.get_name(), self._updates.get(task, "not an update")
+
+    def _capture(self, heartbeat: float):
+        task_name, details = self._running_update()
+        samples: Counter = Counter()
+        interval = max(0.005, self.threshold / 10)
+        # Сэмплируем стек потока цикла, пока он не оживёт
+        while self._heartbeat == heartbeat and not self._stopped.is_set():
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None and sum(samples.values()) < self.max_samples:
+                samples[tuple(traceback.format_stack(frame)[-STACK_LIMIT:])] += 1
+            del frame
+            time.sleep(interval)
+        blocked = self._blocked_for(heartbeat) if self._heartbeat == heartbeat else self.last_lag
+
+        self.blocked_events += 1
+        event_loop_blocked_total.inc()
+        total = sum(samples.values())
+        text = f"Event loop blocked for {blocked * 1000:.0f} ms in task {task_name} [{details}]"
+        if samples:
+            stack, count = samples.most_common(1)[0]
+            text += f"; most frequent of {total} stack samples ({count}):\n" + "".join(stack).rstrip()
+        log.warning(text)
+
+
+loop_monitor = LoopMonitor(interval=settings.loop_monitor_interval, threshold=settings.loop_lag_threshold)
@@ -0,0 +1,173 @@
+"""
+On-demand tracemalloc snapshots for diagnosing slow memory growth
+
+The first snapshot starts tracemalloc, so only allocations made after it
+are attributed. Every later snapshot reports the top allocation sites and
+the diff against the previous one. Tracing slows allocations down and
+costs extra memory, so stop it when the investigation is over.
+"""
+import asyncio
+import linecache
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.core.logger import log
+from src.services.state_store import approx_size
+
+# Глубина стека у каждой аллокации и размер отчёта
+TRACE_FRAMES = 10
+TOP_LINES = 30
+TOP_TRACEBACKS = 5
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    # Исходники, прочитанные для стеков прошлого отчёта
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class MemoryReport:
+    """One snapshot: the text report and its headline numbers"""
+    text: str
+    traced_bytes: int
+    peak_bytes: int
+    # Рост с предыдущего снимка; None для первого
+    growth_bytes: Optional[int]
+    number: int
+
+
+def format_bytes(size: float) -> str:
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{sign}{size:.1f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.1f} GiB"
+
+
+def describe_user_data(user_data: Mapping[Any, Mapping[str, Any]]) -> List[str]:
+    """Conversation state per key: sessions holding it and approximate JSON size"""
+    keys: Dict[str, Tuple[int, int]] = {}
+    for data in list(user_data.values()):
+        for key, value in list(data.items()):
+            try:
+                size = approx_size(value)
+            except RuntimeError:
+                # Значение поменялось в event loop, пока его сериализовали в потоке
+                size = 0
+            sessions, total = keys.get(key, (0, 0))
+            keys[key] = (sessions + 1, total + size)
+
+    lines = [f"Conversation state: {len(user_data)} users, {sum(s for s, _ in keys.values())} keys"]
+    for key, (sessions, total) in sorted(keys.items(), key=lambda item: item[1][1], reverse=True):
+        lines.append(f"  {key:<30} sessions={sessions:<5} ~{format_bytes(total)} as JSON")
+    return lines
+
+
+class MemoryProfiler:
+    """Takes tracemalloc snapshots and diffs each one against the previous"""
+
+    def __init__(self, frames: int = TRACE_FRAMES):
+        self.frames = frames
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._previous_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.snapshots = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _start(self) -> bool:
+        """Start tracing; False if it is already on. Call with the lock held"""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(self.frames)
+        log.warning(
+            f"tracemalloc started ({self.frames} frames), "
+            f"allocations are slower until /memsnap stop"
+        )
+        return True
+
+    async def stop(self):
+        """Stop tracing and forget the previous snapshot, after a snapshot in progress"""
+        async with self._lock:
+            self._previous = None
+            self._previous_at = None
+            self.snapshots = 0
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+                log.info("tracemalloc stopped")
+
+    async def snapshot(
+        self,
+        user_data: Optional[Mapping[Any, Mapping[str, Any]]] = None
+    ) -> MemoryReport:
+        """
+        Take a snapshot off the event loop and build the report
+
+        ``user_data`` (context.application.user_data) adds the conversation
+        state summary. Only references to the values are copied on the loop;
+        their JSON sizes are computed in the worker thread with the snapshot.
+        """
+        states = None
+        if user_data is not None:
+            states = {user_id: dict(data) for user_id, data in list(user_data.items())}
+        # Старт, снимок и stop() под одним замком: трассировку не остановят посреди снимка
+        async with self._lock:
+            self._start()
+            return await asyncio.to_thread(self._take, states)
+
+    def _take(self, states: Optional[Dict[Any, Dict[str, Any]]]) -> MemoryReport:
+        extra = describe_user_data(states) if states is not None else []
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        traced, peak = tracemalloc.get_traced_memory()
+        self.snapshots += 1
+        now = time.time()
+
+        lines = [
+            f"Memory snapshot #{self.snapshots} at {datetime.fromtimestamp(now):%Y-%m-%d %H:%M:%S}",
+            f"Traced: {format_bytes(traced)}, peak: {format_bytes(peak)}, "
+            f"tracemalloc overhead: {format_bytes(tracemalloc.get_tracemalloc_memory())}",
+            "",
+            *extra,
+            "",
+            f"Top {TOP_LINES} allocation sites:",
+        ]
+        for stat in snapshot.statistics("lineno")[:TOP_LINES]:
+            lines.append(f"  {stat}")
+
+        lines += ["", f"Top {TOP_TRACEBACKS} allocation tracebacks:"]
+        for stat in snapshot.statistics("traceback")[:TOP_TRACEBACKS]:
+            lines.append(f"  {stat.count} blocks, {format_bytes(stat.size)}")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+
+        growth = None
+        if self._previous is not None:
+            diff = snapshot.compare_to(self._previous, "lineno")
+            growth = sum(stat.size_diff for stat in diff)
+            lines += [
+                "",
+                f"Diff against snapshot #{self.snapshots - 1} "
+                f"({now - self._previous_at:.0f} s ago): {format_bytes(growth)}",
+            ]
+            for stat in diff[:TOP_LINES]:
+                if stat.size_diff:
+                    lines.append(f"  {stat}")
+        else:
+            lines += ["", "First snapshot: the next one will include a diff against it"]
+
+        self._previous = snapshot
+        self._previous_at = now
+        return MemoryReport("\n".join(lines) + "\n", traced, peak, growth, self.snapshots)
+
+
+memory_profiler = MemoryProfiler()
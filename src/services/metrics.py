@@ -0,0 +1,393 @@
+"""
+Prometheus-style metrics for API, cache and handler performance
+
+A small in-process registry (counters, gauges, histograms with labels)
+rendered in the Prometheus text exposition format. With METRICS_ENABLED
+the bot serves it on a local HTTP endpoint next to polling:
+
+    curl http://127.0.0.1:9090/metrics
+"""
+import asyncio
+import inspect
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.logger import log
+from src.services.handler_timing import HandlerTiming, record_api
+from src.services.tracing import tracer
+
+# Границы корзин гистограмм, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base for a metric family with a fixed set of label names"""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def total(self, **labels) -> float:
+        """Sum over all series matching the given subset of labels"""
+        positions = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        return sum(
+            v for key, v in self._values.items()
+            if all(key[i] == value for i, value in positions)
+        )
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # На каждый набор меток: счётчики корзин (последняя — +Inf), сумма, количество
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+        counts, totals = series
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[1][1]) if series else 0
+
+    def label_sets(self) -> List[Dict[str, str]]:
+        return [dict(zip(self.labelnames, key)) for key in sorted(self._series)]
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Quantile estimated from buckets, like PromQL histogram_quantile()"""
+        series = self._series.get(self._key(labels))
+        if not series or not series[1][1]:
+            return None
+        counts, totals = series
+        rank = q * totals[1]
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, totals) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {_format_value(totals[1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metric families; creating an existing name returns it"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the bot's metrics
+registry = MetricsRegistry()
+
+api_request_seconds = registry.histogram(
+    "remnawave_api_request_seconds", "Duration of RemnaWaveAPIClient method calls", ("method",)
+)
+api_errors_total = registry.counter(
+    "remnawave_api_errors_total", "Failed RemnaWaveAPIClient method calls", ("method", "kind")
+)
+cache_requests_total = registry.counter(
+    "cache_requests_total", "Cache operations by result", ("op", "result")
+)
+cache_operation_seconds = registry.histogram(
+    "cache_operation_seconds", "Duration of cache operations", ("op",), buckets=FAST_BUCKETS
+)
+handler_seconds = registry.histogram(
+    "bot_handler_seconds", "Duration of bot handlers", ("handler",)
+)
+handler_api_seconds = registry.histogram(
+    "bot_handler_api_seconds", "Time a handler spent awaiting panel API calls", ("handler",)
+)
+handler_telegram_seconds = registry.histogram(
+    "bot_handler_telegram_seconds", "Time a handler spent awaiting Bot API calls", ("handler",)
+)
+handler_errors_total = registry.counter(
+    "bot_handler_errors_total", "Handlers that raised an exception", ("handler",)
+)
+update_seconds = registry.histogram(
+    "bot_update_seconds", "Duration of processing one Telegram update"
+)
+updates_in_flight = registry.gauge(
+    "bot_updates_in_flight", "Telegram updates being processed right now"
+)
+telegram_rate_limited_total = registry.counter(
+    "bot_telegram_rate_limited_total", "Bot API requests answered with 429 Too Many Requests", ("method",)
+)
+api_requests_in_flight = registry.gauge(
+    "remnawave_api_requests_in_flight", "Panel HTTP requests holding or waiting for a pooled connection"
+)
+api_pool_max_connections = registry.gauge(
+    "remnawave_api_pool_max_connections", "Connection limit of the panel HTTP pool"
+)
+api_concurrency_limit = registry.gauge(
+    "api_concurrency_limit", "Current limit of the adaptive panel concurrency limiter", ("limiter",)
+)
+api_concurrency_in_flight = registry.gauge(
+    "api_concurrency_in_flight", "Calls holding a slot of the adaptive concurrency limiter", ("limiter",)
+)
+
+
+def error_kind(exc: BaseException) -> str:
+    """Short label for a failed call: timeout, 4xx, 5xx or error"""
+    if getattr(exc, "timed_out", False) or isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    status_code = getattr(exc, "status_code", None)
+    if isinstance(status_code, int):
+        return f"{status_code // 100}xx"
+    return "error"
+
+
+def observe_handler(timing: HandlerTiming):
+    """Record a finished handler call"""
+    handler_seconds.observe(timing.wall, handler=timing.handler)
+    handler_api_seconds.observe(timing.api_seconds, handler=timing.handler)
+    handler_telegram_seconds.observe(timing.telegram_seconds, handler=timing.handler)
+    if timing.error:
+        handler_errors_total.inc(handler=timing.handler)
+
+
+# Внутри метода клиента, вызванного другим методом, время в обработчик не добавляется
+_in_api_call: ContextVar[bool] = ContextVar("in_api_call", default=False)
+
+
+def _instrument_method(name: str, method):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        outermost = not _in_api_call.get()
+        token = _in_api_call.set(True)
+        started = time.perf_counter()
+        try:
+            with tracer.span(f"api.{name}", kind="api"):
+                return await method(*args, **kwargs)
+        except Exception as e:
+            api_errors_total.inc(method=name, kind=error_kind(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_api_call.reset(token)
+            api_request_seconds.observe(elapsed, method=name)
+            if outermost:
+                record_api(elapsed)
+    return wrapper
+
+
+def instrument_api(cls):
+    """Class decorator: latency histogram and error counter for every public async method"""
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or name == "close" or not inspect.iscoroutinefunction(member):
+            continue
+        setattr(cls, name, _instrument_method(name, member))
+    return cls
+
+
+class MetricsServer:
+    """Minimal asyncio HTTP server exposing the registry at /metrics"""
+
+    def __init__(self, metrics: MetricsRegistry):
+        self.registry = metrics
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self, host: str, port: int):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        log.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Заголовки запроса не нужны, но их надо дочитать
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self.registry.render().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"Not Found\n", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+metrics_server = MetricsServer(registry)
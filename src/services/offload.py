@@ -0,0 +1,69 @@
+"""
+Worker pool for CPU-heavy work on large panel responses
+Validating thousands of SDK models and dumping them back to dicts blocks the
+event loop; above a size threshold this work runs in a bounded thread pool
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.core.config import settings
+from src.core.logger import log
+
+T = TypeVar("T")
+
+
+class CpuOffloader:
+    """
+    Runs large CPU-bound jobs in a thread pool, small ones inline
+
+    pydantic holds the GIL while validating, so a worker thread does not make
+    parsing faster; it lets the interpreter switch back to the event loop every
+    few milliseconds instead of blocking it for the whole response.
+    """
+
+    def __init__(self, threshold_bytes: int, max_workers: int):
+        self.threshold_bytes = threshold_bytes
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.offloaded = 0
+        self.inline = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_bytes > 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_bytes": self.threshold_bytes,
+            "workers": self.max_workers,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+        }
+
+    async def run(self, func: Callable[..., T], *args, size: int, **kwargs) -> T:
+        """Call ``func`` in the pool if ``size`` (bytes of input) reaches the threshold"""
+        if not self.enabled or size < self.threshold_bytes:
+            self.inline += 1
+            return func(*args, **kwargs)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cpu-offload"
+            )
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            log.debug("CPU offload pool stopped")
+
+
+cpu_offloader = CpuOffloader(
+    threshold_bytes=settings.api_offload_threshold_kb * 1024,
+    max_workers=settings.api_offload_workers
+)
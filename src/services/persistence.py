@@ -0,0 +1,159 @@
+"""
+Redis persistence for conversations, user and chat data
+
+With PERSISTENCE_ENABLED (and REDIS_ENABLED) in-progress edit, create and
+bulk conversations survive restarts and deploys. State lives in Redis
+through cache_service's connection:
+
+    remnabot:state:user:{user_id}               context.user_data (ConversationState.dump())
+    remnabot:state:chat:{chat_id}               context.chat_data
+    remnabot:state:conv:{name}:{chat}:{user}    ConversationHandler state
+
+PTB hands over changed entries every PERSISTENCE_UPDATE_INTERVAL seconds;
+all writes of one round are sent as a single pipeline. Every key expires
+after CONVERSATION_TIMEOUT, so abandoned state is cleaned up by Redis.
+Nothing is cached locally between rounds, which is the prerequisite for
+running several bot replicas against one Redis.
+"""
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.cache import cache_service
+from src.services.state_store import ConversationState, json_safe
+
+PREFIX = "remnabot:state"
+
+
+def _conversation_key(key: Tuple[Any, ...]) -> str:
+    return ":".join(str(part) for part in key)
+
+
+def _parse_conversation_key(key: str) -> Tuple[Any, ...]:
+    return tuple(int(part) if part.lstrip("-").isdigit() else part for part in key.split(":"))
+
+
+def _plain_items(data: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """JSON data for each key; keys that cannot be serialized are skipped with a warning"""
+    plain = {}
+    for key, value in data.items():
+        try:
+            plain[key] = json_safe(value)
+        except TypeError as e:
+            log.warning(f"{kind} key {key!r} is not persisted: {e}")
+    return plain
+
+
+class RedisPersistence(BasePersistence[ConversationState, Dict[str, Any], Dict[str, Any]]):
+    """BasePersistence storing user/chat data and conversations in Redis"""
+
+    def __init__(self, update_interval: Optional[float] = None, prefix: str = PREFIX):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=True, user_data=True, callback_data=False),
+            update_interval=settings.persistence_update_interval if update_interval is None else update_interval,
+        )
+        self.prefix = prefix
+        # Записи текущего раунда: ключ -> значение (None — удалить)
+        self._pending: Dict[str, Any] = {}
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def expire(self) -> Optional[timedelta]:
+        ttl = settings.conversation_timeout
+        return timedelta(seconds=ttl) if ttl > 0 else None
+
+    async def _load(self, kind: str) -> Dict[str, Any]:
+        # Persistence читается в Application.initialize(), раньше on_startup
+        if cache_service.enabled and cache_service.redis is None:
+            await cache_service.connect()
+        pattern = f"{self.prefix}:{kind}:"
+        return {key[len(pattern):]: value for key, value in (await cache_service.get_pattern(pattern + "*")).items()}
+
+    # ======================
+    # Loading on startup
+    # ======================
+
+    async def get_user_data(self) -> Dict[int, ConversationState]:
+        data = {int(user_id): ConversationState.load(value) for user_id, value in (await self._load("user")).items()}
+        if data:
+            log.info(f"Restored conversation state of {len(data)} users")
+        return data
+
+    async def get_chat_data(self) -> Dict[int, Dict[str, Any]]:
+        return {int(chat_id): value for chat_id, value in (await self._load("chat")).items()}
+
+    async def get_bot_data(self) -> Dict[str, Any]:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[Tuple[Any, ...], object]:
+        return {
+            _parse_conversation_key(key): state
+            for key, state in (await self._load(f"conv:{name}")).items()
+        }
+
+    # ======================
+    # Coalesced writes
+    # ======================
+
+    def _queue(self, key: str, value: Any):
+        self._pending[key] = value
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self):
+        # PTB вызывает update_* пачкой через gather — даём им всем встать в очередь
+        await asyncio.sleep(0)
+        # Ключи, поставленные во время записи, уходят следующим пайплайном этого же писателя
+        while self._pending:
+            writes, self._pending = self._pending, {}
+            if not await cache_service.write_batch(writes, expire=self.expire):
+                log.warning(f"Failed to persist {len(writes)} state keys")
+
+    async def update_user_data(self, user_id: int, data: ConversationState):
+        if isinstance(data, ConversationState):
+            dumped = data.dump()
+        else:
+            dumped = {key: [value, None] for key, value in _plain_items(data, "User data").items()}
+        self._queue(f"{self.prefix}:user:{user_id}", dumped or None)
+
+    async def update_chat_data(self, chat_id: int, data: Dict[str, Any]):
+        self._queue(f"{self.prefix}:chat:{chat_id}", _plain_items(data, "Chat data") or None)
+
+    async def update_conversation(self, name: str, key: Tuple[Any, ...], new_state: Optional[object]):
+        self._queue(f"{self.prefix}:conv:{name}:{_conversation_key(key)}", json_safe(new_state))
+
+    async def drop_user_data(self, user_id: int):
+        self._queue(f"{self.prefix}:user:{user_id}", None)
+
+    async def drop_chat_data(self, chat_id: int):
+        self._queue(f"{self.prefix}:chat:{chat_id}", None)
+
+    async def update_bot_data(self, data: Dict[str, Any]):
+        pass
+
+    async def update_callback_data(self, data: Any):
+        pass
+
+    # Один процесс — локальные данные всегда свежие; при нескольких репликах здесь нужна перечитка
+    async def refresh_user_data(self, user_id: int, user_data: ConversationState):
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[str, Any]):
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[str, Any]):
+        pass
+
+    async def flush(self):
+        """Write what is still pending; called by PTB on shutdown"""
+        if self._writer is not None:
+            await self._writer
+        if self._pending:
+            await self._write_pending()
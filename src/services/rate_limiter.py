@@ -0,0 +1,146 @@
+"""
+Token-bucket rate limiter for outgoing Remnawave API requests
+Requests wait in two priority lanes: interactive (admin button presses)
+and background (mass operations, import, export); interactive ones are
+always served first
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional
+
+from src.core.config import settings
+from src.services.deadline import request_deadline
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+# Приоритет текущей задачи; наследуется задачами, созданными из неё
+_current_lane: ContextVar[str] = ContextVar("api_lane", default=INTERACTIVE)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+@contextmanager
+def api_lane(lane: str) -> Iterator[None]:
+    """Run API calls made inside the block in the given priority lane"""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+@contextmanager
+def background_lane() -> Iterator[None]:
+    """
+    Bulk work that must not starve interactive requests
+
+    Background work is not bound by the handler's time budget.
+    """
+    with api_lane(BACKGROUND), request_deadline(None):
+        yield
+
+
+class TokenBucket:
+    """
+    Token bucket with strict-priority waiting lanes
+
+    ``rate`` tokens are added per second up to ``burst``. A request takes one
+    token; when none is left it waits in its lane. Background requests never
+    take a token while an interactive request is waiting.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._queues: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._timer = None
+
+        self.waited: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def stats(self) -> Dict[str, float]:
+        """Current state for diagnostics"""
+        self._refill()
+        return {
+            "rate": self.rate,
+            "tokens": round(self._tokens, 2),
+            "waiting_interactive": len(self._queues[INTERACTIVE]),
+            "waiting_background": len(self._queues[BACKGROUND]),
+        }
+
+    async def acquire(self, lane: Optional[str] = None):
+        """Wait for a token in the given lane (current context lane by default)"""
+        if not self.enabled:
+            return
+        lane = lane or current_lane()
+
+        self._refill()
+        if not self._has_waiters(lane) and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        self.waited[lane] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[lane].append(waiter)
+        self._schedule()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Токен уже выдан, но запрос отменён — возвращаем его
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._dispatch()
+            else:
+                try:
+                    self._queues[lane].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _has_waiters(self, lane: str) -> bool:
+        """Whether a request of this lane would jump the queue"""
+        if self._queues[INTERACTIVE]:
+            return True
+        return lane == BACKGROUND and bool(self._queues[BACKGROUND])
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        for lane in LANES:
+            queue = self._queues[lane]
+            while queue and self._tokens >= 1:
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                waiter.set_result(None)
+                self._tokens -= 1
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None or not any(self._queues.values()):
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+# Общий лимитер исходящих запросов к панели
+api_rate_limiter = TokenBucket(settings.api_rate_limit, settings.api_rate_burst)
@@ -0,0 +1,256 @@
+"""
+Resilience layer for panel HTTP requests
+Jittered exponential retries for idempotent requests and a circuit breaker
+that fails fast while the panel is down
+"""
+import asyncio
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.core.logger import log
+from src.services.deadline import DeadlineExceeded, fits, within_deadline
+from src.services.metrics import api_requests_in_flight
+from src.services.rate_limiter import api_rate_limiter
+
+# Методы, которые безопасно повторять
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Ответы, которые считаются временной недоступностью панели
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+FAILURE_STATUSES = frozenset({502, 503, 504})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without sending the request while the circuit breaker is open"""
+
+    status_code = 503
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"Панель недоступна, повторите через {int(retry_in) + 1} с")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    CLOSED: requests pass, failures are counted.
+    OPEN: requests fail immediately for ``reset_timeout`` seconds.
+    HALF_OPEN: one probe request is let through; its result closes
+    or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the panel is considered unavailable right now"""
+        return self.state != self.CLOSED
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in, 1),
+        }
+
+    def before_request(self):
+        """Raise CircuitOpenError if the request must not be sent"""
+        if self.state == self.OPEN:
+            if self.retry_in > 0:
+                raise CircuitOpenError(self.retry_in)
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(0)
+            self._probe_in_flight = True
+
+    def abandon_probe(self):
+        """Let another request probe the panel if this one was cancelled"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            log.info("Panel is available again, circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                log.warning(
+                    f"Panel unavailable after {self.failures} failures, "
+                    f"circuit breaker open for {self.reset_timeout:.0f}s"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After in seconds; None if missing, malformed, negative or not finite"""
+    value = response.headers.get("Retry-After")
+    try:
+        seconds = float(value) if value else None
+    except ValueError:
+        return None
+    if seconds is None or not math.isfinite(seconds) or seconds < 0:
+        return None
+    return seconds
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that calls ``release`` once when it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport wrapper applying the circuit breaker and retries
+
+    Idempotent requests are retried on transport errors and 429/502/503/504.
+    Other requests are retried only when the connection could not be
+    established, since then the panel has not seen them.
+
+    Every attempt counts in remnawave_api_requests_in_flight until its
+    response body is closed, i.e. while it holds or waits for a pooled
+    connection.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        breaker: "CircuitBreaker",
+        retries: int,
+        backoff_base: float,
+        backoff_cap: float
+    ):
+        self._transport = transport
+        self.breaker = breaker
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        api_requests_in_flight.inc()
+        try:
+            response = await within_deadline(self._transport.handle_async_request(request))
+        except BaseException:
+            api_requests_in_flight.dec()
+            raise
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, api_requests_in_flight.dec),
+            extensions=response.extensions
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            self.breaker.before_request()
+            if attempt:
+                # Повтор — тоже запрос к панели, он расходует токен
+                await within_deadline(api_rate_limiter.acquire())
+
+            try:
+                response = await self._send(request)
+            except (DeadlineExceeded, asyncio.CancelledError):
+                # Истёк бюджет обработчика или запрос отменён — это не сбой панели
+                self.breaker.abandon_probe()
+                raise
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if not retryable or attempt >= self.retries or not fits(delay):
+                    raise
+                log.warning(
+                    f"{request.method} {request.url.path} failed ({type(e).__name__}), "
+                    f"retry {attempt + 1}/{self.retries} in {delay:.2f}s"
+                )
+            else:
+                if response.status_code in FAILURE_STATUSES:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    # Панель не должна заставлять фоновые запросы ждать без предела
+                    delay = min(retry_after, self.backoff_cap)
+                else:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if (
+                    not idempotent
+                    or response.status_code not in RETRY_STATUSES
+                    or attempt >= self.retries
+                    or not fits(delay)
+                ):
+                    return response
+
+                await response.aclose()
+                log.warning(
+                    f"{request.method} {request.url.path} returned {response.status_code}, "
+                    f"retry {attempt + 1}/{self.retries} in {delay:.2f}s"
+                )
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# Общий предохранитель панели; его состояние показывается в главном меню
+panel_breaker = CircuitBreaker(
+    failure_threshold=settings.api_breaker_threshold,
+    reset_timeout=settings.api_breaker_reset_timeout
+)
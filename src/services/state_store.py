@@ -0,0 +1,296 @@
+"""
+Bounded conversation state with per-key TTL
+
+ConversationState replaces the plain dict behind context.user_data. Every
+key expires CONVERSATION_TIMEOUT seconds after it was last written or read,
+and a session over CONVERSATION_STATE_MAX_BYTES drops its oldest keys, so
+abandoned edit/create flows no longer keep data forever.
+
+Whole panel entities (the user or host being edited) are stored once in
+the shared StateStore by UUID; sessions keep only an EntityRef and reads
+resolve it transparently. An evicted entity reads as a missing key.
+"""
+import asyncio
+import json
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, MutableMapping, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+from telegram import Update
+from telegram.ext import ContextTypes, TypeHandler
+
+from src.core.config import settings
+from src.core.logger import log
+from src.models.views import ModelView
+from src.services.metrics import registry
+
+conversation_sessions = registry.gauge(
+    "bot_conversation_sessions", "Admins with live conversation state"
+)
+conversation_state_bytes = registry.gauge(
+    "bot_conversation_state_bytes", "Approximate size of conversation state and referenced entities"
+)
+conversation_state_evictions_total = registry.counter(
+    "bot_conversation_state_evictions_total", "Conversation state keys dropped automatically", ("reason",)
+)
+
+# Сколько сущностей панели держим по UUID для всех сессий
+MAX_ENTITIES = 256
+# Сущность по ссылке при сохранении в persistence: {ENTITY_KEY: payload}
+ENTITY_KEY = "$entity"
+SWEEP_INTERVAL = 60.0
+
+
+def json_safe(value: Any) -> Any:
+    """Plain JSON data for a state value; views and SDK models become dicts"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, ModelView):
+        return value.model.model_dump(mode="json", by_alias=True)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if isinstance(value, Mapping):
+        return {str(key): json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return json_safe(value.value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def approx_size(value: Any) -> int:
+    """Size of a value's payload serialized as JSON, a cheap stand-in for its memory"""
+    try:
+        return len(json.dumps(json_safe(value), ensure_ascii=False))
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass(frozen=True)
+class EntityRef:
+    """Session-side reference to an entity held by the StateStore"""
+    uuid: str
+
+
+class ConversationState(MutableMapping):
+    """context.user_data with per-key TTL and a per-session size limit"""
+
+    def __init__(self, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.ttl = settings.conversation_timeout if ttl is None else ttl
+        self.max_bytes = settings.conversation_state_max_bytes if max_bytes is None else max_bytes
+        # key -> (value, истекает в, размер); порядок — от давно записанных к свежим
+        self._data: Dict[str, Tuple[Any, float, int]] = {}
+        state_store.register(self)
+
+    def _expires(self) -> float:
+        return time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+
+    def _live(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        item = self._data.get(key)
+        if item is not None and item[1] <= time.monotonic():
+            self.evict(key, reason="ttl")
+            return None
+        return item
+
+    def __getitem__(self, key: str) -> Any:
+        item = self._live(key)
+        if item is None:
+            raise KeyError(key)
+        value, _, size = item
+        self._data[key] = (value, self._expires(), size)
+        if isinstance(value, EntityRef):
+            entity = state_store.get_entity(value.uuid)
+            if entity is None:
+                del self._data[key]
+                raise KeyError(key)
+            return entity
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._data.pop(key, None)
+        self._data[key] = (value, self._expires(), approx_size(value))
+        if self.max_bytes > 0:
+            # Вытесняем самые старые ключи, но не только что записанный
+            for old in list(self._data):
+                if self.nbytes <= self.max_bytes or old == key:
+                    break
+                self.evict(old, reason="size")
+
+    def __delitem__(self, key: str):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([key for key in list(self._data) if self._live(key) is not None])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ConversationState({list(self._data)})"
+
+    def clear(self):
+        self._data.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, _, size in self._data.values())
+
+    def set_ref(self, key: str, entity: Mapping):
+        """Store a panel entity (view or dict) by UUID reference instead of a copy"""
+        uuid = entity.get("uuid") if isinstance(entity, Mapping) else None
+        if not uuid:
+            self[key] = entity
+            return
+        state_store.put_entity(str(uuid), entity)
+        self[key] = EntityRef(str(uuid))
+
+    def evict(self, *keys: str, reason: str):
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                conversation_state_evictions_total.inc(reason=reason)
+
+    def purge(self):
+        """Drop expired keys"""
+        for key in list(self._data):
+            self._live(key)
+
+    def dump(self) -> Dict[str, Any]:
+        """
+        Live keys as JSON data {key: [value, seconds left]}; referenced
+        entities are inlined as dicts, keys that cannot be serialized are skipped
+        """
+        now = time.monotonic()
+        data = {}
+        for key, (value, expires, _) in list(self._data.items()):
+            if expires <= now:
+                continue
+            if isinstance(value, EntityRef):
+                entity = state_store.get_entity(value.uuid)
+                if entity is None:
+                    continue
+                value = {ENTITY_KEY: entity}
+            try:
+                value = json_safe(value)
+            except TypeError as e:
+                log.warning(f"Conversation state key {key!r} is not persisted: {e}")
+                continue
+            data[key] = [value, None if expires == float("inf") else round(expires - now, 1)]
+        return data
+
+    @classmethod
+    def load(cls, data: Dict[str, Any]) -> "ConversationState":
+        """Restore a state saved with dump(), keeping the remaining TTLs"""
+        state = cls()
+        now = time.monotonic()
+        for key, (value, ttl) in data.items():
+            if isinstance(value, dict) and ENTITY_KEY in value:
+                state.set_ref(key, value[ENTITY_KEY])
+            else:
+                state[key] = value
+            if ttl is not None:
+                value, _, size = state._data[key]
+                state._data[key] = (value, now + ttl, size)
+        return state
+
+
+class StateStore:
+    """Registry of conversation sessions and the entities they reference"""
+
+    def __init__(self, max_entities: int = MAX_ENTITIES):
+        self.max_entities = max_entities
+        # Mapping нехэшируем, поэтому ключ — id()
+        self._sessions: "weakref.WeakValueDictionary[int, ConversationState]" = weakref.WeakValueDictionary()
+        # uuid -> (сущность, истекает в, размер)
+        self._entities: "OrderedDict[str, Tuple[Mapping, float, int]]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def register(self, state: ConversationState):
+        self._sessions[id(state)] = state
+
+    def put_entity(self, uuid: str, entity: Mapping):
+        ttl = settings.conversation_timeout
+        expires = time.monotonic() + ttl if ttl > 0 else float("inf")
+        self._entities[uuid] = (entity, expires, approx_size(entity))
+        self._entities.move_to_end(uuid)
+        while len(self._entities) > self.max_entities:
+            self._entities.popitem(last=False)
+            conversation_state_evictions_total.inc(reason="entities")
+
+    def get_entity(self, uuid: str) -> Optional[Mapping]:
+        item = self._entities.get(uuid)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self._entities[uuid]
+            conversation_state_evictions_total.inc(reason="ttl")
+            return None
+        self._entities.move_to_end(uuid)
+        return item[0]
+
+    def sweep(self) -> Dict[str, int]:
+        """Drop expired keys and entities and refresh the gauges"""
+        sessions = keys = session_bytes = 0
+        for state in list(self._sessions.values()):
+            state.purge()
+            if state._data:
+                sessions += 1
+                keys += len(state._data)
+                session_bytes += state.nbytes
+        now = time.monotonic()
+        for uuid in [uuid for uuid, (_, expires, _) in self._entities.items() if expires <= now]:
+            del self._entities[uuid]
+            conversation_state_evictions_total.inc(reason="ttl")
+        entity_bytes = sum(size for _, _, size in self._entities.values())
+
+        conversation_sessions.set(sessions)
+        conversation_state_bytes.set(session_bytes + entity_bytes)
+        return {
+            "sessions": sessions,
+            "keys": keys,
+            "entities": len(self._entities),
+            "bytes": session_bytes + entity_bytes,
+        }
+
+    def timeout_handler(self, *keys: str) -> TypeHandler:
+        """ConversationHandler.TIMEOUT handler that drops the conversation's keys"""
+        async def drop_state(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            user_data = context.user_data
+            if isinstance(user_data, ConversationState):
+                user_data.evict(*keys, reason="timeout")
+            elif user_data is not None:
+                for key in keys:
+                    user_data.pop(key, None)
+
+        return TypeHandler(Update, drop_state)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.sweep()
+
+    def start(self):
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+
+state_store = StateStore()
@@ -0,0 +1,175 @@
+"""
+Incremental JSON parsing of large panel list responses
+Items of the list are decoded one by one while the body is still being
+received, without building pydantic DTOs for them
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import httpx
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class StreamingJSONError(ValueError):
+    """Raised when the response is not the expected JSON document"""
+
+
+class JsonArrayStream:
+    """
+    Incremental parser that extracts items of one array inside a JSON document
+
+    Usage:
+        parser = JsonArrayStream(("response", "users"))
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+        envelope = parser.close()  # {"response": {"users": [], "total": 10}}
+
+    Everything outside the array (the envelope) is kept as text and parsed
+    in ``close``; it is small, while the array may be arbitrarily large.
+    Array items are expected to be objects (as in all panel list responses).
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = list(path)
+        self._buf = ""
+        self._prefix: List[str] = []
+        self._suffix: List[str] = []
+        self._state = "prefix"
+        # Состояние сканера префикса: стек контейнеров [тип, ключ]
+        self._stack: List[List[Optional[str]]] = []
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []
+        self._expect_key = False
+        self._last_key: Optional[str] = None
+        self.count = 0
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a piece of the document and return fully received items"""
+        if self._state == "suffix":
+            self._suffix.append(text)
+            return []
+
+        self._buf += text
+        if self._state == "prefix" and not self._scan_prefix():
+            return []
+        if self._state == "items":
+            return self._parse_items()
+        return []
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the envelope with the array replaced by []"""
+        if self._state != "suffix":
+            raise StreamingJSONError(f"Array {'.'.join(self.path)} not found or not finished")
+        try:
+            return json.loads("".join(self._prefix) + "[]" + "".join(self._suffix))
+        except json.JSONDecodeError as e:
+            raise StreamingJSONError(f"Invalid JSON envelope: {e}") from e
+
+    def _scan_prefix(self) -> bool:
+        """Scan until the target array opens; returns True when found"""
+        buf = self._buf
+        for index, char in enumerate(buf):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._expect_key:
+                        self._last_key = json.loads('"' + "".join(self._string) + '"')
+                    self._string = []
+                    continue
+                if self._expect_key:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._stack.append(["object", None])
+                self._expect_key = True
+            elif char == "[":
+                if self._at_path():
+                    self._prefix.append(buf[:index])
+                    self._buf = buf[index + 1:]
+                    self._state = "items"
+                    return True
+                self._stack.append(["array", None])
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif char == ":":
+                if self._stack and self._stack[-1][0] == "object":
+                    self._stack[-1][1] = self._last_key
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == "object"
+
+        self._prefix.append(buf)
+        self._buf = ""
+        return False
+
+    def _at_path(self) -> bool:
+        """Whether the array being opened is the value of the target key"""
+        if len(self._stack) != len(self.path):
+            return False
+        return all(
+            kind == "object" and key == expected
+            for (kind, key), expected in zip(self._stack, self.path)
+        )
+
+    def _parse_items(self) -> List[Any]:
+        items = []
+        buf = self._buf
+        pos = 0
+        length = len(buf)
+        while True:
+            while pos < length and (buf[pos] in _WHITESPACE or buf[pos] == ","):
+                pos += 1
+            if pos >= length:
+                break
+            if buf[pos] == "]":
+                self._state = "suffix"
+                self._suffix.append(buf[pos + 1:])
+                self._buf = ""
+                self.count += len(items)
+                return items
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Элемент ещё не пришёл целиком
+                break
+            items.append(item)
+            pos = end
+        self._buf = buf[pos:]
+        self.count += len(items)
+        return items
+
+
+async def stream_json_array(
+    response: httpx.Response,
+    path: Sequence[str],
+    envelope: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield array items from a streamed httpx response
+
+    If ``envelope`` is given, it is updated with the rest of the document
+    (for example ``total``) once the stream ends.
+    """
+    parser = JsonArrayStream(path)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in response.aiter_bytes():
+        for item in parser.feed(decoder.decode(chunk)):
+            yield item
+    for item in parser.feed(decoder.decode(b"", final=True)):
+        yield item
+    result = parser.close()
+    if envelope is not None:
+        envelope.update(result)
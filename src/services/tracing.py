@@ -0,0 +1,278 @@
+"""
+Lightweight span tracing: update -> handler -> API / cache / Bot API calls
+
+One trace per Telegram update. The update processor opens the root span,
+admin_only a span per handler, and the API client, CacheService and Bot
+API request add child spans. Finished traces are exported when sampled
+(TRACING_SAMPLE_RATE), slower than SLOW_HANDLER_THRESHOLD or failed, so
+slow screens are always kept.
+
+Exporters:
+    jsonl  one span per line in TRACING_JSONL_PATH
+    otlp   OTLP/HTTP JSON to TRACING_OTLP_ENDPOINT (collector, Jaeger, Tempo)
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from src.core.config import settings
+from src.core.logger import log
+
+SERVICE_NAME = "remnawave-bot"
+# Сколько завершённых спанов держим до выгрузки; при переполнении старые отбрасываются
+MAX_PENDING_SPANS = 10_000
+FLUSH_INTERVAL = 5.0
+
+
+@dataclass
+class Span:
+    """One timed operation inside a trace"""
+    trace: "Trace"
+    name: str
+    kind: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    sampled: bool
+    spans: List[Span] = field(default_factory=list)
+    finished: bool = False
+
+    @property
+    def failed(self) -> bool:
+        return any(span.error for span in self.spans)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class JsonlExporter:
+    """Appends spans to a local JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _write(self, lines: List[str]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    async def export(self, spans: List[Dict[str, Any]]):
+        lines = [json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans]
+        await asyncio.to_thread(self._write, lines)
+
+    async def close(self):
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """ExportTraceServiceRequest in OTLP/HTTP JSON encoding"""
+    kinds = {"update": 2, "handler": 1, "api": 3, "cache": 3, "telegram": 3}
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "src.services.tracing"},
+                "spans": [
+                    {
+                        "traceId": span["trace_id"],
+                        "spanId": span["span_id"],
+                        **({"parentSpanId": span["parent_id"]} if span["parent_id"] else {}),
+                        "name": span["name"],
+                        "kind": kinds.get(span["kind"], 1),
+                        "startTimeUnixNano": str(span["start_ns"]),
+                        "endTimeUnixNano": str(span["end_ns"]),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)}
+                            for key, value in {"kind": span["kind"], **span["attributes"]}.items()
+                        ],
+                        "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OtlpHttpExporter:
+    """Sends spans to an OTLP/HTTP collector as JSON"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self._client = httpx.AsyncClient(timeout=5.0)
+
+    async def export(self, spans: List[Dict[str, Any]]):
+        response = await self._client.post(self.endpoint, json=otlp_payload(spans))
+        response.raise_for_status()
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class Tracer:
+    """Creates spans, decides what to keep and exports finished traces in batches"""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.0, exporter=None):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._pending: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._rng = random.Random()
+        self.stats: Dict[str, int] = {"traces": 0, "exported": 0, "dropped": 0}
+
+    @staticmethod
+    def _new_id(size: int) -> str:
+        return os.urandom(size).hex()
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """Root span of a new trace; None when tracing is off"""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(self._new_id(16), sampled=self._rng.random() < self.sample_rate)
+        self.stats["traces"] += 1
+        # Корневой спан не наследует текущий: каждый апдейт — отдельная трасса
+        token = _current_span.set(None)
+        try:
+            with self._span(trace, None, name, "update", attributes) as root:
+                yield root
+        finally:
+            _current_span.reset(token)
+            trace.finished = True
+            self._finish(trace, root)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+        """Child of the current span; no-op outside a trace"""
+        parent = _current_span.get()
+        if parent is None or parent.trace.finished:
+            yield None
+            return
+        with self._span(parent.trace, parent.span_id, name, kind, attributes) as span:
+            yield span
+
+    @contextmanager
+    def _span(self, trace: Trace, parent_id: Optional[str], name: str, kind: str, attributes) -> Iterator[Span]:
+        span = Span(trace, name, kind, self._new_id(8), parent_id, dict(attributes))
+        trace.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+
+    def _finish(self, trace: Trace, root: Span):
+        slow = settings.slow_handler_threshold and root.duration >= settings.slow_handler_threshold
+        if not (trace.sampled or slow or trace.failed):
+            return
+        self._pending.extend(span.to_dict() for span in trace.spans)
+        overflow = len(self._pending) - MAX_PENDING_SPANS
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.stats["dropped"] += overflow
+
+    async def flush(self):
+        if not self._pending or self.exporter is None:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self.exporter.export(batch)
+            self.stats["exported"] += len(batch)
+        except Exception as e:
+            self.stats["dropped"] += len(batch)
+            log.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self):
+        if self.enabled and self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+            log.info(f"Tracing enabled: sample rate {self.sample_rate:g}, exporter {type(self.exporter).__name__}")
+
+    async def shutdown(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.close()
+
+
+def create_exporter(kind: str):
+    if kind == "otlp":
+        return OtlpHttpExporter(settings.tracing_otlp_endpoint)
+    if kind == "jsonl":
+        return JsonlExporter(settings.tracing_jsonl_path)
+    raise ValueError(f"Unknown TRACING_EXPORTER {kind!r} (jsonl or otlp)")
+
+
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    sample_rate=settings.tracing_sample_rate,
+    exporter=create_exporter(settings.tracing_exporter) if settings.tracing_enabled else None,
+)
@@ -303,6 +303,23 @@ class Formatters:
         
         return text.strip()
     
+    @staticmethod
+    def format_stale_note(response: Dict[str, Any]) -> str:
+        """
+        Note for data returned from cache because the panel did not answer in time
+        
+        Args:
+            response: API client response
+            
+        Returns:
+            Note text or empty string for fresh data
+        """
+        if not response.get('stale'):
+            return ""
+        fetched_at = response.get('fetched_at')
+        when = f" от {fetched_at:%H:%M:%S}" if fetched_at else ""
+        return f"\n\n⏱ <i>Панель не ответила вовремя — показаны данные{when}</i>"
+    
     @staticmethod
     def escape_markdown(text: str) -> str:
         """Escape special characters for Markdown"""
@@ -0,0 +1,193 @@
+"""
+Throttled progress reporter for long-running operations
+Edits a Telegram message at most once per interval and only when the text changed
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from telegram import InlineKeyboardMarkup
+from telegram.constants import ParseMode
+from telegram.error import RetryAfter
+
+from src.core.config import settings
+from src.core.logger import log
+
+# Функция редактирования сообщения: (text, reply_markup) -> awaitable
+EditFunc = Callable[[str, Optional[InlineKeyboardMarkup]], Awaitable[object]]
+# Собственный формат текста прогресса: (reporter, final) -> text
+RenderFunc = Callable[["ProgressReporter", bool], str]
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as 1ч 2м / 3м 4с / 5с"""
+    seconds = int(max(0, seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}ч {minutes}м"
+    if minutes:
+        return f"{minutes}м {secs}с"
+    return f"{secs}с"
+
+
+class ProgressReporter:
+    """
+    Reusable progress message updater
+
+    Usage:
+        progress = ProgressReporter.for_message(query.message, "Удаление устройств", total=10)
+        for item in items:
+            ...
+            await progress.advance(success=True)
+        await progress.finish()
+    """
+
+    def __init__(
+        self,
+        edit: EditFunc,
+        title: str,
+        total: int = 0,
+        done: int = 0,
+        min_interval: Optional[float] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        render: Optional[RenderFunc] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._edit = edit
+        self.title = title
+        self.total = total
+        self.done = done
+        # Уже обработанное до старта (возобновление) не учитываем в скорости
+        self._start_done = done
+        self.success = 0
+        self.failed = 0
+        self.min_interval = (
+            settings.progress_update_interval if min_interval is None else min_interval
+        )
+        self.reply_markup = reply_markup
+        self._render = render
+        self._clock = clock
+        self._started = clock()
+        self._last_edit = 0.0
+        self._last_text: Optional[str] = None
+        self._blocked_until = 0.0
+
+    @classmethod
+    def for_message(cls, message, title: str, total: int = 0, **kwargs) -> "ProgressReporter":
+        """Create reporter that edits the given Telegram message"""
+
+        async def edit(text: str, reply_markup: Optional[InlineKeyboardMarkup]):
+            return await message.edit_text(
+                text, reply_markup=reply_markup, parse_mode=ParseMode.HTML
+            )
+
+        return cls(edit, title, total, **kwargs)
+
+    @property
+    def elapsed(self) -> float:
+        return self._clock() - self._started
+
+    @property
+    def rate(self) -> float:
+        """Processed items per second"""
+        elapsed = self.elapsed
+        return (self.done - self._start_done) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, None if unknown"""
+        rate = self.rate
+        if not self.total or rate <= 0:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def speed_line(self) -> str:
+        """Rate and ETA line for custom renderers"""
+        text = f"⚡ Скорость: {self.rate:.1f}/с"
+        eta = self.eta
+        if eta is not None:
+            text += f" | ⏳ Осталось: ~{format_duration(eta)}"
+        return text
+
+    def render(self, final: bool = False) -> str:
+        """Build progress text"""
+        if self._render:
+            return self._render(self, final)
+
+        icon = "✅" if final and not self.failed else ("⚠️" if final else "🔄")
+        text = f"{icon} <b>{self.title}</b>\n\n"
+
+        if self.total:
+            percent = self.done * 100 // self.total
+            text += f"Обработано: {self.done} / {self.total} ({percent}%)\n"
+        else:
+            text += f"Обработано: {self.done}\n"
+
+        text += f"├ Успешно: {self.success}\n"
+        text += f"└ Ошибок: {self.failed}\n\n"
+
+        if final:
+            text += f"⏱ Время: {format_duration(self.elapsed)}"
+        else:
+            text += self.speed_line()
+
+        return text
+
+    async def advance(self, count: int = 1, success: Optional[bool] = None):
+        """Register processed items and maybe refresh the message"""
+        self.done += count
+        if success is True:
+            self.success += count
+        elif success is False:
+            self.failed += count
+        await self.update()
+
+    async def set(self, done: int, success: int, failed: int, total: Optional[int] = None):
+        """Set absolute counters (for callers that track them themselves)"""
+        self.done, self.success, self.failed = done, success, failed
+        if total is not None:
+            self.total = total
+        await self.update()
+
+    async def update(self, force: bool = False):
+        """Refresh message if the interval passed and the text changed"""
+        now = self._clock()
+        if not force and (now - self._last_edit < self.min_interval or now < self._blocked_until):
+            return
+        await self._send(self.render(), self.reply_markup, now)
+
+    async def finish(
+        self,
+        text: Optional[str] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None
+    ):
+        """Always flush the final state, ignoring the throttle"""
+        await self._send(text or self.render(final=True), reply_markup, self._clock(), final=True)
+
+    async def _send(
+        self,
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup],
+        now: float,
+        final: bool = False
+    ):
+        if text == self._last_text and not final:
+            return
+        try:
+            await self._edit(text, reply_markup)
+            self._last_text = text
+            self._last_edit = now
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if not isinstance(retry_after, (int, float)):
+                retry_after = retry_after.total_seconds()
+            self._blocked_until = now + retry_after
+            log.warning(f"Progress update throttled by Telegram for {retry_after}s")
+            if final:
+                # Финальное состояние нельзя потерять — ждём и повторяем
+                await asyncio.sleep(retry_after)
+                await self._send(text, reply_markup, self._clock(), final=True)
+        except Exception as e:
+            # "Message is not modified" и прочие ошибки не должны ломать операцию
+            log.debug(f"Failed to update progress message: {e}")
@@ -185,6 +185,41 @@ class Validators:
         except ValueError:
             return False, None, "Неверный формат. Введите число (GB) или 'unlimited'"
 
+    @staticmethod
+    def validate_user_status(status: str) -> tuple[bool, Optional[str], Optional[str]]:
+        """
+        Validate user status
+
+        Args:
+            status: Status string to validate (case-insensitive)
+
+        Returns:
+            Tuple of (is_valid, normalized_status, error_message)
+        """
+        normalized = (status or "").strip().upper()
+        if normalized not in ("ACTIVE", "DISABLED", "LIMITED", "EXPIRED"):
+            return False, None, "Статус должен быть ACTIVE, DISABLED, LIMITED или EXPIRED"
+        return True, normalized, None
+
+    @staticmethod
+    def validate_telegram_id(telegram_id: str) -> tuple[bool, Optional[int], Optional[str]]:
+        """
+        Validate Telegram user ID
+
+        Args:
+            telegram_id: Telegram ID string to validate
+
+        Returns:
+            Tuple of (is_valid, telegram_id_value, error_message)
+        """
+        try:
+            value = int(str(telegram_id).strip())
+            if value <= 0:
+                return False, None, "Telegram ID должен быть положительным числом"
+            return True, value, None
+        except ValueError:
+            return False, None, "Неверный формат Telegram ID. Введите число"
+
 
 # Create global validators instance
 validators = Validators()
@@ -1,9 +1,17 @@
 """
 Pytest configuration and fixtures
 """
+import os
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+# Settings требует эти переменные при импорте src.core.config
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test-token")
+os.environ.setdefault("ADMIN_IDS", "123456789")
+os.environ.setdefault("REMNAWAVE_API_URL", "http://localhost:3000")
+os.environ.setdefault("REMNAWAVE_API_TOKEN", "test-api-token")
+
 
 @pytest.fixture
 def mock_update():
@@ -23,38 +31,59 @@ def mock_update():
 @pytest.fixture
 def mock_context():
     """Mock Telegram Context object"""
+    from src.services.state_store import ConversationState
+
     context = MagicMock()
-    context.user_data = {}
+    context.user_data = ConversationState()
     context.bot_data = {}
     return context
 
 
 @pytest.fixture
 def mock_api_client():
-    """Mock RemnaWave API client"""
-    client = MagicMock()
-    client.get_users = AsyncMock(return_value={
-        'data': [
-            {
-                'uuid': 'test-uuid-1',
-                'username': 'user1',
-                'email': 'user1@test.com',
-                'status': 'active'
-            }
-        ],
-        'total': 1
-    })
-    client.get_user = AsyncMock(return_value={
+    """Mock RemnaWave API client (responses in the same shape as the real client)"""
+    user = {
         'uuid': 'test-uuid-1',
+        'shortUuid': 'abc123',
         'username': 'user1',
         'email': 'user1@test.com',
-        'status': 'active'
+        'status': 'ACTIVE',
+        'usedTrafficBytes': 0,
+        'trafficLimitBytes': 0,
+        'expireAt': '2030-01-01T00:00:00.000Z',
+    }
+    client = MagicMock()
+    client.get_users = AsyncMock(return_value={
+        'response': {'users': [user], 'total': 1}
     })
+    client.get_user = AsyncMock(return_value={'response': user})
     client.get_system_stats = AsyncMock(return_value={
-        'totalUsers': 100,
-        'activeUsers': 80,
-        'totalTraffic': 1024000,
-        'nodesCount': 5,
-        'hostsCount': 3
+        'response': {
+            'users': {
+                'statusCounts': {'ACTIVE': 80, 'DISABLED': 20},
+                'totalUsers': 100,
+                'totalTrafficBytes': '1024000',
+            },
+            'onlineStats': {'onlineNow': 5, 'lastDay': 50, 'lastWeek': 70, 'neverOnline': 10},
+        }
     })
     return client
+
+
+@pytest.fixture
+def mock_panel():
+    """In-process mock panel with a small population and no latency"""
+    from tests.mock_panel import MockPanel, PanelConfig
+
+    return MockPanel(PanelConfig(users=250, latency_ms=0, jitter_ms=0, per_item_ms=0))
+
+
+@pytest.fixture
+async def panel_api_client(mock_panel):
+    """Real API client (SDK and full HTTP stack) talking to the mock panel"""
+    import httpx
+    from src.services.api import RemnaWaveAPIClient
+
+    client = RemnaWaveAPIClient(transport=httpx.ASGITransport(app=mock_panel))
+    yield client
+    await client.close()
@@ -0,0 +1,6 @@
+"""
+Local mock Remnawave panel for offline tests and load testing
+"""
+from tests.mock_panel.app import MockPanel, PanelConfig, user_uuid
+
+__all__ = ["MockPanel", "PanelConfig", "user_uuid"]
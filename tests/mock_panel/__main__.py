@@ -0,0 +1,44 @@
+"""
+Run the mock panel as an HTTP server (requires uvicorn)
+
+Usage:
+    python -m tests.mock_panel --users 100000 --port 3010
+    REMNAWAVE_API_URL=http://127.0.0.1:3010 python -m src.main
+"""
+import argparse
+
+from tests.mock_panel import MockPanel, PanelConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Remnawave panel")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3010)
+    parser.add_argument("--users", type=int, default=PanelConfig.users)
+    parser.add_argument("--nodes", type=int, default=PanelConfig.nodes)
+    parser.add_argument("--hosts", type=int, default=PanelConfig.hosts)
+    parser.add_argument("--devices-per-user", type=int, default=PanelConfig.devices_per_user)
+    parser.add_argument("--latency-ms", type=float, default=PanelConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=PanelConfig.jitter_ms)
+    parser.add_argument("--seed", type=int, default=PanelConfig.seed)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to serve the mock panel: pip install uvicorn")
+
+    panel = MockPanel(PanelConfig(
+        users=args.users,
+        nodes=args.nodes,
+        hosts=args.hosts,
+        devices_per_user=args.devices_per_user,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+    ))
+    uvicorn.run(panel, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+"""
+In-process mock of the Remnawave panel API (ASGI app)
+
+Users, nodes, hosts, HWID devices, internal squads and system stats are
+stateful; every other operation of the bundled OpenAPI spec answers with a
+sample generated from its response schema. Entities are also built from
+the spec's schemas, so the real RemnawaveSDK validates them.
+
+The user population is virtual: user N is generated from the seed and its
+index on request, and only created, changed and deleted users are stored,
+so 100k+ users cost almost no memory.
+"""
+import asyncio
+import copy
+import json
+import random
+import re
+import uuid
+from bisect import bisect_right, insort
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+
+from tests.mock_panel.spec import EPOCH, SchemaSampler, iso, load_spec, spec_routes, success_schema
+
+GIB = 1024 ** 3
+
+# Статус пользователя по индексу: 16 из 20 активны
+STATUS_CYCLE = ("ACTIVE",) * 16 + ("DISABLED", "LIMITED", "EXPIRED", "EXPIRED")
+
+Response = Tuple[int, Any]
+
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+
+
+class PanelError(Exception):
+    def __init__(self, status: int, message: str, code: str = "A000"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+@dataclass
+class PanelConfig:
+    """Population and latency of the mock panel"""
+    users: int = 1000
+    nodes: int = 5
+    hosts: int = 10
+    squads: int = 2
+    devices_per_user: int = 1
+    seed: int = 1
+    # Задержка ответа: база + равномерный джиттер + стоимость каждого элемента списка
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    per_item_ms: float = 0.02
+    token: Optional[str] = None
+
+
+def user_uuid(index: int) -> str:
+    """UUID of virtual user ``index`` (the index is encoded in the last group)"""
+    return f"00000000-0000-4000-8000-{index:012x}"
+
+
+def user_index(value: str) -> Optional[int]:
+    if not value.startswith("00000000-0000-4000-8000-"):
+        return None
+    try:
+        return int(value[-12:], 16)
+    except ValueError:
+        return None
+
+
+def _item_schema(spec: Dict[str, Any], sampler: SchemaSampler, method: str, template: str, *keys: str):
+    """Schema of a list item inside an operation's response"""
+    schema = sampler.resolve(success_schema(spec, method, template)[1])
+    for key in ("response",) + keys:
+        schema = sampler.resolve(schema["properties"][key])
+    if schema.get("type") == "array":
+        schema = sampler.resolve(schema["items"])
+    return schema
+
+
+class MockPanel:
+    """
+    ASGI application emulating the panel API under /api
+
+    Usage:
+        panel = MockPanel(PanelConfig(users=100_000, latency_ms=0))
+        client = RemnaWaveAPIClient(transport=httpx.ASGITransport(app=panel))
+    """
+
+    def __init__(self, config: Optional[PanelConfig] = None):
+        self.config = config or PanelConfig()
+        self.spec = load_spec()
+        self.sampler = SchemaSampler(self.spec, seed=self.config.seed)
+        self._rng = random.Random(self.config.seed)
+        self._routes = spec_routes(self.spec)
+        self._samples: Dict[Tuple[str, str], Response] = {}
+        self.requests = 0
+
+        spec, sampler = self.spec, self.sampler
+        self._user_template = sampler.sample(_item_schema(spec, sampler, "GET", "/api/users", "users"), "user")
+        self._device_template = sampler.sample(_item_schema(spec, sampler, "GET", "/api/hwid/devices", "devices"), "device")
+        node_template = sampler.sample(_item_schema(spec, sampler, "GET", "/api/nodes"), "node")
+        host_template = sampler.sample(_item_schema(spec, sampler, "GET", "/api/hosts"), "host")
+        squad_template = sampler.sample(
+            _item_schema(spec, sampler, "GET", "/api/internal-squads", "internalSquads"), "squad"
+        )
+
+        self.squads: Dict[str, Dict[str, Any]] = {}
+        for i in range(self.config.squads):
+            squad = copy.deepcopy(squad_template)
+            squad.update(uuid=self._uuid(), name=f"Squad {i + 1}")
+            squad.setdefault("info", {})["membersCount"] = self.config.users
+            self.squads[squad["uuid"]] = squad
+
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        for i in range(self.config.nodes):
+            node = copy.deepcopy(node_template)
+            node.update(
+                uuid=self._uuid(), name=f"node-{i + 1}", address=f"10.0.0.{i + 1}",
+                isConnected=True, isDisabled=False, isConnecting=False,
+                isNodeOnline=True, isXrayRunning=True, usersOnline=self._rng.randint(0, 500)
+            )
+            self.nodes[node["uuid"]] = node
+
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        for i in range(self.config.hosts):
+            host = copy.deepcopy(host_template)
+            host.update(
+                uuid=self._uuid(), viewPosition=i, remark=f"host-{i + 1}",
+                address=f"h{i + 1}.example.com", port=443, isDisabled=False
+            )
+            self.hosts[host["uuid"]] = host
+
+        # Изменения виртуальной популяции
+        self._next_index = self.config.users
+        self._changed: Dict[int, Dict[str, Any]] = {}
+        self._deleted: List[int] = []
+        self._deleted_devices: set = set()
+
+        self._handlers: List[Tuple[str, re.Pattern, Callable]] = [
+            ("GET", re.compile(r"^/api/users$"), self.list_users),
+            ("POST", re.compile(r"^/api/users$"), self.create_user),
+            ("PATCH", re.compile(r"^/api/users$"), self.update_user),
+            ("GET", re.compile(r"^/api/users/by-username/(?P<username>[^/]+)$"), self.get_user_by_username),
+            ("POST", re.compile(r"^/api/users/(?P<uuid>[^/]+)/actions/(?P<action>[^/]+)$"), self.user_action),
+            ("GET", re.compile(r"^/api/users/(?P<uuid>[0-9a-f-]{36})$"), self.get_user),
+            ("DELETE", re.compile(r"^/api/users/(?P<uuid>[0-9a-f-]{36})$"), self.delete_user),
+            ("GET", re.compile(r"^/api/nodes$"), self.list_nodes),
+            ("POST", re.compile(r"^/api/nodes$"), self.create_node),
+            ("PATCH", re.compile(r"^/api/nodes$"), self.update_node),
+            ("POST", re.compile(r"^/api/nodes/(?P<uuid>[0-9a-f-]{36})/actions/(?P<action>[^/]+)$"), self.node_action),
+            ("GET", re.compile(r"^/api/nodes/(?P<uuid>[0-9a-f-]{36})$"), self.get_node),
+            ("DELETE", re.compile(r"^/api/nodes/(?P<uuid>[0-9a-f-]{36})$"), self.delete_node),
+            ("GET", re.compile(r"^/api/hosts$"), self.list_hosts),
+            ("POST", re.compile(r"^/api/hosts$"), self.create_host),
+            ("PATCH", re.compile(r"^/api/hosts$"), self.update_host),
+            ("GET", re.compile(r"^/api/hosts/(?P<uuid>[0-9a-f-]{36})$"), self.get_host),
+            ("DELETE", re.compile(r"^/api/hosts/(?P<uuid>[0-9a-f-]{36})$"), self.delete_host),
+            ("GET", re.compile(r"^/api/internal-squads$"), self.list_squads),
+            ("GET", re.compile(r"^/api/internal-squads/(?P<uuid>[0-9a-f-]{36})$"), self.get_squad),
+            ("GET", re.compile(r"^/api/hwid/devices$"), self.list_devices),
+            ("POST", re.compile(r"^/api/hwid/devices/delete$"), self.delete_device),
+            ("GET", re.compile(r"^/api/hwid/devices/(?P<uuid>[0-9a-f-]{36})$"), self.user_devices),
+            ("GET", re.compile(r"^/api/system/stats$"), self.system_stats),
+        ]
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+    # ======================
+    # ASGI
+    # ======================
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+        query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        path = unquote(scope["path"])
+        status, payload, items = await self.handle(scope["method"], path, query, body, headers)
+
+        delay = self._latency(items)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        data = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    def _latency(self, items: int) -> float:
+        cfg = self.config
+        ms = cfg.latency_ms + self._rng.uniform(0, cfg.jitter_ms) + cfg.per_item_ms * items
+        return max(0.0, ms) / 1000
+
+    async def handle(
+        self, method: str, path: str, query: Dict[str, str], body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, Any, int]:
+        """Dispatch one request; returns status, JSON payload and number of list items"""
+        self.requests += 1
+        try:
+            if self.config.token and headers.get("authorization") != f"Bearer {self.config.token}":
+                raise PanelError(401, "Unauthorized", "A001")
+            data = json.loads(body) if body else {}
+            for route_method, pattern, handler in self._handlers:
+                match = pattern.match(path) if route_method == method else None
+                if match:
+                    status, result = handler(query=query, data=data, **match.groupdict())
+                    return status, {"response": result}, _count_items(result)
+            return self._spec_sample(method, path)
+        except PanelError as e:
+            return e.status, {
+                "timestamp": iso(EPOCH), "path": path, "message": e.message,
+                "errorCode": e.code, "statusCode": e.status,
+            }, 0
+
+    def _spec_sample(self, method: str, path: str) -> Tuple[int, Any, int]:
+        for route_method, pattern, template in self._routes:
+            if route_method == method and pattern.match(path):
+                # Панель валидирует UUID в пути до обработчика
+                for name, value in zip(template.split("/"), path.split("/")):
+                    if name.startswith("{") and "uuid" in name.lower() and not UUID_RE.match(value):
+                        raise PanelError(400, f"Invalid uuid: {value}", "A001")
+                key = (method, template)
+                if key not in self._samples:
+                    found = success_schema(self.spec, method, template)
+                    self._samples[key] = (found[0], self.sampler.sample(found[1])) if found else (200, {})
+                status, payload = self._samples[key]
+                return status, payload, 0
+        raise PanelError(404, f"Cannot {method} {path}", "A404")
+
+    # ======================
+    # USERS
+    # ======================
+
+    def _generate_user(self, index: int) -> Dict[str, Any]:
+        rng = random.Random(self.config.seed * 1_000_003 + index)
+        user = dict(self._user_template)
+        status = STATUS_CYCLE[index % len(STATUS_CYCLE)]
+        limit = rng.choice((0, 50, 100, 500)) * GIB
+        used = rng.randint(0, limit or 200 * GIB)
+        created = EPOCH - timedelta(days=rng.randint(1, 700))
+        if status == "EXPIRED":
+            expire = EPOCH - timedelta(days=rng.randint(1, 60))
+        else:
+            expire = EPOCH + timedelta(days=rng.randint(1, 365))
+        squad = next(iter(self.squads.values()), None)
+        short_uuid = f"s{index:011x}"
+        user.update(
+            uuid=user_uuid(index),
+            shortUuid=short_uuid,
+            username=f"user_{index:06d}",
+            status=status,
+            usedTrafficBytes=used,
+            lifetimeUsedTrafficBytes=used + rng.randint(0, 500) * GIB,
+            trafficLimitBytes=limit,
+            expireAt=iso(expire),
+            onlineAt=iso(EPOCH - timedelta(minutes=rng.randint(1, 60 * 24 * 7))),
+            createdAt=iso(created),
+            updatedAt=iso(created),
+            telegramId=100_000_000 + index if index % 3 else None,
+            email=f"user{index}@example.com" if index % 2 else None,
+            tag=("VIP", "TRIAL", None, None)[index % 4],
+            description=None,
+            vlessUuid=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            subscriptionUrl=f"https://sub.example.com/{short_uuid}",
+            activeInternalSquads=[{"uuid": squad["uuid"], "name": squad["name"]}] if squad else [],
+            lastConnectedNode=None,
+        )
+        return user
+
+    def _is_deleted(self, index: int) -> bool:
+        pos = bisect_right(self._deleted, index)
+        return pos > 0 and self._deleted[pos - 1] == index
+
+    def _load_user(self, index: Optional[int]) -> Dict[str, Any]:
+        if index is None or index >= self._next_index or index < 0 or self._is_deleted(index):
+            raise PanelError(404, "User not found", "A063")
+        if index in self._changed:
+            return self._changed[index]
+        return self._generate_user(index)
+
+    def _nth_live_index(self, n: int) -> int:
+        """Index of the n-th (0-based) user that is not deleted"""
+        index = n
+        while True:
+            candidate = n + bisect_right(self._deleted, index)
+            if candidate == index:
+                return index
+            index = candidate
+
+    @property
+    def total_users(self) -> int:
+        return self._next_index - len(self._deleted)
+
+    def list_users(self, query, data) -> Response:
+        start = int(float(query.get("start", 0)))
+        size = int(float(query.get("size", 25)))
+        users = []
+        if start < self.total_users:
+            index = self._nth_live_index(start)
+            while len(users) < size and index < self._next_index:
+                if not self._is_deleted(index):
+                    users.append(self._load_user(index))
+                index += 1
+        return 200, {"users": users, "total": self.total_users}
+
+    def get_user(self, query, data, uuid) -> Response:
+        return 200, self._load_user(user_index(uuid))
+
+    def get_user_by_username(self, query, data, username) -> Response:
+        match = re.fullmatch(r"user_(\d+)", username)
+        if match:
+            user = self._load_user(int(match.group(1)))
+            if user["username"] == username:
+                return 200, user
+        for user in self._changed.values():
+            if user["username"] == username:
+                return 200, user
+        raise PanelError(404, "User not found", "A063")
+
+    def create_user(self, query, data) -> Response:
+        index = self._next_index
+        self._next_index += 1
+        user = self._generate_user(index)
+        user.update({k: v for k, v in data.items() if k in user})
+        user.update(usedTrafficBytes=0, lifetimeUsedTrafficBytes=0, status=data.get("status", "ACTIVE"))
+        self._changed[index] = user
+        return 201, user
+
+    def _change_user(self, index: Optional[int], **fields) -> Dict[str, Any]:
+        user = dict(self._load_user(index))
+        user.update(fields, updatedAt=iso(EPOCH))
+        self._changed[index] = user
+        return user
+
+    def update_user(self, query, data) -> Response:
+        index = user_index(str(data.get("uuid", "")))
+        if index is None and data.get("username"):
+            index = user_index(self.get_user_by_username(query, {}, data["username"])[1]["uuid"])
+        fields = {k: v for k, v in data.items() if k in self._user_template and k != "uuid"}
+        return 200, self._change_user(index, **fields)
+
+    def delete_user(self, query, data, uuid) -> Response:
+        index = user_index(uuid)
+        self._load_user(index)
+        self._changed.pop(index, None)
+        insort(self._deleted, index)
+        return 200, {"isDeleted": True}
+
+    def user_action(self, query, data, uuid, action) -> Response:
+        index = user_index(uuid)
+        if action == "enable":
+            return 200, self._change_user(index, status="ACTIVE")
+        if action == "disable":
+            return 200, self._change_user(index, status="DISABLED")
+        if action == "reset-traffic":
+            return 200, self._change_user(index, usedTrafficBytes=0, lastTrafficResetAt=iso(EPOCH))
+        if action == "revoke":
+            return 200, self._change_user(index, subRevokedAt=iso(EPOCH))
+        raise PanelError(404, f"Unknown action {action}")
+
+    # ======================
+    # NODES / HOSTS / SQUADS
+    # ======================
+
+    @staticmethod
+    def _get(collection: Dict[str, Dict[str, Any]], uuid: str, name: str) -> Dict[str, Any]:
+        try:
+            return collection[uuid]
+        except KeyError:
+            raise PanelError(404, f"{name} not found") from None
+
+    def _create(self, collection, data) -> Response:
+        template = next(iter(collection.values()))
+        entity = copy.deepcopy(template)
+        entity.update({k: v for k, v in data.items() if k in entity})
+        entity["uuid"] = self._uuid()
+        collection[entity["uuid"]] = entity
+        return 201, entity
+
+    def _update(self, collection, data, name) -> Response:
+        entity = self._get(collection, str(data.get("uuid", "")), name)
+        entity.update({k: v for k, v in data.items() if k in entity and k != "uuid"})
+        return 200, entity
+
+    def list_nodes(self, query, data) -> Response:
+        return 200, list(self.nodes.values())
+
+    def get_node(self, query, data, uuid) -> Response:
+        return 200, self._get(self.nodes, uuid, "Node")
+
+    def create_node(self, query, data) -> Response:
+        return self._create(self.nodes, data)
+
+    def update_node(self, query, data) -> Response:
+        return self._update(self.nodes, data, "Node")
+
+    def delete_node(self, query, data, uuid) -> Response:
+        self._get(self.nodes, uuid, "Node")
+        del self.nodes[uuid]
+        return 200, {"isDeleted": True}
+
+    def node_action(self, query, data, uuid, action) -> Response:
+        node = self._get(self.nodes, uuid, "Node")
+        if action == "enable":
+            node.update(isDisabled=False, isConnected=True)
+            return 200, node
+        if action == "disable":
+            node.update(isDisabled=True, isConnected=False)
+            return 200, node
+        if action == "restart":
+            # SDK ждёт message, которого нет в спецификации
+            return 200, {"eventSent": True, "message": "Restart event sent"}
+        raise PanelError(404, f"Unknown action {action}")
+
+    def list_hosts(self, query, data) -> Response:
+        return 200, list(self.hosts.values())
+
+    def get_host(self, query, data, uuid) -> Response:
+        return 200, self._get(self.hosts, uuid, "Host")
+
+    def create_host(self, query, data) -> Response:
+        return self._create(self.hosts, data)
+
+    def update_host(self, query, data) -> Response:
+        return self._update(self.hosts, data, "Host")
+
+    def delete_host(self, query, data, uuid) -> Response:
+        self._get(self.hosts, uuid, "Host")
+        del self.hosts[uuid]
+        return 200, {"isDeleted": True}
+
+    def list_squads(self, query, data) -> Response:
+        return 200, {"total": len(self.squads), "internalSquads": list(self.squads.values())}
+
+    def get_squad(self, query, data, uuid) -> Response:
+        return 200, self._get(self.squads, uuid, "Internal squad")
+
+    # ======================
+    # HWID DEVICES
+    # ======================
+
+    def _device(self, index: int, number: int) -> Dict[str, Any]:
+        device = dict(self._device_template)
+        device.update(
+            hwid=f"hwid-{index}-{number}",
+            userUuid=user_uuid(index),
+            platform=("Android", "iOS", "Windows")[index % 3],
+            createdAt=iso(EPOCH - timedelta(days=index % 90)),
+            updatedAt=iso(EPOCH),
+        )
+        return device
+
+    def _user_devices(self, index: int) -> List[Dict[str, Any]]:
+        return [
+            self._device(index, number)
+            for number in range(self.config.devices_per_user)
+            if f"hwid-{index}-{number}" not in self._deleted_devices
+        ]
+
+    def list_devices(self, query, data) -> Response:
+        per_user = self.config.devices_per_user
+        start = int(float(query.get("start", 0)))
+        size = int(float(query.get("size", 1000)))
+        # Удалённые устройства и пользователи учитываются приблизительно — для нагрузки это не важно
+        total = self.total_users * per_user - len(self._deleted_devices)
+        devices = []
+        index = start // per_user if per_user else self._next_index
+        while len(devices) < size and index < self._next_index and per_user:
+            if not self._is_deleted(index):
+                devices.extend(self._user_devices(index))
+            index += 1
+        skip = start % per_user if per_user else 0
+        return 200, {"devices": devices[skip:skip + size], "total": max(0, total)}
+
+    def user_devices(self, query, data, uuid) -> Response:
+        index = user_index(uuid)
+        self._load_user(index)
+        devices = self._user_devices(index)
+        return 200, {"total": len(devices), "devices": devices}
+
+    def delete_device(self, query, data) -> Response:
+        index = user_index(str(data.get("userUuid", "")))
+        self._load_user(index)
+        self._deleted_devices.add(str(data.get("hwid")))
+        devices = self._user_devices(index)
+        return 200, {"total": len(devices), "devices": devices}
+
+    # ======================
+    # SYSTEM
+    # ======================
+
+    def system_stats(self, query, data) -> Response:
+        _, payload, _ = self._spec_sample("GET", "/api/system/stats")
+        stats = copy.deepcopy(payload["response"])
+        counts = {status: 0 for status in set(STATUS_CYCLE)}
+        cycles, rest = divmod(self._next_index, len(STATUS_CYCLE))
+        for i, status in enumerate(STATUS_CYCLE):
+            counts[status] += cycles + (1 if i < rest else 0)
+        for index in self._deleted:
+            counts[STATUS_CYCLE[index % len(STATUS_CYCLE)]] -= 1
+        for index, user in self._changed.items():
+            counts[STATUS_CYCLE[index % len(STATUS_CYCLE)]] -= 1
+            counts[user["status"]] = counts.get(user["status"], 0) + 1
+        stats["users"] = {
+            "statusCounts": counts,
+            "totalUsers": self.total_users,
+            "totalTrafficBytes": str(self.total_users * 20 * GIB),
+        }
+        return 200, stats
+
+
+def _count_items(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        for key in ("users", "devices", "internalSquads"):
+            if isinstance(result.get(key), list):
+                return len(result[key])
+    return 1
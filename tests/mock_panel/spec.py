@@ -0,0 +1,138 @@
+"""
+OpenAPI spec of the panel and sample generation from its schemas
+"""
+import random
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import yaml
+
+SPEC_PATH = Path(__file__).resolve().parents[2] / "remnawave-api-v2117.yaml"
+
+# Момент "сейчас" для сгенерированных дат фиксирован — данные воспроизводимы
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def load_spec(path: Path = SPEC_PATH) -> Dict[str, Any]:
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader)
+
+
+def iso(dt: datetime) -> str:
+    """Datetime in the panel's format: 2025-01-01T00:00:00.000Z"""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+class SchemaSampler:
+    """Builds example values that satisfy OpenAPI schemas"""
+
+    def __init__(self, spec: Dict[str, Any], seed: int = 0):
+        self.spec = spec
+        self.rng = random.Random(seed)
+
+    def resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        while "$ref" in schema:
+            node: Any = self.spec
+            for part in schema["$ref"].lstrip("#/").split("/"):
+                node = node[part]
+            schema = node
+        return schema
+
+    def sample(self, schema: Dict[str, Any], name: str = "value") -> Any:
+        schema = self.resolve(schema)
+        for key in ("oneOf", "anyOf"):
+            if key in schema:
+                return self.sample(schema[key][0], name)
+        if "allOf" in schema:
+            merged: Dict[str, Any] = {}
+            for part in schema["allOf"]:
+                value = self.sample(part, name)
+                if isinstance(value, dict):
+                    merged.update(value)
+            return merged
+        if "enum" in schema:
+            return schema.get("default", schema["enum"][0])
+        if "default" in schema and schema["default"] is not None:
+            return schema["default"]
+
+        kind = schema.get("type", "object" if "properties" in schema else None)
+        nullable = schema.get("nullable", False)
+        if isinstance(kind, list):
+            nullable = nullable or "null" in kind
+            kind = next((k for k in kind if k != "null"), None)
+        # Необязательные строки без формата и объекты без схемы — null:
+        # SDK местами строже спецификации (enum или dict вместо строки)
+        if kind is None or nullable and (
+            (kind == "string" and "format" not in schema)
+            or (kind == "object" and "properties" not in schema)
+        ):
+            kind = "null"
+
+        if kind == "object":
+            return {
+                prop: self.sample(sub, prop)
+                for prop, sub in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [self.sample(schema.get("items", {}), name)]
+        if kind == "integer":
+            return self.rng.randint(int(schema.get("minimum", 0)), int(schema.get("maximum", 1000)))
+        if kind == "number":
+            return self.rng.randint(int(schema.get("minimum", 0)), int(schema.get("maximum", 1000)))
+        if kind == "boolean":
+            return False
+        if kind == "null":
+            return None
+        return self._string(schema, name)
+
+    def _string(self, schema: Dict[str, Any], name: str) -> str:
+        fmt = schema.get("format")
+        if fmt == "uuid":
+            return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+        if fmt == "date-time":
+            return iso(EPOCH - timedelta(minutes=self.rng.randint(0, 60 * 24 * 30)))
+        if fmt == "email":
+            return f"{name}{self.rng.randint(1, 9999)}@example.com"
+        if fmt in ("uri", "url"):
+            return f"https://example.com/{name}"
+        # Строки, которые SDK разбирает как числа и даты
+        lowered = name.lower()
+        if lowered.endswith(("bytes", "count", "total")):
+            return str(self.rng.randint(0, 10 ** 9))
+        if lowered == "date" or lowered.endswith("date"):
+            return (EPOCH - timedelta(days=self.rng.randint(0, 30))).strftime("%Y-%m-%d")
+        value = f"{name}-{self.rng.randint(1, 9999)}"
+        min_length = schema.get("minLength", 0)
+        return value.ljust(min_length, "x")
+
+
+Route = Tuple[str, Pattern[str], str]
+
+
+def spec_routes(spec: Dict[str, Any]) -> List[Route]:
+    """(method, path regex, path template) for every operation in the spec"""
+    routes = []
+    for template, operations in spec.get("paths", {}).items():
+        pattern = re.compile("^" + re.sub(r"\{[^/}]+\}", "[^/]+", template) + "$")
+        for method in operations:
+            if method in ("get", "post", "put", "patch", "delete"):
+                routes.append((method.upper(), pattern, template))
+    # Статические пути важнее шаблонных: /users/tags раньше /users/{uuid}
+    routes.sort(key=lambda route: route[2].count("{"))
+    return routes
+
+
+def success_schema(spec: Dict[str, Any], method: str, template: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Status code and JSON schema of the operation's success response"""
+    responses = spec["paths"][template][method.lower()].get("responses", {})
+    for code, response in responses.items():
+        if str(code).startswith("2"):
+            schema = response.get("content", {}).get("application/json", {}).get("schema")
+            return int(code), schema or {}
+    return None
@@ -0,0 +1,119 @@
+"""
+Tests for streaming gzip user export
+"""
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import patch
+
+from src.features.export import exporter
+from src.features.export.exporter import ExportOptions, export_users, matches_filters
+from src.services.concurrency import AdaptiveLimiter
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _limiter(limit: int) -> AdaptiveLimiter:
+    return AdaptiveLimiter("test", initial=limit, min_limit=limit, max_limit=limit,
+                           target_p95=10, max_error_rate=1)
+
+
+def _user(i: int, status: str = "ACTIVE", expire_days: int = 30) -> dict:
+    return {
+        "uuid": f"00000000-0000-4000-8000-{i:012d}",
+        "username": f"user_{i:03d}",
+        "status": status,
+        "usedTrafficBytes": i * 100,
+        "trafficLimitBytes": 0,
+        "expireAt": (NOW + timedelta(days=expire_days)).isoformat().replace("+00:00", "Z"),
+    }
+
+
+def _read(result) -> str:
+    with gzip.GzipFile(fileobj=result.file, mode="rb") as gz:
+        return gz.read().decode("utf-8")
+
+
+def test_matches_filters():
+    """Test status and expiration filters"""
+    user = _user(1, status="ACTIVE", expire_days=3)
+
+    assert matches_filters(user, ExportOptions(), NOW)
+    assert matches_filters(user, ExportOptions(status="ACTIVE"), NOW)
+    assert not matches_filters(user, ExportOptions(status="DISABLED"), NOW)
+    assert matches_filters(user, ExportOptions(expires_within_days=7), NOW)
+    assert not matches_filters(user, ExportOptions(expires_within_days=1), NOW)
+    # Уже истёкшие и без даты не попадают в «истекает в течение N дней»
+    assert not matches_filters(_user(2, expire_days=-1), ExportOptions(expires_within_days=7), NOW)
+    assert not matches_filters({"status": "ACTIVE"}, ExportOptions(expires_within_days=7), NOW)
+
+
+@pytest.mark.asyncio
+async def test_pages_are_written_in_order_when_prefetched():
+    """Test pages finishing out of order through api_limiter are written in page order"""
+    users = [_user(i) for i in range(10)]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_users_bulk(page, limit):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Поздние страницы отвечают быстрее ранних
+        await asyncio.sleep(0.01 * (5 - page))
+        in_flight -= 1
+        start = (page - 1) * limit
+        return {"response": {"users": users[start:start + limit], "total": len(users)}}
+
+    with patch.object(exporter, "api_limiter", _limiter(4)), \
+            patch.object(exporter, "api_client") as mock_api:
+        mock_api.get_users_bulk = get_users_bulk
+        result = await export_users(ExportOptions(fmt="jsonl", columns=["username"]), page_size=2)
+
+    rows = [json.loads(line) for line in _read(result).splitlines()]
+    assert [row["username"] for row in rows] == [u["username"] for u in users]
+    assert result.rows == result.scanned == 10
+    assert max_in_flight > 1
+
+
+@pytest.mark.asyncio
+async def test_jsonl_export_applies_filters():
+    """Test JSONL rows contain the selected columns of matching users only"""
+    users = [_user(1), _user(2, status="DISABLED"), _user(3)]
+
+    async def get_users_bulk(page, limit):
+        return {"response": {"users": users, "total": len(users)}}
+
+    options = ExportOptions(fmt="jsonl", columns=["username", "usedTrafficBytes"], status="ACTIVE")
+    with patch.object(exporter, "api_client") as mock_api:
+        mock_api.get_users_bulk = get_users_bulk
+        result = await export_users(options, page_size=10)
+
+    rows = [json.loads(line) for line in _read(result).splitlines()]
+    assert rows == [
+        {"username": "user_001", "usedTrafficBytes": 100},
+        {"username": "user_003", "usedTrafficBytes": 300},
+    ]
+    assert result.rows == 2
+    assert result.scanned == 3
+
+
+@pytest.mark.asyncio
+async def test_csv_export_from_mock_panel(panel_api_client):
+    """Test CSV export of the whole mock panel population through the real client"""
+    with patch.object(exporter, "api_limiter", _limiter(3)), \
+            patch.object(exporter, "api_client", panel_api_client):
+        options = ExportOptions(fmt="csv", columns=["username", "status"])
+        result = await export_users(options, page_size=100)
+
+    rows = list(csv.reader(io.StringIO(_read(result))))
+    assert rows[0] == ["username", "status"]
+    assert len(rows) == 251
+    assert [row[0] for row in rows[1:4]] == ["user_000000", "user_000001", "user_000002"]
+    assert rows[-1][0] == "user_000249"
+    assert result.rows == 250
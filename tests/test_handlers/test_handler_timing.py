@@ -0,0 +1,72 @@
+"""
+Tests for handler timing in admin_only
+"""
+import asyncio
+
+import pytest
+from telegram.request import BaseRequest
+
+from src.core.bot import TimedRequest
+from src.core.config import settings
+from src.core.logger import log
+from src.middleware import auth
+from src.middleware.auth import admin_only
+
+
+class SlowTelegram(BaseRequest):
+    read_timeout = None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, **timeouts):
+        await asyncio.sleep(0.01)
+        return 200, b'{"ok": true, "result": true}'
+
+
+@pytest.mark.asyncio
+async def test_time_is_split_between_api_and_telegram(mock_update, mock_context, panel_api_client, monkeypatch):
+    """Test nested client calls count once and Bot API time is attributed to the handler"""
+    timings = []
+    monkeypatch.setattr(auth, "observe_handler", timings.append)
+    telegram = TimedRequest(SlowTelegram())
+
+    @admin_only
+    async def users_screen(update, context):
+        # get_users_bulk внутри вызывает get_users_raw — это один вызов панели для обработчика
+        await panel_api_client.get_users_bulk(page=1, limit=10)
+        await telegram.post("https://api.telegram.org/botX/answerCallbackQuery")
+
+    await users_screen(mock_update, mock_context)
+
+    timing = timings[0]
+    assert timing.handler == "users_screen"
+    assert timing.details == "callback='test_data'"
+    assert timing.api_calls == 1
+    assert timing.telegram_calls == 1 and timing.telegram_seconds >= 0.01
+    assert timing.wall >= timing.api_seconds + timing.telegram_seconds
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_is_logged_with_error(mock_update, mock_context, monkeypatch):
+    """Test handlers over the threshold are logged with callback data and exception"""
+    monkeypatch.setattr(settings, "slow_handler_threshold", 0.001)
+    messages = []
+    sink = log.add(lambda message: messages.append(str(message)), level="WARNING")
+
+    @admin_only
+    async def broken_screen(update, context):
+        await asyncio.sleep(0.005)
+        raise RuntimeError("boom")
+
+    try:
+        with pytest.raises(RuntimeError):
+            await broken_screen(mock_update, mock_context)
+    finally:
+        log.remove(sink)
+
+    slow = [m for m in messages if "Slow handler broken_screen" in m]
+    assert slow and "callback='test_data'" in slow[0] and "error=RuntimeError" in slow[0]
@@ -0,0 +1,44 @@
+"""
+Tests for the /perf screen
+"""
+import pytest
+from telegram.error import RetryAfter
+from telegram.request import BaseRequest
+
+from src.core.bot import TimedRequest
+from src.features.perf.handlers import perf_callback
+from src.features.perf.stats import collect, rss_bytes
+
+
+class FloodedTelegram(BaseRequest):
+    read_timeout = None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, **timeouts):
+        return 429, b'{"ok": false, "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 1}}'
+
+
+@pytest.mark.asyncio
+async def test_perf_screen_shows_api_percentiles(mock_update, mock_context, panel_api_client):
+    """Test /perf reads API latency and 429 counts from the metrics registry"""
+    await panel_api_client.get_nodes()
+    rate_limited = collect()["telegram_429"]
+    with pytest.raises(RetryAfter):
+        await TimedRequest(FloodedTelegram()).post("https://api.telegram.org/botX/sendMessage")
+
+    stats = collect()
+    assert stats["telegram_429"] == rate_limited + 1
+    assert any(item["method"] == "get_nodes" and item["p95"] is not None for item in stats["api_methods"])
+    assert stats["rss_bytes"] == pytest.approx(rss_bytes(), rel=0.5)
+
+    await perf_callback(mock_update, mock_context)
+
+    text = mock_update.callback_query.edit_message_text.call_args.args[0]
+    assert "<code>get_nodes</code>" in text
+    assert f"Ответов 429 от Telegram:</b> {rate_limited + 1}" in text
+    assert "Память (RSS)" in text
@@ -0,0 +1,87 @@
+"""
+Tests for streaming user import
+"""
+import io
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.features.users import importer
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def test_detect_format():
+    """Test format detection by file name"""
+    assert importer.detect_format("users.csv") == "csv"
+    assert importer.detect_format("users.JSONL") == "jsonl"
+    with pytest.raises(importer.ImportFormatError):
+        importer.detect_format("users.xlsx")
+
+
+def test_parse_row_create():
+    """Test row without uuid becomes a create payload"""
+    payload, error = importer.parse_row({
+        "username": "new_user",
+        "traffic_limit_gb": "10",
+        "expire_days": "30",
+        "status": "disabled"
+    })
+    assert error is None
+    assert payload["username"] == "new_user"
+    assert payload["traffic_limit_bytes"] == 10 * 1024**3
+    assert payload["status"] == "DISABLED"
+    assert "expire_at" in payload
+
+
+def test_parse_row_invalid_username():
+    """Test invalid username is reported"""
+    payload, error = importer.parse_row({"username": "bad user!"})
+    assert payload is None
+    assert "может содержать только" in error
+
+
+def test_parse_row_update_requires_fields():
+    """Test update row without any fields is rejected"""
+    payload, error = importer.parse_row({"uuid": "123e4567-e89b-12d3-a456-426614174000"})
+    assert payload is None
+    assert error is not None
+
+
+@pytest.mark.asyncio
+async def test_run_import_dry_run():
+    """Test dry run validates rows without API calls"""
+    data = _csv(
+        "username,uuid,status\n"
+        "user_one,,active\n"
+        "x,,active\n"
+        ",123e4567-e89b-12d3-a456-426614174000,disabled\n"
+    )
+    with patch.object(importer, "api_client") as mock_api:
+        report = await importer.run_import(data, "csv", dry_run=True, chunk_size=2)
+
+    assert report.total == 3
+    assert report.created == 1
+    assert report.updated == 1
+    assert report.failed == 1
+    assert b"x" in report.error_report_bytes()
+    mock_api.create_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_import_apply_jsonl():
+    """Test JSONL rows are applied in chunks"""
+    lines = [json.dumps({"username": f"user_{i}"}) for i in range(5)]
+    lines.insert(2, "{not json")
+    data = io.BytesIO("\n".join(lines).encode("utf-8"))
+
+    with patch.object(importer, "api_client") as mock_api:
+        mock_api.create_user = AsyncMock(return_value={"response": {}})
+        report = await importer.run_import(data, "jsonl", dry_run=False, chunk_size=2)
+
+    assert report.created == 5
+    assert report.failed == 1
+    assert mock_api.create_user.await_count == 5
@@ -0,0 +1,92 @@
+"""
+Tests for adaptive API concurrency limiter
+"""
+import asyncio
+
+import pytest
+
+from src.services.api import RemnaWaveAPIError
+from src.services.concurrency import OK, OVERLOAD, AdaptiveLimiter, classify_error
+
+
+def _limiter(name="test", **kwargs):
+    params = dict(initial=4, min_limit=1, max_limit=8, target_p95=1.0, max_error_rate=0.1, window=5)
+    params.update(kwargs)
+    return AdaptiveLimiter(name, **params)
+
+
+async def _ok():
+    await asyncio.sleep(0)
+
+
+async def _overloaded():
+    await asyncio.sleep(0.01)
+    raise RemnaWaveAPIError("Too many requests", 429)
+
+
+def test_classify_error():
+    """Test 429/5xx/timeouts are overload signals and 4xx are not"""
+    assert classify_error(RemnaWaveAPIError("busy", 503)) == OVERLOAD
+    assert classify_error(asyncio.TimeoutError()) == OVERLOAD
+    assert classify_error(RemnaWaveAPIError("not found", 404)) == OK
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_additively():
+    """Test limit grows by one per healthy window"""
+    limiter = _limiter()
+
+    for _ in range(10):
+        await limiter.run(_ok)
+
+    assert limiter.limit == 6
+
+
+@pytest.mark.asyncio
+async def test_limit_cut_once_per_burst():
+    """Test concurrent overload signals halve the limit only once"""
+    limiter = _limiter(initial=8)
+
+    results = await asyncio.gather(
+        *(limiter.run(_overloaded) for _ in range(8)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RemnaWaveAPIError) for r in results)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit():
+    """Test limiter bounds parallel calls"""
+    limiter = _limiter(initial=2, max_limit=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(limiter.run(call) for _ in range(10)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_and_in_flight_are_exported():
+    """Test the limiter publishes its limit and busy slots as gauges"""
+    from src.services.metrics import api_concurrency_in_flight, api_concurrency_limit
+
+    limiter = _limiter(name="exported", initial=8)
+    seen = []
+
+    async def call():
+        seen.append(api_concurrency_in_flight.value(limiter="exported"))
+        await asyncio.sleep(0)
+
+    await asyncio.gather(limiter.run(call), limiter.run(call))
+    await asyncio.gather(*(limiter.run(_overloaded) for _ in range(2)), return_exceptions=True)
+
+    assert seen == [1, 2]
+    assert api_concurrency_in_flight.value(limiter="exported") == 0
+    assert api_concurrency_limit.value(limiter="exported") == 4
@@ -0,0 +1,32 @@
+"""
+Tests for per-update deadline propagation
+"""
+import asyncio
+
+import pytest
+
+from src.services.deadline import DeadlineExceeded, remaining, request_deadline, within_deadline
+from src.services.rate_limiter import background_lane
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_budget_is_spent():
+    """Test awaitable is cut off by the deadline"""
+    with request_deadline(0.05):
+        with pytest.raises(DeadlineExceeded):
+            await within_deadline(asyncio.sleep(1))
+
+
+def test_nested_deadline_cannot_extend_outer():
+    """Test inner budget is capped by the outer one"""
+    with request_deadline(1):
+        with request_deadline(30):
+            assert remaining() <= 1
+    assert remaining() is None
+
+
+def test_background_lane_has_no_deadline():
+    """Test bulk work is not bound by the handler budget"""
+    with request_deadline(1):
+        with background_lane():
+            assert remaining() is None
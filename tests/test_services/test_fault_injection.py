@@ -0,0 +1,59 @@
+"""
+Tests for latency/fault injection
+"""
+import httpx
+import pytest
+
+from src.services.fault_injection import (
+    FaultInjectionTransport,
+    FaultSpecError,
+    parse_rules,
+)
+
+
+def _transport(spec: str, seed: int = 1) -> FaultInjectionTransport:
+    panel = httpx.MockTransport(lambda request: httpx.Response(200, json={"response": {}}))
+    return FaultInjectionTransport(panel, parse_rules(spec), seed=seed)
+
+
+def test_parse_rules():
+    """Test rule syntax with method, latency distributions and failures"""
+    rules = parse_rules("GET /users*: latency=100-300 error=0.5 status=429 retry_after=2; *: latency=exp:50")
+
+    assert rules[0].method == "GET"
+    assert rules[0].latency == ("uniform", 100.0, 300.0)
+    assert (rules[0].error_rate, rules[0].failure, rules[0].retry_after) == (0.5, "429", 2.0)
+    assert rules[1].method is None and rules[1].latency == ("exp", 50.0, 0.0)
+
+    with pytest.raises(FaultSpecError):
+        parse_rules("/users: speed=fast")
+
+
+@pytest.mark.asyncio
+async def test_injected_status_and_timeout():
+    """Test failures are injected only for matching endpoints"""
+    async with httpx.AsyncClient(
+        base_url="http://panel/api",
+        transport=_transport("GET /users*: error=1 status=503 retry_after=1; /nodes: error=1 status=timeout")
+    ) as client:
+        response = await client.get("/users")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        with pytest.raises(httpx.ReadTimeout):
+            await client.get("/nodes")
+
+        assert (await client.get("/hosts")).status_code == 200
+        assert (await client.post("/users")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_same_seed_gives_same_faults():
+    """Test injection is reproducible"""
+    async def run() -> list:
+        async with httpx.AsyncClient(
+            base_url="http://panel/api", transport=_transport("*: error=0.5", seed=7)
+        ) as client:
+            return [(await client.get("/users")).status_code for _ in range(20)]
+
+    assert await run() == await run()
@@ -0,0 +1,126 @@
+"""
+Tests for background jobs service
+"""
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.services.jobs import JobManager, JobStatus
+
+
+def _users(count):
+    users = [{"uuid": f"user-{i}"} for i in range(count)]
+
+    async def get_users(page, limit):
+        return {"response": {"users": users[(page - 1) * limit:page * limit], "total": count}}
+
+    return get_users
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    from src.core.config import settings
+    from src.features.mass_operations import jobs as mass_jobs
+
+    monkeypatch.setattr(settings, "jobs_store_path", str(tmp_path / "jobs.json"))
+    monkeypatch.setattr(settings, "mass_chunk_size", 5)
+
+    manager = JobManager()
+    manager.register(mass_jobs.MASS_OPERATION_JOB, mass_jobs.run_mass_operation)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_mass_job_completes(manager):
+    """Test mass operation job processes all users"""
+    from src.features.mass_operations import jobs as mass_jobs
+
+    with patch.object(mass_jobs, "api_client") as mock_api:
+        mock_api.get_users_bulk = _users(23)
+        mock_api.update_user = AsyncMock()
+
+        await manager.start(MagicMock())
+        job = await manager.submit(
+            mass_jobs.MASS_OPERATION_JOB, {"operation": "deactivate", "page_size": 10}, "test"
+        )
+        await asyncio.sleep(0.1)
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.processed == 23
+    assert mock_api.update_user.await_count == 23
+
+
+def _interrupted_job(tmp_path, operation, items):
+    from src.features.mass_operations import jobs as mass_jobs
+
+    (tmp_path / "jobs.json").write_text(json.dumps([{
+        "id": "resume01",
+        "kind": mass_jobs.MASS_OPERATION_JOB,
+        "params": {"operation": operation, "days": 30, "page_size": 10},
+        "title": "test",
+        "status": JobStatus.RUNNING,
+        "processed": 10,
+        "checkpoint": {"page": 1}
+    }]))
+    (tmp_path / "jobs.resume01.items").write_text(
+        "".join(f"{uuid} {state}\n" for uuid, state in items)
+    )
+
+
+@pytest.mark.asyncio
+async def test_mass_job_resumes_by_uuid(manager, tmp_path):
+    """Test resumed job skips processed users by UUID even if the list shifted"""
+    from src.features.mass_operations import jobs as mass_jobs
+
+    _interrupted_job(tmp_path, "activate", [(f"user-{i}", "ok") for i in range(15)])
+    get_users = _users(25)
+
+    async def shifted(page, limit):
+        # Пока бот лежал, первых двух пользователей удалили
+        response = await get_users(1, 25)
+        users = response["response"]["users"][2:]
+        return {"response": {"users": users[(page - 1) * limit:page * limit], "total": len(users)}}
+
+    with patch.object(mass_jobs, "api_client") as mock_api:
+        mock_api.get_users_bulk = shifted
+        mock_api.update_user = AsyncMock()
+
+        await manager.start(MagicMock())
+        await asyncio.sleep(0.1)
+
+    job = manager.get("resume01")
+    assert job.status == JobStatus.COMPLETED
+    assert sorted(call.args[0] for call in mock_api.update_user.await_args_list) == sorted(
+        f"user-{i}" for i in range(15, 25)
+    )
+    assert job.success == 25
+    assert not (tmp_path / "jobs.resume01.items").exists()
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_job_does_not_repeat_in_flight_users(manager, tmp_path):
+    """Test extend is not applied again to users whose call was in flight during a crash"""
+    from src.features.mass_operations import jobs as mass_jobs
+
+    items = [(f"user-{i}", "ok") for i in range(3)]
+    items += [("user-3", "started"), ("user-4", "started"), ("user-4", "ok")]
+    _interrupted_job(tmp_path, "extend", items)
+
+    with patch.object(mass_jobs, "api_client") as mock_api:
+        mock_api.get_users_bulk = _users(8)
+        mock_api.extend_user_subscription = AsyncMock()
+
+        await manager.start(MagicMock())
+        await asyncio.sleep(0.1)
+
+    job = manager.get("resume01")
+    assert job.status == JobStatus.COMPLETED
+    # Пользователи чанка обрабатываются параллельно, порядок вызовов не фиксирован
+    assert {call.args[0] for call in mock_api.extend_user_subscription.await_args_list} == {
+        "user-5", "user-6", "user-7"
+    }
+    assert mock_api.extend_user_subscription.await_count == 3
+    assert job.success == 7
+    assert job.failed == 1
@@ -0,0 +1,57 @@
+"""
+Tests for the event loop lag monitor
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.core.logger import log
+from src.services.loop_monitor import LoopMonitor
+
+
+def parse_users_synchronously():
+    # Имитирует тяжёлую синхронную работу в обработчике
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocked_loop_logs_stack_and_update():
+    """Test the watchdog logs the blocking function and the update being processed"""
+    monitor = LoopMonitor(interval=0.01, threshold=0.1)
+    messages = []
+    sink = log.add(lambda message: messages.append(str(message)), level="WARNING")
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+
+        async def handle_update():
+            with monitor.track_update("callback='users_list'"):
+                parse_users_synchronously()
+
+        await asyncio.create_task(handle_update(), name="update-1")
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+        log.remove(sink)
+
+    blocked = [m for m in messages if "Event loop blocked" in m]
+    assert len(blocked) == 1
+    assert "update-1 [callback='users_list']" in blocked[0]
+    assert "parse_users_synchronously" in blocked[0]
+    assert monitor.blocked_events == 1
+    assert monitor.max_lag >= 0.25
+    assert monitor.stats()["updates_in_progress"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_has_no_blocked_events():
+    """Test an idle loop records small lag and never triggers the watchdog"""
+    monitor = LoopMonitor(interval=0.01, threshold=0.2)
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert monitor.blocked_events == 0
+    assert monitor.max_lag < 0.2
+    assert not monitor.running
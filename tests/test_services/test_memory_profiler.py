@@ -0,0 +1,62 @@
+"""
+Tests for tracemalloc snapshots
+"""
+import asyncio
+
+import pytest
+
+from src.services.memory_profiler import MemoryProfiler, describe_user_data
+
+
+def grow(store):
+    store.extend(bytearray(1024) for _ in range(2000))
+
+
+@pytest.mark.asyncio
+async def test_second_snapshot_diffs_against_first():
+    """Test the diff points at the line that kept allocating between snapshots"""
+    profiler = MemoryProfiler(frames=5)
+    store = []
+    try:
+        first = await profiler.snapshot()
+        grow(store)
+        second = await profiler.snapshot({1: {"page": 1}})
+    finally:
+        await profiler.stop()
+
+    assert first.growth_bytes is None and first.number == 1
+    assert second.number == 2 and second.growth_bytes >= 2000 * 1024
+    diff = second.text.split("Diff against snapshot #1")[1]
+    assert "test_memory_profiler.py" in diff.splitlines()[1]
+    assert "Conversation state: 1 users, 1 keys" in second.text
+    assert not profiler.tracing
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_running_snapshot():
+    """Test stop during a snapshot takes effect after it, leaving no stale previous snapshot"""
+    profiler = MemoryProfiler(frames=1)
+    snapshot = asyncio.create_task(profiler.snapshot())
+    await asyncio.sleep(0)
+    await profiler.stop()
+
+    report = await snapshot
+    assert report.number == 1
+    assert not profiler.tracing
+    assert profiler.snapshots == 0
+
+    again = await profiler.snapshot()
+    await profiler.stop()
+    assert again.number == 1 and again.growth_bytes is None
+
+
+def test_describe_user_data_sizes_keys():
+    """Test conversation state is summarised per key, largest first"""
+    lines = describe_user_data({
+        1: {"current_user_data": {"uuid": "u1", "note": "x" * 500}, "page": 1},
+        2: {"current_user_data": {"uuid": "u2"}},
+    })
+
+    assert lines[0] == "Conversation state: 2 users, 3 keys"
+    assert lines[1].split()[:2] == ["current_user_data", "sessions=2"]
+    assert lines[2].split()[0] == "page"
@@ -0,0 +1,71 @@
+"""
+Tests for the metrics registry and endpoint
+"""
+import asyncio
+
+import pytest
+
+from src.services.api import RemnaWaveAPIError
+from src.services.metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    api_errors_total,
+    api_request_seconds,
+)
+
+
+def test_histogram_exposition_and_quantile():
+    """Test cumulative buckets in the text format and the bucket-based p95"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        latency.observe(value, op="get")
+
+    text = registry.render()
+    assert '# TYPE op_seconds histogram' in text
+    assert 'op_seconds_bucket{op="get",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="get",le="+Inf"} 4' in text
+    assert 'op_seconds_count{op="get"} 4' in text
+    assert latency.quantile(0.5, op="get") == pytest.approx(0.1)
+    assert latency.quantile(0.95, op="get") == 1.0
+
+    with pytest.raises(ValueError):
+        latency.observe(1.0, method="get")
+
+
+@pytest.mark.asyncio
+async def test_api_methods_are_instrumented(panel_api_client):
+    """Test every client method gets a latency sample and failures are counted by kind"""
+    calls = api_request_seconds.count(method="get_user")
+    errors = api_errors_total.value(method="get_user", kind="4xx")
+
+    await panel_api_client.get_user("00000000-0000-4000-8000-000000000001")
+    with pytest.raises(RemnaWaveAPIError):
+        await panel_api_client.get_user("00000000-0000-4000-8000-0000000fffff")
+
+    assert api_request_seconds.count(method="get_user") == calls + 2
+    assert api_errors_total.value(method="get_user", kind="4xx") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """Test /metrics serves the registry and other paths are 404"""
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits").inc(3)
+    server = MetricsServer(registry)
+    await server.start("127.0.0.1", 0)
+    port = server._server.sockets[0].getsockname()[1]
+
+    async def get(path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        return data
+
+    try:
+        assert b"hits_total 3" in await get("/metrics")
+        assert (await get("/")).startswith(b"HTTP/1.1 404")
+    finally:
+        await server.stop()
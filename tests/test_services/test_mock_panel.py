@@ -0,0 +1,89 @@
+"""
+Tests for the mock panel and the real API client stack running against it
+"""
+import pytest
+
+from src.services.api import RemnaWaveAPIError
+from tests.mock_panel import MockPanel, PanelConfig, user_uuid
+
+
+@pytest.mark.asyncio
+async def test_users_pagination_through_sdk(panel_api_client):
+    """Test SDK-validated pages and the streaming path see the same population"""
+    first = await panel_api_client.get_users(page=1, limit=100)
+    last = await panel_api_client.get_users_raw(page=3, limit=100)
+
+    assert first['response']['total'] == 250
+    assert [u['username'] for u in first['response']['users'][:2]] == ['user_000000', 'user_000001']
+    assert len(last['response']['users']) == 50
+
+
+@pytest.mark.asyncio
+async def test_user_changes_are_kept(panel_api_client, mock_panel):
+    """Test updates and deletes change what the panel returns afterwards"""
+    await panel_api_client.update_user(user_uuid(5), {"status": "DISABLED"})
+    user = await panel_api_client.get_user(user_uuid(5))
+    assert str(user['response']['status'].value) == 'DISABLED'
+
+    await panel_api_client.delete_user(user_uuid(6))
+    with pytest.raises(RemnaWaveAPIError) as error:
+        await panel_api_client.get_user(user_uuid(6))
+    assert error.value.status_code == 404
+    assert mock_panel.total_users == 249
+
+
+@pytest.mark.asyncio
+async def test_search_by_username_path(panel_api_client):
+    """Test a username in place of a UUID is rejected and view UUIDs work as path params"""
+    with pytest.raises(RemnaWaveAPIError) as error:
+        await panel_api_client.get_user("user_000001")
+    assert error.value.status_code == 400
+
+    user = (await panel_api_client.get_user(user_uuid(1)))['response']
+    devices = await panel_api_client.get_user_devices(user['uuid'])
+    assert devices['response']['total'] >= 0
+
+
+@pytest.mark.asyncio
+async def test_every_screen_endpoint_validates(panel_api_client):
+    """Test SDK models accept the spec-generated nodes, hosts, squads, devices and stats"""
+    nodes = (await panel_api_client.get_nodes())['response']
+    await panel_api_client.get_node(str(nodes[0]['uuid']))
+    await panel_api_client.get_hosts()
+    await panel_api_client.get_inbounds()
+    await panel_api_client.get_squads()
+    await panel_api_client.get_devices()
+    await panel_api_client.get_user_devices(user_uuid(1))
+    await panel_api_client.get_all_devices_stats()
+    await panel_api_client.get_bandwidth_stats()
+    await panel_api_client.get_nodes_statistics()
+
+    stats = (await panel_api_client.get_system_stats())['response']
+    assert stats['users']['totalUsers'] == 250
+
+
+@pytest.mark.asyncio
+async def test_devices_streaming_matches_sdk(panel_api_client, monkeypatch):
+    """Test the streamed devices list has the same devices and total as the SDK path"""
+    from src.core.config import settings
+
+    monkeypatch.setattr(settings, "api_streaming_reads", True)
+    streamed = (await panel_api_client.get_devices())['response']
+    monkeypatch.setattr(settings, "api_streaming_reads", False)
+    validated = (await panel_api_client.get_devices())['response']
+
+    assert streamed['devices']
+    assert streamed['total'] == validated['total']
+    assert [d['hwid'] for d in streamed['devices']] == [d['hwid'] for d in validated['devices']]
+    assert streamed['devices'][0]['userUuid'] == str(validated['devices'][0]['userUuid'])
+
+
+def test_large_population_is_virtual():
+    """Test 100k users do not have to be materialised"""
+    panel = MockPanel(PanelConfig(users=100_000, latency_ms=0))
+    status, page = panel.list_users({"start": "99990", "size": "25"}, {})
+
+    assert status == 200
+    assert page["total"] == 100_000
+    assert page["users"][-1]["username"] == "user_099999"
+    assert not panel._changed
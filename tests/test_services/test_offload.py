@@ -0,0 +1,38 @@
+"""
+Tests for the CPU offload pool
+"""
+import threading
+
+import pytest
+
+from src.services.offload import CpuOffloader
+
+
+@pytest.mark.asyncio
+async def test_small_inputs_run_inline_large_in_pool():
+    """Test the size threshold decides where the work runs"""
+    offloader = CpuOffloader(threshold_bytes=1024, max_workers=1)
+    try:
+        small = await offloader.run(threading.current_thread, size=10)
+        large = await offloader.run(threading.current_thread, size=4096)
+    finally:
+        offloader.shutdown()
+
+    assert small is threading.current_thread()
+    assert large.name.startswith("cpu-offload")
+    assert offloader.stats()["offloaded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_from_worker():
+    """Test exceptions raised in the pool reach the caller"""
+    offloader = CpuOffloader(threshold_bytes=1, max_workers=1)
+
+    def fail():
+        raise ValueError("bad payload")
+
+    try:
+        with pytest.raises(ValueError):
+            await offloader.run(fail, size=10)
+    finally:
+        offloader.shutdown()
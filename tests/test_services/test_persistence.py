@@ -0,0 +1,140 @@
+"""
+Tests for Redis persistence of conversation state
+"""
+import asyncio
+import json
+
+import pytest
+
+from src.models.views import UserView
+from src.services import persistence as persistence_module
+from src.services.persistence import RedisPersistence
+from src.services.state_store import ConversationState, EntityRef
+from tests.mock_panel import user_uuid
+
+
+class FakeRedisCache:
+    """cache_service stand-in: keeps written JSON in a dict and counts round trips"""
+
+    enabled = True
+    redis = "connected"
+
+    def __init__(self):
+        self.data = {}
+        self.batches = []
+
+    async def get_pattern(self, pattern):
+        prefix = pattern.rstrip("*")
+        return {key: json.loads(value) for key, value in self.data.items() if key.startswith(prefix)}
+
+    async def write_batch(self, writes, expire=None):
+        self.batches.append((dict(writes), expire))
+        for key, value in writes.items():
+            if value is None:
+                self.data.pop(key, None)
+            else:
+                self.data[key] = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return True
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    cache = FakeRedisCache()
+    monkeypatch.setattr(persistence_module, "cache_service", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_state_survives_restart(fake_cache):
+    """Test user data, referenced entities and conversation states are restored"""
+    state = ConversationState(ttl=600)
+    state['editing_user_uuid'] = 'user-uuid-1'
+    state.set_ref('current_user_data', {'uuid': 'user-uuid-1', 'username': 'алиса'})
+
+    persistence = RedisPersistence(update_interval=60)
+    # Как Application.update_persistence: все изменения раунда одновременно
+    await asyncio.gather(
+        persistence.update_user_data(42, state),
+        persistence.update_conversation("user_edit", (42, 42), 1),
+        persistence.update_conversation("user_create", (42, 42), None),
+    )
+    await persistence.flush()
+
+    assert len(fake_cache.batches) == 1
+    assert fake_cache.batches[0][1].total_seconds() > 0
+    assert "алиса" in fake_cache.data["remnabot:state:user:42"]
+
+    restored = RedisPersistence(update_interval=60)
+    user_data = await restored.get_user_data()
+    # Оставшийся TTL сохраняется, а не начинается заново
+    assert 590 < user_data[42].dump()['editing_user_uuid'][1] <= 600
+    assert user_data[42]['current_user_data']['username'] == 'алиса'
+    assert user_data[42]['editing_user_uuid'] == 'user-uuid-1'
+    assert await restored.get_conversations("user_edit") == {(42, 42): 1}
+    assert await restored.get_conversations("user_create") == {}
+
+
+@pytest.mark.asyncio
+async def test_emptied_state_is_deleted(fake_cache):
+    """Test cleared user data and dropped chats remove their keys"""
+    persistence = RedisPersistence(update_interval=60)
+    state = ConversationState()
+    state['bulk_count'] = 5
+    await persistence.update_user_data(7, state)
+    await persistence.update_chat_data(-100123, {'note': 1})
+    await persistence.flush()
+
+    state.clear()
+    await persistence.update_user_data(7, state)
+    await persistence.drop_chat_data(-100123)
+    await persistence.flush()
+
+    assert fake_cache.data == {}
+    assert len(fake_cache.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_api_views_round_trip_as_dicts(fake_cache, panel_api_client):
+    """Test a UserView being edited comes back as a usable dict after a restart"""
+    user = (await panel_api_client.get_user(user_uuid(2)))['response']
+    assert isinstance(user, UserView)
+    state = ConversationState()
+    state['editing_user_uuid'] = str(user['uuid'])
+    state.set_ref('current_user_data', user)
+
+    persistence = RedisPersistence(update_interval=60)
+    await persistence.update_user_data(42, state)
+    await persistence.flush()
+
+    restored = (await RedisPersistence(update_interval=60).get_user_data())[42]
+    entity = restored['current_user_data']
+    assert isinstance(entity, dict)
+    assert entity['username'] == user['username']
+    assert entity['uuid'] == str(user['uuid'])
+    assert entity.get('trafficLimitBytes') == user['trafficLimitBytes']
+    assert restored._data['current_user_data'][0] == EntityRef(str(user['uuid']))
+
+
+@pytest.mark.asyncio
+async def test_keys_queued_during_write_are_saved(fake_cache, monkeypatch):
+    """Test a key queued while a batch is being written goes out without another update"""
+    write_batch = fake_cache.write_batch
+    writing = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_write_batch(writes, expire=None):
+        writing.set()
+        await release.wait()
+        return await write_batch(writes, expire)
+
+    monkeypatch.setattr(fake_cache, "write_batch", slow_write_batch)
+    persistence = RedisPersistence(update_interval=60)
+
+    await persistence.update_conversation("user_edit", (1, 1), 1)
+    await writing.wait()
+    await persistence.update_conversation("user_edit", (2, 2), 2)
+    release.set()
+    await persistence._writer
+
+    assert len(fake_cache.batches) == 2
+    assert json.loads(fake_cache.data["remnabot:state:conv:user_edit:2:2"]) == 2
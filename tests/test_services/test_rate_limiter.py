@@ -0,0 +1,62 @@
+"""
+Tests for API token-bucket rate limiter
+"""
+import asyncio
+
+import pytest
+
+from src.services.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    TokenBucket,
+    background_lane,
+    current_lane,
+)
+
+
+@pytest.mark.asyncio
+async def test_interactive_jumps_ahead_of_background():
+    """Test queued background requests are served after interactive ones"""
+    bucket = TokenBucket(rate=50, burst=1)
+    await bucket.acquire(INTERACTIVE)  # опустошаем бакет
+    order = []
+
+    async def request(lane, name):
+        await bucket.acquire(lane)
+        order.append(name)
+
+    background = [asyncio.create_task(request(BACKGROUND, f"bg{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request(INTERACTIVE, "admin"))
+
+    await asyncio.gather(*background, interactive)
+
+    assert order[0] == "admin"
+    assert order[1:] == ["bg0", "bg1", "bg2"]
+
+
+@pytest.mark.asyncio
+async def test_rate_is_enforced():
+    """Test requests over the burst wait for refill"""
+    bucket = TokenBucket(rate=100, burst=2)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    for _ in range(6):
+        await bucket.acquire(INTERACTIVE)
+
+    assert loop.time() - started >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_background_lane_is_inherited_by_tasks():
+    """Test lane context propagates to tasks created inside the block"""
+
+    async def lane():
+        return current_lane()
+
+    with background_lane():
+        inner = await asyncio.gather(lane())
+
+    assert inner == [BACKGROUND]
+    assert current_lane() == INTERACTIVE
@@ -0,0 +1,138 @@
+"""
+Tests for retries and circuit breaker around panel requests
+"""
+import httpx
+import pytest
+
+from src.services import resilience
+from src.services.metrics import api_requests_in_flight
+from src.services.resilience import CircuitBreaker, CircuitOpenError, ResilientTransport, _retry_after
+
+
+def _client(handler, breaker, retries=2, backoff_cap=0):
+    transport = ResilientTransport(
+        httpx.MockTransport(handler),
+        breaker=breaker,
+        retries=retries,
+        backoff_base=0,
+        backoff_cap=backoff_cap
+    )
+    return httpx.AsyncClient(base_url="http://panel/api", transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_is_retried():
+    """Test GET is retried on 503 and succeeds"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503 if len(calls) < 3 else 200, json={})
+
+    async with _client(handler, CircuitBreaker(10, 30)) as client:
+        response = await client.get("/users")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_request_is_not_retried():
+    """Test POST is not repeated after the panel received it"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503, json={})
+
+    async with _client(handler, CircuitBreaker(10, 30)) as client:
+        response = await client.post("/users", json={})
+
+    assert response.status_code == 503
+    assert calls == ["POST"]
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_when_panel_is_down():
+    """Test open breaker rejects requests without sending them"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        raise httpx.ConnectError("refused", request=request)
+
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    async with _client(handler, breaker) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("/users")
+        assert breaker.is_open
+
+        with pytest.raises(CircuitOpenError):
+            await client.get("/users")
+
+    assert len(calls) == 3
+
+
+def test_breaker_half_open_probe_closes_circuit():
+    """Test successful probe after reset timeout closes the breaker"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.is_open
+
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+@pytest.mark.parametrize("value", ["inf", "nan", "-5", "soon"])
+def test_invalid_retry_after_is_ignored(value):
+    """Test non-finite, negative and malformed Retry-After values are dropped"""
+    assert _retry_after(httpx.Response(429, headers={"Retry-After": value})) is None
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_capped(monkeypatch):
+    """Test a huge Retry-After does not hold the request longer than the backoff cap"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+
+    def handler(request):
+        if delays:
+            return httpx.Response(200, json={})
+        return httpx.Response(429, headers={"Retry-After": "86400"}, json={})
+
+    async with _client(handler, CircuitBreaker(10, 30), backoff_cap=5) as client:
+        response = await client.get("/users")
+
+    assert response.status_code == 200
+    assert delays == [5]
+
+
+@pytest.mark.asyncio
+async def test_requests_in_flight_until_body_closed():
+    """Test attempts count as in flight until their response body is closed"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503 if len(calls) < 2 else 200, json={})
+
+    before = api_requests_in_flight.value()
+    async with _client(handler, CircuitBreaker(10, 30)) as client:
+        async with client.stream("GET", "/users") as response:
+            assert response.status_code == 200
+            assert api_requests_in_flight.value() == before + 1
+        assert api_requests_in_flight.value() == before
+
+        await client.get("/users")
+
+    assert len(calls) == 3
+    assert api_requests_in_flight.value() == before
@@ -0,0 +1,86 @@
+"""
+Tests for the conversation state store
+"""
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.views import UserView
+from src.services.state_store import ConversationState, EntityRef, state_store
+from tests.mock_panel import user_uuid
+
+
+@pytest.mark.asyncio
+async def test_keys_expire_after_ttl():
+    """Test idle keys disappear while recently used ones stay"""
+    state = ConversationState(ttl=0.05)
+    state['editing_user_uuid'] = 'u1'
+    state['bulk_count'] = 10
+
+    await asyncio.sleep(0.03)
+    assert state.get('bulk_count') == 10  # чтение продлевает TTL
+    await asyncio.sleep(0.03)
+
+    assert 'editing_user_uuid' not in state
+    assert dict(state) == {'bulk_count': 10}
+
+
+def test_size_limit_evicts_oldest_keys():
+    """Test a session over its byte limit drops the oldest keys first"""
+    state = ConversationState(ttl=0, max_bytes=1000)
+    state['old'] = 'x' * 400
+    state['middle'] = 'y' * 400
+    state['new'] = 'z' * 400
+
+    assert list(state) == ['middle', 'new']
+    assert state.nbytes <= 1000
+
+
+def test_entities_are_held_by_reference():
+    """Test two sessions editing one user share a single payload"""
+    user = {'uuid': 'user-uuid-1', 'username': 'alice', 'note': 'x' * 1000}
+    first, second = ConversationState(), ConversationState()
+    first.set_ref('current_user_data', user)
+    second.set_ref('current_user_data', dict(user))
+
+    assert first['current_user_data']['username'] == 'alice'
+    assert first._data['current_user_data'][0] == EntityRef('user-uuid-1')
+    assert first.nbytes < 100
+    assert first['current_user_data'] is second['current_user_data']
+
+    stats = state_store.sweep()
+    assert stats['sessions'] >= 2 and stats['entities'] >= 1
+
+
+@pytest.mark.asyncio
+async def test_view_from_api_is_held_by_reference(panel_api_client):
+    """Test a UserView from get_user is referenced by UUID, not kept in the session"""
+    user = (await panel_api_client.get_user(user_uuid(3)))['response']
+    assert isinstance(user, UserView)
+
+    state = ConversationState()
+    state.set_ref('current_user_data', user)
+
+    assert state._data['current_user_data'][0] == EntityRef(str(user['uuid']))
+    assert state.nbytes < 100
+    assert state['current_user_data']['username'] == user['username']
+    # Размер сущности считается по её данным, а не по repr()
+    _, _, size = state_store._entities[str(user['uuid'])]
+    payload = user.model.model_dump(mode="json", by_alias=True)
+    assert size == len(json.dumps(payload, ensure_ascii=False))
+
+
+@pytest.mark.asyncio
+async def test_timeout_handler_drops_conversation_keys():
+    """Test conversation timeout removes only that conversation's keys"""
+    context = MagicMock()
+    context.user_data = ConversationState()
+    context.user_data['bulk_count'] = 5
+    context.user_data['export_options'] = {'fmt': 'csv'}
+
+    handler = state_store.timeout_handler('bulk_count', 'bulk_duration')
+    await handler.callback(MagicMock(), context)
+
+    assert dict(context.user_data) == {'export_options': {'fmt': 'csv'}}
@@ -0,0 +1,57 @@
+"""
+Tests for incremental parsing of panel list responses
+"""
+import json
+
+import httpx
+import pytest
+
+from src.services.streaming import JsonArrayStream, StreamingJSONError, stream_json_array
+
+DOCUMENT = json.dumps({
+    "response": {
+        "meta": {"users": [1, 2]},
+        "users": [
+            {"uuid": str(i), "username": f"user_{i}", "description": 'тест "]}, ['}
+            for i in range(25)
+        ],
+        "total": 25,
+    }
+}, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(DOCUMENT)])
+def test_items_are_parsed_across_chunk_boundaries(chunk_size):
+    """Test items and envelope survive any chunking"""
+    parser = JsonArrayStream(("response", "users"))
+    items = []
+    for start in range(0, len(DOCUMENT), chunk_size):
+        items.extend(parser.feed(DOCUMENT[start:start + chunk_size]))
+
+    envelope = parser.close()
+    assert [item["username"] for item in items] == [f"user_{i}" for i in range(25)]
+    assert parser.count == 25
+    assert envelope["response"]["total"] == 25
+    assert envelope["response"]["meta"] == {"users": [1, 2]}
+
+
+def test_missing_array_is_an_error():
+    """Test close fails when the target array never appeared"""
+    parser = JsonArrayStream(("response", "users"))
+    parser.feed('{"response": {"total": 0}}')
+    with pytest.raises(StreamingJSONError):
+        parser.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_json_array_from_response():
+    """Test items are yielded from a streamed httpx response"""
+    body = DOCUMENT.encode()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    envelope = {}
+    async with httpx.AsyncClient(transport=transport) as client:
+        async with client.stream("GET", "http://panel/api/users") as response:
+            items = [item async for item in stream_json_array(response, ("response", "users"), envelope)]
+
+    assert len(items) == 25
+    assert envelope["response"]["total"] == 25
@@ -0,0 +1,83 @@
+"""
+Tests for update tracing
+"""
+import json
+
+import pytest
+
+from src.services.tracing import JsonlExporter, Tracer, otlp_payload
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    async def export(self, spans):
+        self.spans.extend(spans)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_spans_form_a_tree_per_update():
+    """Test handler, API and Telegram spans hang under the update's root span"""
+    exporter = ListExporter()
+    tracer = Tracer(enabled=True, sample_rate=1.0, exporter=exporter)
+
+    with tracer.start_trace("update", update_id=1) as root:
+        with tracer.span("node_view_callback", kind="handler") as handler:
+            with tracer.span("api.get_node", kind="api"):
+                pass
+            with tracer.span("telegram.editMessageText", kind="telegram"):
+                pass
+    # Вне апдейта спаны не создаются
+    with tracer.span("api.get_nodes", kind="api") as orphan:
+        assert orphan is None
+    await tracer.flush()
+
+    spans = {span["name"]: span for span in exporter.spans}
+    assert len(spans) == 4
+    assert {span["trace_id"] for span in exporter.spans} == {root.trace.trace_id}
+    assert spans["node_view_callback"]["parent_id"] == root.span_id
+    assert spans["api.get_node"]["parent_id"] == handler.span_id
+    assert spans["update"]["attributes"] == {"update_id": 1}
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traces_kept_only_on_error():
+    """Test head sampling drops normal traces but keeps failed ones"""
+    exporter = ListExporter()
+    tracer = Tracer(enabled=True, sample_rate=0.0, exporter=exporter)
+
+    with tracer.start_trace("update"):
+        with tracer.span("api.get_users", kind="api"):
+            pass
+    with pytest.raises(RuntimeError):
+        with tracer.start_trace("update"):
+            with tracer.span("api.get_user", kind="api"):
+                raise RuntimeError("panel down")
+    await tracer.flush()
+
+    assert [span["name"] for span in exporter.spans] == ["update", "api.get_user"]
+    assert exporter.spans[1]["error"] == "RuntimeError: panel down"
+
+
+@pytest.mark.asyncio
+async def test_exporters_formats(tmp_path):
+    """Test JSONL lines and the OTLP/HTTP JSON envelope"""
+    exporter = ListExporter()
+    tracer = Tracer(enabled=True, sample_rate=1.0, exporter=exporter)
+    with tracer.start_trace("update"):
+        with tracer.span("cache.get", kind="cache", key="users"):
+            pass
+    await tracer.flush()
+
+    path = tmp_path / "traces.jsonl"
+    await JsonlExporter(str(path)).export(exporter.spans)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["update", "cache.get"]
+
+    otlp = otlp_payload(exporter.spans)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otlp[1]["parentSpanId"] == otlp[0]["spanId"]
+    assert {"key": "key", "value": {"stringValue": "users"}} in otlp[1]["attributes"]
@@ -0,0 +1,62 @@
+"""
+Tests for lazy entity views returned by the API client
+"""
+import pickle
+import uuid
+
+import pytest
+from remnawave.models import UserResponseDto
+
+from src.models.views import UserView
+
+USER = {
+    "uuid": str(uuid.uuid4()),
+    "shortUuid": "abc123",
+    "username": "alice",
+    "status": "ACTIVE",
+    "usedTrafficBytes": 1024,
+    "lifetimeUsedTrafficBytes": 2048,
+    "trafficLimitBytes": None,
+    "expireAt": "2030-01-01T00:00:00.000Z",
+    "trojanPassword": "x" * 12,
+    "vlessUuid": str(uuid.uuid4()),
+    "ssPassword": "y" * 12,
+    "activeInternalSquads": [{"uuid": str(uuid.uuid4()), "name": "Default"}],
+    "createdAt": "2024-01-01T00:00:00.000Z",
+    "updatedAt": "2024-01-01T00:00:00.000Z",
+}
+
+
+@pytest.fixture
+def model():
+    return UserResponseDto.model_validate(USER)
+
+
+def test_view_matches_model_dump(model):
+    """Test dict-style access returns the same values as model_dump"""
+    view = UserView(model)
+    dumped = model.model_dump(by_alias=True)
+
+    assert set(view) == set(dumped)
+    for key in ("uuid", "username", "status", "usedTrafficBytes", "expireAt", "trafficLimitBytes"):
+        assert view[key] == dumped[key]
+    assert view.get("usedTrafficBytes") == 1024
+    assert view.get("missing", "default") == "default"
+    assert view["activeInternalSquads"][0].get("name") == "Default"
+    assert view.to_dict() == dumped
+
+
+def test_attribute_access_and_read_only(model):
+    """Test attributes by API and python names, and that views cannot be modified"""
+    view = UserView(model)
+    assert view.usedTrafficBytes == view.used_traffic_bytes == 1024
+    with pytest.raises(AttributeError):
+        view.username = "bob"
+    with pytest.raises(TypeError):
+        view["username"] = "bob"
+
+
+def test_view_survives_pickle(model):
+    """Test views can be stored in persisted user_data"""
+    view = pickle.loads(pickle.dumps(UserView(model)))
+    assert view["username"] == "alice"
@@ -0,0 +1,58 @@
+"""
+Tests for throttled progress reporter
+"""
+import pytest
+from unittest.mock import AsyncMock
+
+from src.utils.progress import ProgressReporter, format_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_progress_is_throttled_and_final_is_flushed():
+    """Test reporter edits at most once per interval and always sends final state"""
+    clock = FakeClock()
+    edit = AsyncMock()
+    progress = ProgressReporter(edit, "Тест", total=10, min_interval=5, clock=clock)
+
+    await progress.update(force=True)
+    for _ in range(4):
+        clock.now += 1
+        await progress.advance(success=True)
+    assert edit.await_count == 1
+
+    clock.now += 1
+    await progress.advance(success=False)
+    assert edit.await_count == 2
+    assert "5 / 10" in edit.await_args.args[0]
+    assert "Осталось" in edit.await_args.args[0]
+
+    await progress.finish()
+    assert edit.await_count == 3
+    assert "Ошибок: 1" in edit.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_progress_skips_unchanged_text():
+    """Test reporter does not edit the message with identical text"""
+    clock = FakeClock()
+    edit = AsyncMock()
+    progress = ProgressReporter(edit, "Тест", min_interval=0, clock=clock)
+
+    await progress.update()
+    await progress.update()
+    assert edit.await_count == 1
+
+
+def test_format_duration():
+    """Test duration formatting"""
+    assert format_duration(5) == "5с"
+    assert format_duration(125) == "2м 5с"
+    assert format_duration(3720) == "1ч 2м"
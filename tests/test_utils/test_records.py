@@ -0,0 +1,50 @@
+"""
+Tests for compact user records
+"""
+import uuid
+from datetime import datetime, timezone
+
+from remnawave.models import UserResponseDto
+
+from src.models.records import UserRecord, UserStatusCode
+from src.models.views import UserView
+
+RAW_USER = {
+    "uuid": str(uuid.uuid4()),
+    "shortUuid": "abc123",
+    "username": "alice",
+    "status": "LIMITED",
+    "usedTrafficBytes": 1024,
+    "lifetimeUsedTrafficBytes": 2048,
+    "trafficLimitBytes": 4096,
+    "expireAt": "2030-01-01T00:00:00.000Z",
+    "telegramId": 42,
+    "tag": "VIP",
+    "trojanPassword": "x" * 12,
+    "vlessUuid": str(uuid.uuid4()),
+    "ssPassword": "y" * 12,
+    "createdAt": "2024-01-01T00:00:00.000Z",
+    "updatedAt": "2024-01-01T00:00:00.000Z",
+}
+
+
+def test_record_from_raw_dict():
+    """Test hot fields are converted to compact types"""
+    record = UserRecord.from_api(RAW_USER)
+
+    assert record.uuid == RAW_USER["uuid"]
+    assert record.status == UserStatusCode.LIMITED
+    assert record.status_name == "LIMITED"
+    assert record.expire_datetime == datetime(2030, 1, 1, tzinfo=timezone.utc)
+    assert (record.telegram_id, record.tag, record.traffic_limit_bytes) == (42, "VIP", 4096)
+    assert not hasattr(record, "__dict__")
+
+
+def test_record_from_view_matches_raw():
+    """Test SDK-model views and raw dicts give the same record"""
+    view = UserView(UserResponseDto.model_validate(RAW_USER))
+    from_view = UserRecord.from_api(view)
+    from_raw = UserRecord.from_api(RAW_USER)
+
+    for field in UserRecord.__slots__:
+        assert getattr(from_view, field) == getattr(from_raw, field)